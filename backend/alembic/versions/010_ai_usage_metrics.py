@@ -0,0 +1,36 @@
+"""Add latency and cache-hit columns to ai_usage_logs
+
+Revision ID: 010_ai_usage_metrics
+Revises: 009
+Create Date: 2026-03-02 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "010_ai_usage_metrics"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("ai_usage_logs") as batch_op:
+        batch_op.add_column(sa.Column("latency_ms", sa.Float(), nullable=True))
+        batch_op.add_column(
+            sa.Column("cache_hit", sa.Boolean(), nullable=False, server_default=sa.text("false"))
+        )
+        # Calls outside a version context (e.g. admin tools) are logged too
+        batch_op.alter_column("version_id", existing_type=sa.Integer(), nullable=True)
+        batch_op.create_index("ix_ai_usage_logs_created_at", ["created_at"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("ai_usage_logs") as batch_op:
+        batch_op.drop_index("ix_ai_usage_logs_created_at")
+        batch_op.alter_column("version_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column("cache_hit")
+        batch_op.drop_column("latency_ms")
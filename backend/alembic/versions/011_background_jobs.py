@@ -0,0 +1,53 @@
+"""Add background_jobs table for the durable AI job queue
+
+Revision ID: 011_background_jobs
+Revises: 010_ai_usage_metrics
+Create Date: 2026-03-09 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "011_background_jobs"
+down_revision: Union[str, None] = "010_ai_usage_metrics"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_type", sa.String(30), nullable=False),
+        sa.Column(
+            "version_id",
+            sa.Integer(),
+            sa.ForeignKey("document_versions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="3"),
+        sa.Column("run_after", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("locked_by", sa.String(100), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_background_jobs_id", "background_jobs", ["id"])
+    op.create_index("ix_background_jobs_version_id", "background_jobs", ["version_id"])
+    op.create_index("ix_background_jobs_claim", "background_jobs", ["status", "priority", "run_after"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_background_jobs_claim", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_version_id", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_id", table_name="background_jobs")
+    op.drop_table("background_jobs")
@@ -0,0 +1,51 @@
+"""Add document_references table for the cross-reference graph
+
+Revision ID: 012_document_references
+Revises: 011_background_jobs
+Create Date: 2026-03-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "012_document_references"
+down_revision: Union[str, None] = "011_background_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_references",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "source_document_id",
+            sa.Integer(),
+            sa.ForeignKey("documents.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "source_version_id",
+            sa.Integer(),
+            sa.ForeignKey("document_versions.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column("cited_code", sa.String(20), nullable=False),
+        sa.Column("cited_type", sa.String(10), nullable=False),
+        sa.Column("cited_sequential", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("source_document_id", "cited_type", "cited_sequential", name="uq_doc_ref_edge"),
+    )
+    op.create_index("ix_document_references_id", "document_references", ["id"])
+    op.create_index("ix_document_references_source_document_id", "document_references", ["source_document_id"])
+    op.create_index("ix_document_references_cited", "document_references", ["cited_type", "cited_sequential"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_references_cited", table_name="document_references")
+    op.drop_index("ix_document_references_source_document_id", table_name="document_references")
+    op.drop_index("ix_document_references_id", table_name="document_references")
+    op.drop_table("document_references")
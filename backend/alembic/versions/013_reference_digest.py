@@ -0,0 +1,27 @@
+"""Add reference_digest to document_versions for crossref validation prompts
+
+Revision ID: 013_reference_digest
+Revises: 012_document_references
+Create Date: 2026-03-23 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "013_reference_digest"
+down_revision: Union[str, None] = "012_document_references"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("document_versions") as batch_op:
+        batch_op.add_column(sa.Column("reference_digest", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("document_versions") as batch_op:
+        batch_op.drop_column("reference_digest")
@@ -0,0 +1,92 @@
+"""Add the document_search FTS5 index and its sync triggers
+
+The virtual table is not part of the ORM metadata, so it is created here and
+filled from the existing versions. The DDL is a frozen copy of
+app.services.search_index as of this revision. SQLite only; on other
+databases search keeps using the ILIKE query.
+
+Revision ID: 014_document_search_index
+Revises: 013_reference_digest
+Create Date: 2026-04-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "014_document_search_index"
+down_revision: Union[str, None] = "013_reference_digest"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TRIGGERS = ("version_ai", "version_au", "version_ad", "document_au", "document_ad")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS document_search USING fts5(
+            document_id UNINDEXED, code, title, body,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS document_search_version_ai AFTER INSERT ON document_versions BEGIN
+            INSERT INTO document_search(rowid, document_id, code, title, body)
+            SELECT NEW.id, NEW.document_id, d.code, d.title, COALESCE(NEW.extracted_text, '')
+            FROM documents d WHERE d.id = NEW.document_id;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS document_search_version_au AFTER UPDATE OF extracted_text ON document_versions BEGIN
+            DELETE FROM document_search WHERE rowid = OLD.id;
+            INSERT INTO document_search(rowid, document_id, code, title, body)
+            SELECT NEW.id, NEW.document_id, d.code, d.title, COALESCE(NEW.extracted_text, '')
+            FROM documents d WHERE d.id = NEW.document_id;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS document_search_version_ad AFTER DELETE ON document_versions BEGIN
+            DELETE FROM document_search WHERE rowid = OLD.id;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS document_search_document_au AFTER UPDATE OF code, title ON documents BEGIN
+            UPDATE document_search SET code = NEW.code, title = NEW.title WHERE document_id = NEW.id;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS document_search_document_ad AFTER DELETE ON documents BEGIN
+            DELETE FROM document_search WHERE document_id = OLD.id;
+        END
+        """
+    )
+    op.execute("DELETE FROM document_search")
+    op.execute(
+        """
+        INSERT INTO document_search(rowid, document_id, code, title, body)
+        SELECT v.id, v.document_id, d.code, d.title, COALESCE(v.extracted_text, '')
+        FROM document_versions v JOIN documents d ON d.id = v.document_id
+        """
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for trigger in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS document_search_{trigger}")
+    op.execute("DROP TABLE IF EXISTS document_search")
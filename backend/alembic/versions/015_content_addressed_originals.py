@@ -0,0 +1,137 @@
+"""Store original files by content hash (stored_files) and deduplicate existing ones
+
+Existing originals are copied to their content-addressed path; the old files
+are left in place and their paths recorded in legacy_original_files, so the
+downgrade can point versions back at them. Deleting the old files is a
+separate step (DELETE /api/admin/legacy-originals).
+
+Revision ID: 015_content_addressed_originals
+Revises: 014_document_search_index
+Create Date: 2026-03-30 00:00:00.000000
+
+"""
+import hashlib
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "015_content_addressed_originals"
+down_revision: Union[str, None] = "014_document_search_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _hash_file(path: str) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _copy_file(src: str, dest: str) -> None:
+    """Copy src to dest atomically (temp name, then rename)."""
+    tmp = f"{dest}.{uuid.uuid4().hex}.part"
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dest)
+
+
+def _dedupe_existing_files() -> None:
+    """Copy every original into originals/<ab>/<sha256><ext>, keeping one copy per content."""
+    from app.config import settings
+
+    bind = op.get_bind()
+    versions = bind.execute(
+        sa.text("SELECT id, original_file_path FROM document_versions WHERE original_file_path IS NOT NULL")
+    ).all()
+
+    stored: dict[str, dict] = {}  # sha256 -> {"path", "size"}
+    for version_id, file_path in versions:
+        abs_path = file_path if os.path.isabs(file_path) else os.path.join(settings.STORAGE_PATH, file_path)
+        if not os.path.exists(abs_path):
+            continue  # missing originals keep their old path and no hash
+        sha256, size = _hash_file(abs_path)
+        entry = stored.get(sha256)
+        if entry is None:
+            ext = os.path.splitext(abs_path)[1].lower()
+            rel_path = os.path.join("originals", sha256[:2], f"{sha256}{ext}")
+            dest = os.path.join(settings.STORAGE_PATH, rel_path)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            if not os.path.exists(dest):
+                _copy_file(abs_path, dest)
+            entry = stored[sha256] = {"path": rel_path, "size": size}
+        if file_path != entry["path"]:
+            bind.execute(
+                sa.text("INSERT INTO legacy_original_files (version_id, path) VALUES (:id, :path)"),
+                {"id": version_id, "path": file_path},
+            )
+        bind.execute(
+            sa.text("UPDATE document_versions SET original_file_path = :path, file_sha256 = :sha WHERE id = :id"),
+            {"path": entry["path"], "sha": sha256, "id": version_id},
+        )
+
+    now = datetime.now(timezone.utc)
+    for sha256, entry in stored.items():
+        bind.execute(
+            sa.text(
+                "INSERT INTO stored_files (sha256, path, size, created_at) "
+                "VALUES (:sha, :path, :size, :created_at)"
+            ),
+            {"sha": sha256, "created_at": now, **entry},
+        )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stored_files",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("path", sa.String(1000), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("extracted_text", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_stored_files_id", "stored_files", ["id"])
+    op.create_index("ix_stored_files_sha256", "stored_files", ["sha256"], unique=True)
+
+    op.create_table(
+        "legacy_original_files",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version_id", sa.Integer(), sa.ForeignKey("document_versions.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("path", sa.String(1000), nullable=False),
+    )
+    op.create_index("ix_legacy_original_files_id", "legacy_original_files", ["id"])
+
+    with op.batch_alter_table("document_versions") as batch_op:
+        batch_op.add_column(sa.Column("file_sha256", sa.String(64), nullable=True))
+        batch_op.create_index("ix_document_versions_file_sha256", ["file_sha256"])
+
+    _dedupe_existing_files()
+
+
+def downgrade() -> None:
+    # Point versions back at their old files when they were not removed yet; the
+    # content-addressed copies are left on disk
+    op.execute(
+        "UPDATE document_versions SET original_file_path = ("
+        "SELECT l.path FROM legacy_original_files l WHERE l.version_id = document_versions.id) "
+        "WHERE id IN (SELECT version_id FROM legacy_original_files)"
+    )
+    op.drop_index("ix_legacy_original_files_id", table_name="legacy_original_files")
+    op.drop_table("legacy_original_files")
+
+    with op.batch_alter_table("document_versions") as batch_op:
+        batch_op.drop_index("ix_document_versions_file_sha256")
+        batch_op.drop_column("file_sha256")
+
+    op.drop_index("ix_stored_files_sha256", table_name="stored_files")
+    op.drop_index("ix_stored_files_id", table_name="stored_files")
+    op.drop_table("stored_files")
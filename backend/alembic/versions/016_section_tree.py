@@ -0,0 +1,31 @@
+"""Add section_tree to document_versions and stored_files
+
+Revision ID: 016_section_tree
+Revises: 015_content_addressed_originals
+Create Date: 2026-04-06 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "016_section_tree"
+down_revision: Union[str, None] = "015_content_addressed_originals"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("document_versions") as batch_op:
+        batch_op.add_column(sa.Column("section_tree", sa.JSON(), nullable=True))
+    with op.batch_alter_table("stored_files") as batch_op:
+        batch_op.add_column(sa.Column("section_tree", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("stored_files") as batch_op:
+        batch_op.drop_column("section_tree")
+    with op.batch_alter_table("document_versions") as batch_op:
+        batch_op.drop_column("section_tree")
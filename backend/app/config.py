@@ -5,7 +5,87 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite+aiosqlite:///./fives.db"
     DATABASE_URL_SYNC: str = "sqlite:///./fives.db"
     OPENAI_API_KEY: str = ""
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    OPENAI_TIMEOUT_SECONDS: float = 120.0
+    # Per-agent request timeouts (seconds); agents not listed use OPENAI_TIMEOUT_SECONDS
+    OPENAI_AGENT_TIMEOUTS: dict[str, float] = {
+        "analysis": 120.0,
+        "consistency": 60.0,
+        "changelog": 90.0,
+        "crossref": 90.0,
+        "spelling": 180.0,
+        "formatting": 180.0,
+        "safety": 30.0,
+    }
+    # Per-model budgets for the shared rate limiter (match the account's tier)
+    OPENAI_RATE_LIMITS: dict[str, dict[str, int]] = {
+        "gpt-4o": {"rpm": 500, "tpm": 30000},
+        "gpt-4o-mini": {"rpm": 500, "tpm": 200000},
+    }
+    # Retries for 429 / connection / 5xx errors before falling back to the mock
+    OPENAI_MAX_RETRIES: int = 4
+    OPENAI_RETRY_BASE_SECONDS: float = 1.0
+    OPENAI_RETRY_MAX_SECONDS: float = 30.0
+    # Circuit breaker: open after N consecutive connection/timeout/5xx failures
+    OPENAI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    OPENAI_CIRCUIT_RESET_SECONDS: float = 60.0
+    # Documents longer than this (estimated input tokens) are split at section
+    # headings and analyzed/formatted/reviewed chunk by chunk, concurrently
+    AI_CHUNK_MAX_TOKENS: int = 6000
+    # Size of the per-version digest sent for each cited document in crossref validation
+    CROSSREF_DIGEST_MAX_CHARS: int = 800
+    # Spelling agent returns only edits, applied locally (False = full corrected_text)
+    SPELLING_PATCH_MODE: bool = True
+    # Local pt-BR pre-pass for spelling-only reviews. Hunspell .dic (with its .aff
+    # alongside) or a plain word list; empty = the pt_BR dictionary of LibreOffice
+    # or of a system Hunspell, and no pre-pass if none is found
+    SPELLING_PRE_PASS_ENABLED: bool = True
+    SPELLING_DICTIONARY_PATH: str = ""
+    SPELLING_WHITELIST: list[str] = [
+        "PQ", "IT", "RQ", "EPI", "EPIs", "NR", "ISO", "ABNT", "POP", "TEX", "COTTON",
+    ]
+    SPELLING_USE_PUBLISHED_VOCABULARY: bool = True
+    # Published words are trusted only when used in at least this many documents
+    SPELLING_PUBLISHED_VOCABULARY_MIN_DOCUMENTS: int = 3
     STORAGE_PATH: str = "./storage"
+    # Uploads are streamed to disk in chunks; larger files are rejected with 413
+    MAX_UPLOAD_BYTES: int = 50 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    # LLM response cache (empty path = <STORAGE_PATH>/llm_cache.db)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = ""
+    LLM_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 5000
+    LLM_CACHE_MAX_BYTES: int = 200 * 1024 * 1024
+    # AI usage logging (batched writes to ai_usage_logs)
+    AI_USAGE_FLUSH_INTERVAL_SECONDS: float = 5.0
+    AI_USAGE_FLUSH_BATCH_SIZE: int = 50
+    # Background job queue (AI analysis / formatting)
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_SECONDS: float = 30.0
+    JOB_LEASE_SECONDS: float = 600.0
+    # Running jobs renew their lease this often (keep well below JOB_LEASE_SECONDS)
+    JOB_HEARTBEAT_SECONDS: float = 60.0
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    # Blocking work off the event loop: processes for CPU-bound parsing/rendering
+    # (0 = use the thread pool), threads for file I/O and LibreOffice calls
+    EXECUTOR_PROCESS_WORKERS: int = 2
+    EXECUTOR_THREAD_WORKERS: int = 8
+    # PDFs longer than this are extracted in page ranges of this size in parallel (0 = whole file at once)
+    PDF_PAGES_PER_TASK: int = 16
+    # LibreOffice conversion pool: workers with isolated profiles, long-lived soffice
+    # listeners when a Python with uno is found (empty paths = auto-detect)
+    OFFICE_BINARY: str = ""
+    OFFICE_UNO_PYTHON: str = ""
+    OFFICE_POOL_SIZE: int = 2
+    OFFICE_QUEUE_SIZE: int = 20
+    OFFICE_CONVERSION_TIMEOUT_SECONDS: float = 120.0
+    OFFICE_STARTUP_TIMEOUT_SECONDS: float = 60.0
+    OFFICE_MAX_CONVERSIONS_PER_WORKER: int = 200
+    OFFICE_HEALTH_CHECK_SECONDS: float = 60.0
     ALLOWED_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:3001"]
 
     model_config = {"env_file": ".env", "extra": "ignore"}
@@ -1,9 +1,14 @@
+import logging
+from typing import AsyncGenerator, Callable
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from sqlalchemy.orm import Session, declarative_base
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,
@@ -17,6 +22,41 @@ async_session_factory = async_sessionmaker(
 
 Base = declarative_base()
 
+_COMMIT_HOOKS = "after_commit_hooks"
+_ROLLBACK_HOOKS = "after_rollback_hooks"
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run callback once the session's current transaction commits; dropped if it rolls back."""
+    session.info.setdefault(_COMMIT_HOOKS, []).append(callback)
+
+
+def after_rollback(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run callback if the session's current transaction ends without committing
+    (rollback or close); dropped if it commits. Savepoint rollbacks do not trigger it."""
+    session.info.setdefault(_ROLLBACK_HOOKS, []).append(callback)
+
+
+def _run_hooks(session: Session, run: str, drop: str) -> None:
+    session.info.pop(drop, None)
+    for callback in session.info.pop(run, []):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Erro em callback pós-transação: {type(e).__name__}: {e}")
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session: Session) -> None:
+    _run_hooks(session, _COMMIT_HOOKS, _ROLLBACK_HOOKS)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _on_transaction_end(session: Session, transaction) -> None:
+    # Runs after _on_commit for committed transactions, which already took the hooks
+    if transaction.parent is None:
+        _run_hooks(session, _ROLLBACK_HOOKS, _COMMIT_HOOKS)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_factory() as session:
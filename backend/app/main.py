@@ -10,6 +10,15 @@ from sqlalchemy import select
 from app.database import engine, async_session_factory, Base
 from app.config import settings
 from app.models.template import DocumentTemplate
+from app.services.openai_client import init_openai_client, close_openai_client
+from app.services.llm_cache import close_llm_cache
+from app.services.ai_usage_service import start_usage_flusher, stop_usage_flusher
+from app.services.job_queue import start_job_workers, stop_job_workers
+from app.services.spell_checker import load_spell_checker
+from app.services.search_index import init_search_index
+from app.services.suggest_index import load_suggest_index
+from app.services.executor import run_cpu, start_executors, shutdown_executors
+from app.services.office_pool import start_office_pool, stop_office_pool
 from app.routers import documents, ai_routes, workflow, admin, export, master_list, approval, templates, bulk_import, distribution, audit_report
 
 # Import all models so they are registered with Base.metadata
@@ -34,7 +43,8 @@ _DEFAULT_TEMPLATES = [
 
 async def _seed_default_templates():
     """Pre-load default PQ/IT templates if none exist for each document type."""
-    from app.services.template_service import find_placeholders, convert_odt_to_docx
+    from app.services.office_pool import convert_document
+    from app.services.template_service import find_placeholders
 
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     templates_dir = os.path.join(settings.STORAGE_PATH, "templates")
@@ -71,13 +81,9 @@ async def _seed_default_templates():
             section_mapping = None
             try:
                 if ext.lower() == ".odt":
-                    temp_dir = os.path.join(settings.STORAGE_PATH, "temp")
-                    os.makedirs(temp_dir, exist_ok=True)
-                    converted = convert_odt_to_docx(dest_path, temp_dir)
                     docx_name = f"{doc_type}_padrao.docx"
-                    docx_path = os.path.join(templates_dir, docx_name)
-                    shutil.move(converted, docx_path)
-                placeholders = find_placeholders(docx_path)
+                    docx_path = await convert_document(dest_path, os.path.join(templates_dir, docx_name))
+                placeholders = await run_cpu(find_placeholders, docx_path)
                 section_mapping = {"placeholders": placeholders}
                 logger.info(f"Template {doc_type}: {len(placeholders)} placeholders encontrados")
             except Exception as e:
@@ -101,16 +107,49 @@ async def _seed_default_templates():
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Process/thread pools for blocking parsing, rendering and LibreOffice calls
+    start_executors()
+    # LibreOffice conversion workers (warm listeners, isolated profiles)
+    try:
+        await start_office_pool()
+    except Exception as e:
+        logger.error(f"Erro ao iniciar pool do LibreOffice: {e}")
     # Startup: create tables for development
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # FTS5 search index + sync triggers (no-op outside SQLite)
+        await init_search_index(conn)
     # Seed default templates
     try:
         await _seed_default_templates()
     except Exception as e:
         logger.error(f"Erro ao carregar templates padrão: {e}")
+    # Shared OpenAI client (one connection pool for all agents)
+    init_openai_client()
+    # Batched writer for AI usage logs
+    start_usage_flusher()
+    # Local spelling pre-pass (dictionary + corporate whitelist)
+    try:
+        await load_spell_checker()
+    except Exception as e:
+        logger.error(f"Erro ao carregar verificador ortográfico: {e}")
+    # In-memory prefix index for /api/documents/suggest
+    try:
+        await load_suggest_index()
+    except Exception as e:
+        logger.error(f"Erro ao carregar índice de sugestões: {e}")
+    # Background job workers (requeues work interrupted by a restart)
+    await start_job_workers()
     yield
-    # Shutdown: dispose engine
+    # Shutdown: stop job workers, flush pending usage rows, close the OpenAI
+    # connection pool, the LLM cache, the LibreOffice workers, the executor
+    # pools and dispose engine
+    await stop_job_workers()
+    await stop_usage_flusher()
+    await close_openai_client()
+    close_llm_cache()
+    await stop_office_pool()
+    shutdown_executors()
     await engine.dispose()
 
 
@@ -151,4 +190,10 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    from app.services.circuit_breaker import OPEN, get_circuit_breaker
+
+    openai_circuit = get_circuit_breaker().snapshot()
+    return {
+        "status": "degraded" if openai_circuit["state"] == OPEN else "healthy",
+        "openai_circuit": openai_circuit,
+    }
@@ -10,6 +10,9 @@ from app.models.template import DocumentTemplate
 from app.models.text_review import TextReview
 from app.models.distribution import DocumentDistribution
 from app.models.ai_usage_log import AIUsageLog
+from app.models.job import BackgroundJob
+from app.models.document_reference import DocumentReference
+from app.models.stored_file import LegacyOriginalFile, StoredFile
 
 __all__ = [
     "AdminConfig",
@@ -29,4 +32,8 @@ __all__ = [
     "TextReview",
     "DocumentDistribution",
     "AIUsageLog",
+    "BackgroundJob",
+    "DocumentReference",
+    "StoredFile",
+    "LegacyOriginalFile",
 ]
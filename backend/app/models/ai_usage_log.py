@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.database import Base
@@ -8,12 +8,14 @@ class AIUsageLog(Base):
     __tablename__ = "ai_usage_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    version_id = Column(Integer, ForeignKey("document_versions.id", ondelete="CASCADE"), nullable=False)
-    agent_type = Column(String(50), nullable=False)  # analysis, formatting, spelling, changelog, crossref
+    version_id = Column(Integer, ForeignKey("document_versions.id", ondelete="CASCADE"), nullable=True, index=True)
+    agent_type = Column(String(50), nullable=False)  # analysis, formatting, spelling, changelog, crossref, consistency, safety
     model = Column(String(50), nullable=False)  # gpt-4o, gpt-4o-mini
     tokens_input = Column(Integer, nullable=False, default=0)
     tokens_output = Column(Integer, nullable=False, default=0)
     estimated_cost_usd = Column(Float, nullable=True)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    latency_ms = Column(Float, nullable=True)  # wall-clock time of the call
+    cache_hit = Column(Boolean, nullable=False, default=False)  # served from the LLM response cache
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
 
     version = relationship("DocumentVersion", backref="ai_usage_logs")
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from datetime import datetime, timezone
+
+from app.database import Base
+
+
+class DocumentReference(Base):
+    """Citation edge: source document cites another document by code."""
+
+    __tablename__ = "document_references"
+    __table_args__ = (
+        UniqueConstraint("source_document_id", "cited_type", "cited_sequential", name="uq_doc_ref_edge"),
+        Index("ix_document_references_cited", "cited_type", "cited_sequential"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_document_id = Column(
+        Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    source_version_id = Column(
+        Integer, ForeignKey("document_versions.id", ondelete="CASCADE"), nullable=True
+    )  # version whose text produced the edge
+    cited_code = Column(String(20), nullable=False)  # code as written in the text (IT-003.00)
+    cited_type = Column(String(10), nullable=False)  # PQ, IT, RQ
+    cited_sequential = Column(Integer, nullable=False)  # revision-independent target
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
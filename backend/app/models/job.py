@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
+from datetime import datetime, timezone
+
+from app.database import Base
+
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+    __table_args__ = (
+        Index("ix_background_jobs_claim", "status", "priority", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(30), nullable=False)  # analysis, formatting
+    version_id = Column(Integer, ForeignKey("document_versions.id", ondelete="CASCADE"), nullable=False, index=True)
+    payload = Column(JSON, nullable=True)  # handler kwargs, e.g. {"use_cache": false}
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    priority = Column(Integer, nullable=False, default=0)  # higher runs first
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String(100), nullable=True)  # worker holding the lease
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
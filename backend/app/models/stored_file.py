@@ -0,0 +1,28 @@
+from sqlalchemy import Column, ForeignKey, Integer, String, Text, DateTime, JSON
+from datetime import datetime, timezone
+
+from app.database import Base
+
+
+class StoredFile(Base):
+    """An original file stored once under its SHA-256 (content-addressed)."""
+
+    __tablename__ = "stored_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, nullable=False, index=True)
+    path = Column(String(1000), nullable=False)  # relative to STORAGE_PATH: originals/ab/<sha256>.docx
+    size = Column(Integer, nullable=False)
+    extracted_text = Column(Text, nullable=True)  # extraction result, reused by identical uploads
+    section_tree = Column(JSON, nullable=True)  # section tree of extracted_text
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class LegacyOriginalFile(Base):
+    """Pre-deduplication path of a version's original, kept until removed from the admin panel."""
+
+    __tablename__ = "legacy_original_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    version_id = Column(Integer, ForeignKey("document_versions.id", ondelete="CASCADE"), nullable=False)
+    path = Column(String(1000), nullable=False)  # original_file_path before migration 015
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -11,9 +11,11 @@ class DocumentVersion(Base):
     document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     version_number = Column(Integer, nullable=False)
     original_file_path = Column(String(1000), nullable=False)
+    file_sha256 = Column(String(64), nullable=True, index=True)  # stored_files.sha256 of the original
     formatted_file_path_docx = Column(String(1000), nullable=True)
     formatted_file_path_pdf = Column(String(1000), nullable=True)
     extracted_text = Column(Text, nullable=True)
+    section_tree = Column(JSON, nullable=True)  # headings with offsets into extracted_text (utils.section_tree)
     ai_approved = Column(Boolean, nullable=True)
     status = Column(String(30), default="draft")
     # status values: draft, analyzing, in_review, formatting, approved, rejected, archived
@@ -22,6 +24,7 @@ class DocumentVersion(Base):
     change_summary = Column(Text, nullable=True)
     published_at = Column(DateTime(timezone=True), nullable=True)
     obsolete_at = Column(DateTime(timezone=True), nullable=True)
+    reference_digest = Column(Text, nullable=True)  # purpose/sections/steps summary, set at publish
     # status values: draft, analyzing, spelling_review, in_review, formatting, approved, published, rejected, archived, obsolete
 
     document = relationship("Document", back_populates="versions")
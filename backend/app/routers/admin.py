@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import case, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -270,9 +270,10 @@ async def delete_prompt(config_id: int, db: AsyncSession = Depends(get_db)):
 
 @router.get("/ai-usage")
 async def get_ai_usage_stats(db: AsyncSession = Depends(get_db)):
-    """Get aggregated AI token usage and estimated cost statistics."""
+    """Get aggregated AI token usage, estimated cost and latency per agent/model."""
     from sqlalchemy import func
     from app.models.ai_usage_log import AIUsageLog
+    from app.services.ai_usage_service import percentile
 
     result = await db.execute(
         select(
@@ -282,10 +283,21 @@ async def get_ai_usage_stats(db: AsyncSession = Depends(get_db)):
             func.sum(AIUsageLog.tokens_input).label("total_input_tokens"),
             func.sum(AIUsageLog.tokens_output).label("total_output_tokens"),
             func.sum(AIUsageLog.estimated_cost_usd).label("total_cost_usd"),
+            func.sum(case((AIUsageLog.cache_hit == True, 1), else_=0)).label("cache_hits"),
         ).group_by(AIUsageLog.agent_type, AIUsageLog.model)
         .order_by(AIUsageLog.agent_type)
     )
     rows = result.all()
+
+    # Percentiles are computed in Python (SQLite has no percentile aggregate)
+    latency_result = await db.execute(
+        select(AIUsageLog.agent_type, AIUsageLog.model, AIUsageLog.latency_ms)
+        .where(AIUsageLog.latency_ms.is_not(None), AIUsageLog.cache_hit == False)
+    )
+    latencies: dict[tuple[str, str], list[float]] = {}
+    for agent_type, model, latency_ms in latency_result.all():
+        latencies.setdefault((agent_type, model), []).append(latency_ms)
+
     return [
         {
             "agent_type": r.agent_type,
@@ -294,6 +306,169 @@ async def get_ai_usage_stats(db: AsyncSession = Depends(get_db)):
             "total_input_tokens": r.total_input_tokens or 0,
             "total_output_tokens": r.total_output_tokens or 0,
             "total_cost_usd": round(r.total_cost_usd or 0, 6),
+            "cache_hits": r.cache_hits or 0,
+            "latency_p50_ms": percentile(latencies.get((r.agent_type, r.model), []), 50),
+            "latency_p95_ms": percentile(latencies.get((r.agent_type, r.model), []), 95),
         }
         for r in rows
     ]
+
+
+_USAGE_BUCKET_FORMATS = {
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+}
+
+
+@router.get("/ai-usage/timeseries")
+async def get_ai_usage_timeseries(
+    bucket: str = "day",
+    days: int = 30,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get AI usage aggregated into time buckets (hour, day or month) per agent."""
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import func
+    from app.models.ai_usage_log import AIUsageLog
+    from app.services.ai_usage_service import percentile
+
+    fmt = _USAGE_BUCKET_FORMATS.get(bucket)
+    if fmt is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Bucket inválido: '{bucket}'. Use {', '.join(_USAGE_BUCKET_FORMATS)}.",
+        )
+
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    bucket_col = func.strftime(fmt, AIUsageLog.created_at).label("bucket")
+    result = await db.execute(
+        select(
+            bucket_col,
+            AIUsageLog.agent_type,
+            AIUsageLog.tokens_input,
+            AIUsageLog.tokens_output,
+            AIUsageLog.estimated_cost_usd,
+            AIUsageLog.latency_ms,
+            AIUsageLog.cache_hit,
+        )
+        .where(AIUsageLog.created_at >= since)
+        .order_by(bucket_col)
+    )
+
+    buckets: dict[tuple[str, str], dict] = {}
+    for r in result.all():
+        entry = buckets.setdefault((r.bucket, r.agent_type), {
+            "bucket": r.bucket,
+            "agent_type": r.agent_type,
+            "calls": 0,
+            "cache_hits": 0,
+            "total_input_tokens": 0,
+            "total_output_tokens": 0,
+            "total_cost_usd": 0.0,
+            "_latencies": [],
+        })
+        entry["calls"] += 1
+        entry["total_input_tokens"] += r.tokens_input or 0
+        entry["total_output_tokens"] += r.tokens_output or 0
+        entry["total_cost_usd"] += r.estimated_cost_usd or 0
+        if r.cache_hit:
+            entry["cache_hits"] += 1
+        elif r.latency_ms is not None:
+            entry["_latencies"].append(r.latency_ms)
+
+    items = []
+    for entry in buckets.values():
+        latencies = entry.pop("_latencies")
+        entry["total_cost_usd"] = round(entry["total_cost_usd"], 6)
+        entry["latency_p50_ms"] = percentile(latencies, 50)
+        entry["latency_p95_ms"] = percentile(latencies, 95)
+        items.append(entry)
+    return {"bucket": bucket, "days": days, "items": items}
+
+
+# ---- LLM Response Cache ----
+
+
+@router.get("/ai-cache")
+async def get_ai_cache_stats():
+    """Get LLM response cache size and hit/miss counters."""
+    from app.services.llm_cache import get_llm_cache
+
+    return await get_llm_cache().stats()
+
+
+@router.delete("/ai-cache")
+async def clear_ai_cache():
+    """Drop every cached LLM response."""
+    from app.services.llm_cache import get_llm_cache
+
+    removed = await get_llm_cache().clear()
+    return {"message": "Cache de IA limpo", "removed": removed}
+
+
+# ---- Stored Originals ----
+
+
+@router.delete("/legacy-originals")
+async def remove_legacy_originals(db: AsyncSession = Depends(get_db)):
+    """Delete the original files superseded by content-addressed storage (migration 015)."""
+    from app.services.file_store import remove_legacy_originals
+
+    removed = await remove_legacy_originals(db)
+    return {"message": "Arquivos originais antigos removidos", "removed": removed}
+
+
+# ---- Background Jobs ----
+
+
+@router.get("/jobs")
+async def get_job_queue_stats(db: AsyncSession = Depends(get_db)):
+    """Get background job queue depth, throughput and timings."""
+    from app.services.job_queue import get_queue_stats
+
+    return await get_queue_stats(db)
+
+
+# ---- OpenAI Rate Limiter ----
+
+
+@router.get("/ai-rate-limits")
+async def get_ai_rate_limits():
+    """Get per-model rate limiter budgets, queue length and throttling counters."""
+    from app.services.rate_limiter import get_rate_limit_metrics
+
+    return get_rate_limit_metrics()
+
+
+# ---- Local Spelling Pre-pass ----
+
+
+@router.get("/spell-checker")
+async def get_spell_checker_stats():
+    """Get local spelling checker size, hit rate and estimated time saved."""
+    from app.services.spell_checker import get_spell_checker
+
+    return get_spell_checker().stats()
+
+
+# ---- Blocking Work Executors ----
+
+
+@router.get("/executor")
+async def get_executor_stats():
+    """Get process/thread pool sizes, queue depth and task timings."""
+    from app.services.executor import get_executor_metrics
+
+    return get_executor_metrics()
+
+
+# ---- LibreOffice Conversion Pool ----
+
+
+@router.get("/office-pool")
+async def get_office_pool_stats():
+    """Get LibreOffice worker mode, health, queue depth, restarts and conversion timings."""
+    from app.services.office_pool import get_office_pool_metrics
+
+    return get_office_pool_metrics()
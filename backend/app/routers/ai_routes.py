@@ -26,10 +26,15 @@ def _analysis_to_response(analysis) -> AnalysisResponse:
 
 
 @router.post("/analyze/{version_id}", response_model=AnalysisResponse)
-async def trigger_analysis(version_id: int, db: AsyncSession = Depends(get_db)):
-    """Trigger AI analysis on a document version."""
+async def trigger_analysis(
+    version_id: int, use_cache: bool = True, db: AsyncSession = Depends(get_db)
+):
+    """Trigger AI analysis on a document version.
+
+    Pass use_cache=false to bypass the LLM response cache.
+    """
     try:
-        analysis = await ai_service.run_analysis(db, version_id)
+        analysis = await ai_service.run_analysis(db, version_id, use_cache=use_cache)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -49,10 +54,30 @@ async def get_analysis_results(version_id: int, db: AsyncSession = Depends(get_d
 
 
 @router.post("/format/{version_id}")
-async def trigger_formatting(version_id: int, db: AsyncSession = Depends(get_db)):
-    """Trigger AI formatting on a document version."""
+async def trigger_formatting(
+    version_id: int,
+    use_cache: bool = True,
+    background: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """Trigger AI formatting on a document version.
+
+    Pass use_cache=false to bypass the LLM response cache, and background=true
+    to queue the job instead of waiting for it.
+    """
+    if background:
+        from app.services.job_queue import enqueue_job
+
+        version = await versioning_service.get_version(db, version_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail=f"Version {version_id} not found")
+        job = await enqueue_job(db, "formatting", version_id, payload={"use_cache": use_cache})
+        return {"message": "Formatting queued", "version_id": version_id, "job_id": job.id}
+
     try:
-        version, formatting_method, warnings = await ai_service.run_formatting(db, version_id)
+        version, formatting_method, warnings = await ai_service.run_formatting(
+            db, version_id, use_cache=use_cache
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
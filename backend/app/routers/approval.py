@@ -214,6 +214,8 @@ async def detect_safety(
     result = await _call_with_fallback(
         lambda client: safety_detector.detect_safety(client, text),
         lambda: safety_detector.get_mock_safety_detection(text),
+        agent_type="safety",
+        version_id=version_id,
     )
 
     return result
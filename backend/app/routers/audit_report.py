@@ -14,6 +14,7 @@ from app.database import get_db
 from app.models.approval import ApprovalChain, ApprovalChainApprover
 from app.models.document import Document
 from app.models.version import DocumentVersion
+from app.services.executor import run_cpu
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
@@ -179,7 +180,7 @@ async def get_audit_report(code: str, db: AsyncSession = Depends(get_db)):
         ],
     }
 
-    pdf_path = _generate_audit_pdf(doc_data)
+    pdf_path = await run_cpu(_generate_audit_pdf, doc_data)
     safe_code = code.replace("/", "_").replace(".", "-")
     filename = f"auditoria_{safe_code}_{datetime.now().strftime('%Y%m%d')}.pdf"
     return FileResponse(
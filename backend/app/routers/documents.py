@@ -1,19 +1,23 @@
 import json
 from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.services.ai_service import run_analysis_background
+from app.services.job_queue import PRIORITY_USER_RETRY, enqueue_job
 from app.schemas.documents import (
     DocumentDetailResponse,
     DocumentListResponse,
     DocumentResponse,
+    DocumentSearchResult,
+    DocumentSuggestion,
     DocumentUploadResponse,
 )
 from app.schemas.versions import VersionResponse
 from app.services import document_service, versioning_service, workflow_service, coding_service
+from app.services.file_store import DuplicateUploadError
+from app.utils.upload import UploadTooLargeError
 
 router = APIRouter(prefix="/api/documents", tags=["documents"])
 
@@ -46,14 +50,13 @@ def _version_to_response(ver) -> VersionResponse:
 
 @router.post("/upload", response_model=DocumentUploadResponse)
 async def upload_document(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     metadata: str = Form(...),
     db: AsyncSession = Depends(get_db),
 ):
     """Upload a new document with auto-generated standardized code.
 
-    AI analysis is triggered automatically as a background task.
+    AI analysis is queued automatically as a background job.
     """
     try:
         meta = json.loads(metadata)
@@ -84,6 +87,8 @@ async def upload_document(
         doc, version = await document_service.upload_document(
             db, file, document_type, title, category_id, tags, created_by_profile, sector
         )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -94,8 +99,8 @@ async def upload_document(
     version.status = "analyzing"
     await db.flush()
 
-    # Schedule background AI analysis
-    background_tasks.add_task(run_analysis_background, version.id)
+    # Queue AI analysis (persisted, picked up by the job workers)
+    await enqueue_job(db, "analysis", version.id)
 
     return DocumentUploadResponse(
         document=_document_to_response(doc),
@@ -145,17 +150,30 @@ async def list_documents(
     )
 
 
-@router.get("/search", response_model=list[DocumentResponse])
+@router.get("/search", response_model=list[DocumentSearchResult])
 async def search_documents(
     q: str = "",
     db: AsyncSession = Depends(get_db),
 ):
-    """Full-text search across documents."""
+    """Full-text search across documents, ranked by relevance, with highlighted snippets."""
     if not q.strip():
         raise HTTPException(status_code=400, detail="Search query 'q' is required")
 
-    documents = await document_service.search_documents(db, q)
-    return [_document_to_response(doc) for doc in documents]
+    results = await document_service.search_documents_ranked(db, q)
+    return [
+        DocumentSearchResult(**_document_to_response(doc).model_dump(), score=score, snippet=snippet)
+        for doc, score, snippet in results
+    ]
+
+
+@router.get("/suggest", response_model=list[DocumentSuggestion])
+async def suggest_documents(q: str = "", limit: int = 10):
+    """Search-as-you-type suggestions over codes, master list codes and titles (in-memory, typo-tolerant)."""
+    from app.services.suggest_index import get_suggest_index
+
+    if not q.strip():
+        return []
+    return get_suggest_index().suggest(q, limit=max(1, min(limit, 50)))
 
 
 @router.get("/{code}", response_model=DocumentDetailResponse)
@@ -186,10 +204,50 @@ async def get_document_version(
     return _version_to_response(version)
 
 
+@router.get("/{code}/references")
+async def get_document_references(code: str, db: AsyncSession = Depends(get_db)):
+    """Documents cited by this document (outbound) and documents that cite it (inbound)."""
+    from app.services import reference_graph
+
+    doc = await document_service.get_document_by_code(db, code)
+    if doc is None:
+        raise HTTPException(status_code=404, detail=f"Documento '{code}' não encontrado")
+
+    return {
+        "code": doc.code,
+        "outbound": await reference_graph.get_outbound(db, doc),
+        "inbound": await reference_graph.get_inbound(db, doc),
+    }
+
+
+@router.get("/{code}/impact")
+async def get_document_impact(
+    code: str,
+    max_depth: int = 5,
+    include_inactive: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """Documents affected, directly or transitively, if this document becomes obsolete or is cancelled."""
+    from app.services import reference_graph
+
+    doc = await document_service.get_document_by_code(db, code)
+    if doc is None:
+        raise HTTPException(status_code=404, detail=f"Documento '{code}' não encontrado")
+
+    impacted = await reference_graph.get_impact(
+        db, doc, max_depth=max(1, min(max_depth, 20)), include_inactive=include_inactive
+    )
+    return {
+        "code": doc.code,
+        "total": len(impacted),
+        "direct": sum(1 for item in impacted if item["depth"] == 1),
+        "documents": impacted,
+    }
+
+
 @router.post("/{code}/resubmit", response_model=DocumentUploadResponse)
 async def resubmit_document(
     code: str,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     created_by_profile: str = Form("autor"),
     change_summary: str = Form(""),
@@ -197,12 +255,16 @@ async def resubmit_document(
 ):
     """Resubmit a document with a new file, creating a new version.
 
-    AI analysis is triggered automatically as a background task.
+    AI analysis is queued automatically as a background job.
     """
     try:
         doc, version = await document_service.resubmit_document(
             db, code, file, created_by_profile, change_summary or None
         )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except DuplicateUploadError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -213,8 +275,8 @@ async def resubmit_document(
     version.status = "analyzing"
     await db.flush()
 
-    # Schedule background AI analysis
-    background_tasks.add_task(run_analysis_background, version.id)
+    # Queue AI analysis (persisted, picked up by the job workers)
+    await enqueue_job(db, "analysis", version.id)
 
     return DocumentUploadResponse(
         document=_document_to_response(doc),
@@ -249,10 +311,13 @@ async def skip_ai_approval(
 @router.post("/{code}/retry-analysis")
 async def retry_analysis(
     code: str,
-    background_tasks: BackgroundTasks,
+    use_cache: bool = True,
     db: AsyncSession = Depends(get_db),
 ):
-    """Retry AI analysis for a document stuck in analysis_failed or draft state."""
+    """Retry AI analysis for a document stuck in analysis_failed or draft state.
+
+    Pass use_cache=false to bypass the LLM response cache.
+    """
     doc = await document_service.get_document_by_code(db, code)
     if doc is None:
         raise HTTPException(status_code=404, detail=f"Documento '{code}' não encontrado")
@@ -269,10 +334,12 @@ async def retry_analysis(
     version = doc.versions[-1]
     doc.status = "analyzing"
     version.status = "analyzing"
+    # User-initiated retries jump ahead of bulk uploads in the queue
+    await enqueue_job(
+        db, "analysis", version.id, payload={"use_cache": use_cache}, priority=PRIORITY_USER_RETRY
+    )
     await db.commit()
 
-    background_tasks.add_task(run_analysis_background, version.id)
-
     return {"message": "Análise reiniciada", "version_id": version.id}
 
 
@@ -286,6 +353,7 @@ async def publish_document(
     from datetime import datetime, timezone as tz
     from sqlalchemy import select
     from app.models.version import DocumentVersion
+    from app.services.ai_agents import crossref_agent
 
     doc = await document_service.get_document_by_code(db, code)
     if doc is None:
@@ -318,6 +386,8 @@ async def publish_document(
     # Publish the target version
     target.status = "published"
     target.published_at = now
+    # Digest sent to crossref validation of documents that cite this one
+    target.reference_digest = crossref_agent.build_reference_digest(target.extracted_text or "")
 
     # Update document-level status
     doc.status = "active"
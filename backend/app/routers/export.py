@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.services import versioning_service
+from app.services.executor import run_cpu
 
 router = APIRouter(prefix="/api/export", tags=["export"])
 
@@ -114,7 +115,7 @@ async def download_pdf(version_id: int, db: AsyncSession = Depends(get_db)):
     filename = f"{doc_code}_v{version.version_number}.pdf"
 
     if version.status in ("archived", "obsolete"):
-        watermarked_path = _add_obsolete_watermark(file_path)
+        watermarked_path = await run_cpu(_add_obsolete_watermark, file_path)
         return FileResponse(
             path=watermarked_path,
             filename=filename,
@@ -123,7 +124,7 @@ async def download_pdf(version_id: int, db: AsyncSession = Depends(get_db)):
         )
 
     if version.status != "published":
-        watermarked_path = _add_pending_watermark(file_path)
+        watermarked_path = await run_cpu(_add_pending_watermark, file_path)
         return FileResponse(
             path=watermarked_path,
             filename=filename,
@@ -1,5 +1,4 @@
 import os
-import shutil
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from fastapi.responses import FileResponse
@@ -10,7 +9,10 @@ from app.database import get_db
 from app.config import settings
 from app.models.template import DocumentTemplate
 from app.schemas.template import TemplateResponse, TemplateListResponse
-from app.services.template_service import find_placeholders, convert_odt_to_docx
+from app.services.office_pool import convert_document
+from app.services.template_service import find_placeholders
+from app.services.executor import run_cpu
+from app.utils.upload import UploadTooLargeError, stream_upload_to_disk
 
 router = APIRouter(prefix="/api/templates", tags=["templates"])
 
@@ -40,21 +42,17 @@ async def upload_template(
     safe_name = f"{document_type}_{name.replace(' ', '_')}{ext}"
     file_path = os.path.join(templates_dir, safe_name)
 
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    try:
+        await stream_upload_to_disk(file, file_path)
+    except UploadTooLargeError as e:
+        raise HTTPException(413, str(e))
 
     # Convert .odt to .docx eagerly so formatting always has a native .docx
     docx_file_path = file_path
     if ext == ".odt":
         try:
-            temp_dir = os.path.join(settings.STORAGE_PATH, "temp")
-            os.makedirs(temp_dir, exist_ok=True)
-            converted = convert_odt_to_docx(file_path, temp_dir)
-            # Move converted file to templates dir
             docx_name = safe_name.replace(".odt", ".docx")
-            docx_file_path = os.path.join(templates_dir, docx_name)
-            shutil.move(converted, docx_file_path)
+            docx_file_path = await convert_document(file_path, os.path.join(templates_dir, docx_name))
         except Exception as e:
             # Clean up the uploaded file on failure
             if os.path.exists(file_path):
@@ -69,7 +67,7 @@ async def upload_template(
     section_mapping = None
     if os.path.exists(docx_file_path):
         try:
-            placeholders = find_placeholders(docx_file_path)
+            placeholders = await run_cpu(find_placeholders, docx_file_path)
             section_mapping = {"placeholders": placeholders}
         except Exception:
             section_mapping = {"placeholders": []}
@@ -177,11 +175,7 @@ async def preview_template(template_id: int, db: AsyncSession = Depends(get_db))
     docx_path = template.docx_file_path or template.template_file_path
     if docx_path and os.path.exists(docx_path):
         try:
-            preview_path = docx_path
-            if docx_path.lower().endswith(".odt"):
-                temp_dir = os.path.join(settings.STORAGE_PATH, "temp")
-                preview_path = convert_odt_to_docx(docx_path, temp_dir)
-            placeholders = find_placeholders(preview_path)
+            placeholders = await run_cpu(find_placeholders, docx_path)
         except Exception:
             placeholders = template.section_mapping.get("placeholders", []) if template.section_mapping else []
     elif template.section_mapping:
@@ -47,6 +47,19 @@ class DocumentDetailResponse(DocumentResponse):
     model_config = {"from_attributes": True}
 
 
+class DocumentSearchResult(DocumentResponse):
+    score: Optional[float] = None  # BM25 relevance, higher is better (None on the ILIKE fallback)
+    snippet: Optional[str] = None  # matched fragment, terms wrapped in <mark></mark>
+
+
+class DocumentSuggestion(BaseModel):
+    document_id: int
+    code: str
+    title: str
+    master_list_code: Optional[str] = None
+    match: str  # code, title, fuzzy
+
+
 class DocumentListResponse(BaseModel):
     documents: list[DocumentResponse]
     total: int
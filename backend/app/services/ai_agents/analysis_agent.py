@@ -1,8 +1,13 @@
+import asyncio
 import json
 from typing import Optional
 
 from openai import AsyncOpenAI
 
+from app.config import settings
+from app.services.ai_agents.formatting_agent import DEFAULT_SECTIONS
+from app.utils.chunker import Chunk, chunk_text, outline
+
 BASE_PROMPT = """Você é um analista de conformidade documental para um sistema corporativo de gestão de documentos.
 
 Analise o documento a seguir nos seguintes critérios:
@@ -62,13 +67,75 @@ Critérios adicionais para RQ:
 }
 
 
+CHUNK_PROMPT = """
+ATENÇÃO: o documento é longo e foi dividido em {total} trechos. Você está avaliando o trecho {number} de {total}.
+Estrutura completa do documento (títulos de seção, na ordem):
+{outline}
+- Avalie o conteúdo presente neste trecho
+- Para completude, considere a estrutura completa acima: NÃO rejeite por ausência de seções que aparecem em outros trechos
+"""
+
+
 async def analyze(
     client: AsyncOpenAI,
     text: str,
     rules: Optional[dict] = None,
     document_type: Optional[str] = None,
 ) -> dict:
-    """Analyze a document using the OpenAI API and return structured feedback."""
+    """Analyze a document using the OpenAI API and return structured feedback.
+
+    Documents above AI_CHUNK_MAX_TOKENS are split at their section headings,
+    analyzed chunk by chunk concurrently, and the feedback merged.
+    """
+    chunks = chunk_text(text, settings.AI_CHUNK_MAX_TOKENS, DEFAULT_SECTIONS.get(document_type or "PQ"))
+    if len(chunks) == 1:
+        return await _analyze_chunk(client, text, rules, document_type)
+
+    headings = outline(chunks)
+    results = await asyncio.gather(*[
+        _analyze_chunk(client, chunk.text, rules, document_type, chunk, len(chunks), headings)
+        for chunk in chunks
+    ])
+    return merge_analyses(list(results))
+
+
+def merge_analyses(results: list[dict]) -> dict:
+    """Combine per-chunk analyses: one entry per item, rejected if any chunk rejected it.
+
+    Items keep the order of their first appearance, so the merge is
+    deterministic for a given set of chunk results.
+    """
+    merged: dict[str, dict] = {}
+    for result in results:
+        for item in result.get("feedback_items", []):
+            name = (item.get("item") or "").strip()
+            key = name.lower()
+            if key not in merged:
+                merged[key] = {"item": name, "status": item.get("status", "approved"), "suggestion": item.get("suggestion")}
+                continue
+            entry = merged[key]
+            if item.get("status") == "rejected":
+                entry["status"] = "rejected"
+            suggestion = item.get("suggestion")
+            if suggestion and suggestion not in (entry["suggestion"] or ""):
+                entry["suggestion"] = f"{entry['suggestion']}\n{suggestion}" if entry["suggestion"] else suggestion
+
+    feedback_items = list(merged.values())
+    return {
+        "feedback_items": feedback_items,
+        "approved": all(item["status"] != "rejected" for item in feedback_items),
+    }
+
+
+async def _analyze_chunk(
+    client: AsyncOpenAI,
+    text: str,
+    rules: Optional[dict],
+    document_type: Optional[str],
+    chunk: Optional[Chunk] = None,
+    total_chunks: int = 1,
+    headings: Optional[list[str]] = None,
+) -> dict:
     prompt_parts = [BASE_PROMPT]
 
     if rules:
@@ -80,6 +147,13 @@ async def analyze(
     elif document_type:
         prompt_parts.append(f"\nTipo de documento: {document_type}")
 
+    if chunk is not None:
+        prompt_parts.append(CHUNK_PROMPT.format(
+            number=chunk.index + 1,
+            total=total_chunks,
+            outline="\n".join(f"- {h}" for h in headings or []) or "- (sem títulos identificados)",
+        ))
+
     system_prompt = "\n".join(prompt_parts)
 
     response = await client.chat.completions.create(
@@ -3,6 +3,13 @@ from typing import Optional
 
 from openai import AsyncOpenAI
 
+from app.services.ai_agents.formatting_agent import DEFAULT_SECTIONS
+from app.services.executor import run_cpu
+from app.utils.section_diff import PREAMBLE_TITLE, diff_sections
+
+# Known headings of every document type, used to find section boundaries
+_SECTION_NAMES = [name for names in DEFAULT_SECTIONS.values() for name in names]
+
 BASE_PROMPT_NEW = """Você é um especialista em registro de alterações de documentos corporativos.
 Analise o novo documento a seguir e gere um resumo do conteúdo.
 
@@ -58,49 +65,160 @@ REGRAS IMPORTANTES:
 
 Apenas retorne o JSON, sem texto adicional."""
 
+SUMMARY_PROMPT = """Você é um especialista em registro de alterações de documentos corporativos.
+A seguir está a lista das seções alteradas entre a versão anterior e a nova versão de um documento,
+já calculada por comparação automática (tipo de alteração e trechos antes/depois).
+
+Escreva:
+1. Um breve resumo geral das alterações (2 a 4 frases)
+2. Para cada seção, uma descrição curta e objetiva da alteração
+
+Retorne um objeto JSON com a seguinte estrutura:
+{
+    "summary": "Resumo geral das alterações entre as versões",
+    "sections": [
+        {
+            "section": "Nome da seção exatamente como recebido",
+            "description": "Descrição da alteração"
+        }
+    ]
+}
+
+REGRAS IMPORTANTES:
+- Responda SEMPRE em português brasileiro (pt-BR)
+- Baseie-se apenas nas alterações listadas; não invente alterações
+- Mantenha as chaves do JSON em inglês (summary, sections, section, description)
+
+Apenas retorne o JSON, sem texto adicional."""
+
+NO_CHANGES_SUMMARY = "Nenhuma alteração de conteúdo entre as versões."
+
+
+async def compute_section_diff(new_text: str, old_text: str) -> list[dict]:
+    """Local section diff, run in the process pool (difflib is CPU-bound on long documents)."""
+    return await run_cpu(diff_sections, old_text, new_text, _SECTION_NAMES)
+
+
+def _only_preamble(sections: list[dict]) -> bool:
+    """True when no section heading was matched, so every change was filed under the preamble."""
+    return bool(sections) and all(sec["section"] == PREAMBLE_TITLE for sec in sections)
+
+
+async def _compare_with_model(client: AsyncOpenAI, new_text: str, old_text: str) -> dict:
+    response = await client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": BASE_PROMPT_COMPARE},
+            {"role": "user", "content": (
+                f"PREVIOUS VERSION:\n\n{old_text}\n\n"
+                f"---\n\n"
+                f"NEW VERSION:\n\n{new_text}"
+            )},
+        ],
+        temperature=0.2,
+        response_format={"type": "json_object"},
+    )
+    result = json.loads(response.choices[0].message.content)
+    if "diff_content" not in result:
+        result["diff_content"] = {"sections": []}
+    if "summary" not in result:
+        result["summary"] = "Changelog generated."
+    return result
+
+
+def _local_summary(sections: list[dict]) -> str:
+    if not sections:
+        return NO_CHANGES_SUMMARY
+    by_type: dict[str, list[str]] = {}
+    for sec in sections:
+        by_type.setdefault(sec["change_type"], []).append(sec["section"])
+    labels = {"added": "Seções incluídas", "removed": "Seções excluídas", "modified": "Seções alteradas"}
+    return " ".join(
+        f"{labels[change_type]}: {', '.join(dict.fromkeys(names))}."
+        for change_type, names in by_type.items()
+    )
+
 
 async def generate_changelog(
     client: AsyncOpenAI,
     new_text: str,
     old_text: Optional[str] = None,
+    sections: Optional[list[dict]] = None,
 ) -> dict:
-    """Generate a changelog comparing two document versions using OpenAI."""
+    """Generate a changelog comparing two document versions.
+
+    Revisions are diffed locally (compute_section_diff, or the precomputed
+    `sections`); the model only writes the summary and descriptions for the
+    changed sections, and is not called at all when nothing changed. When no
+    section heading could be matched (every change lands in the preamble) the
+    model compares the full texts instead.
+    """
     if old_text is None:
         # New document - generate content summary
-        system_prompt = BASE_PROMPT_NEW
-        user_content = f"New document content:\n\n{new_text}"
-    else:
-        # Compare versions
-        system_prompt = BASE_PROMPT_COMPARE
-        user_content = (
-            f"PREVIOUS VERSION:\n\n{old_text}\n\n"
-            f"---\n\n"
-            f"NEW VERSION:\n\n{new_text}"
+        response = await client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": BASE_PROMPT_NEW},
+                {"role": "user", "content": f"New document content:\n\n{new_text}"},
+            ],
+            temperature=0.2,
+            response_format={"type": "json_object"},
         )
-
+        result = json.loads(response.choices[0].message.content)
+        if "diff_content" not in result:
+            result["diff_content"] = {"sections": []}
+        if "summary" not in result:
+            result["summary"] = "Changelog generated."
+        return result
+
+    if sections is None:
+        sections = await compute_section_diff(new_text, old_text)
+    if not sections:
+        return {"diff_content": {"sections": []}, "summary": NO_CHANGES_SUMMARY}
+    if _only_preamble(sections):
+        return await _compare_with_model(client, new_text, old_text)
+
+    sections = [dict(sec) for sec in sections]  # shared with the mock fallback
+    changes = [
+        {k: sec[k] for k in ("section", "change_type", "old_content_snippet", "new_content_snippet")}
+        for sec in sections
+    ]
     response = await client.chat.completions.create(
         model="gpt-4o",
         messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_content},
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": json.dumps(changes, ensure_ascii=False, indent=2)},
         ],
         temperature=0.2,
         response_format={"type": "json_object"},
     )
+    result = json.loads(response.choices[0].message.content)
 
-    content = response.choices[0].message.content
-    result = json.loads(content)
+    descriptions = {
+        item.get("section"): item.get("description")
+        for item in result.get("sections", [])
+        if isinstance(item, dict) and item.get("description")
+    }
+    for sec in sections:
+        if sec["section"] in descriptions:
+            sec["description"] = descriptions[sec["section"]]
 
-    if "diff_content" not in result:
-        result["diff_content"] = {"sections": []}
-    if "summary" not in result:
-        result["summary"] = "Changelog generated."
+    return {
+        "diff_content": {"sections": sections},
+        "summary": result.get("summary") or _local_summary(sections),
+    }
 
-    return result
 
+def get_mock_changelog(
+    new_text: str,
+    old_text: Optional[str] = None,
+    sections: Optional[list[dict]] = None,
+) -> dict:
+    """Return a changelog without the model: the local section diff with a generated summary.
 
-def get_mock_changelog(new_text: str, old_text: Optional[str] = None) -> dict:
-    """Return a mock changelog for testing."""
+    Async callers pass the result of compute_section_diff as `sections` so the
+    diff does not run on the event loop.
+    """
     if old_text is None:
         return {
             "diff_content": {
@@ -115,17 +233,9 @@ def get_mock_changelog(new_text: str, old_text: Optional[str] = None) -> dict:
             "summary": "Initial document version. All content is new.",
         }
 
+    if sections is None:
+        sections = diff_sections(old_text, new_text, _SECTION_NAMES)
     return {
-        "diff_content": {
-            "sections": [
-                {
-                    "section": "Content",
-                    "change_type": "modified",
-                    "description": "Document content has been updated.",
-                    "old_content_snippet": old_text[:200] if old_text else "",
-                    "new_content_snippet": new_text[:200] if new_text else "",
-                }
-            ]
-        },
-        "summary": "Document has been updated with new content.",
+        "diff_content": {"sections": sections},
+        "summary": _local_summary(sections),
     }
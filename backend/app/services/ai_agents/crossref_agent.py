@@ -1,8 +1,36 @@
 import json
+import re
 from typing import Optional
 
 from openai import AsyncOpenAI
 
+from app.config import settings
+from app.services.ai_agents.formatting_agent import DEFAULT_SECTIONS, PROCEDURAL_SECTIONS
+from app.services.document_parser import TABLE_CELL_SEPARATOR
+from app.utils.paragraph_diff import split_paragraphs
+from app.utils.chunker import normalize_heading
+from app.utils.section_diff import split_into_sections
+from app.utils.section_tree import find_section, section_body
+
+# Document codes in running text: with the revision as in coding_service (PQ-001.02) or
+# without it, as the templates cite them ("RQ-001: Registro de Treinamento")
+CODE_REFERENCE = re.compile(r"\b(PQ|IT|RQ)-(\d{3})(?:\.(\d{2}))?\b")
+# Item numbering in front of a citation ("2.1 ", "a) ")
+_ITEM_NUMBER = re.compile(r"^\s*(?:\d+(?:\.\d+)*[\.\)]?|[a-z]\))\s*")
+_DESCRIPTION_CHARS = 120
+
+_REFERENCES_SECTION = normalize_heading("Documentos Complementares")
+_SECTION_NAMES = [name for names in DEFAULT_SECTIONS.values() for name in names]
+_KNOWN_SECTIONS = {normalize_heading(name) for name in _SECTION_NAMES}
+# Lines in the references section that do not cite anything
+_NO_REFERENCE = re.compile(r"^(n[ãa]o se aplica|n/?a|nenhum|-+|—)\.?$", re.IGNORECASE)
+
+# Digest of a cited document: purpose, outline and first line of each main step
+_PURPOSE_SECTION = normalize_heading("Objetivo e Abrangência")
+_STEP_SECTIONS = {normalize_heading(name) for names in PROCEDURAL_SECTIONS.values() for name in names}
+_DIGEST_PURPOSE_CHARS = 300
+_DIGEST_STEP_CHARS = 120
+
 EXTRACT_PROMPT = """Você é um especialista em documentos corporativos (procedimentos, instruções de trabalho).
 
 Analise o texto de um documento do tipo PQ (Procedimento da Qualidade) e extraia TODOS os documentos
@@ -31,7 +59,7 @@ VALIDATE_PROMPT = """Você é um auditor de documentos corporativos especializad
 
 Você receberá:
 1. O texto de uma PQ (Procedimento da Qualidade)
-2. Uma lista de documentos referenciados com seus conteúdos reais
+2. Uma lista de documentos referenciados com um resumo de seus conteúdos reais (objetivo, seções e principais passos)
 
 Para cada documento referenciado, verifique:
 A) Se ele é MENCIONADO no corpo do texto da PQ (especialmente na seção "3. Descrição de Atividades" ou seções similares de conteúdo operacional)
@@ -60,6 +88,116 @@ REGRAS:
 Apenas retorne o JSON, sem texto adicional."""
 
 
+def references_section(text: str, section_tree: Optional[list[dict]] = None) -> Optional[str]:
+    """Body of the "Documentos Complementares" section, if the text has one.
+
+    Taken from the stored section tree when given, else found by splitting the text.
+    """
+    if section_tree:
+        node = find_section(section_tree, _REFERENCES_SECTION)
+        return section_body(text, node) if node is not None else None
+    for heading, body in split_into_sections(text, _SECTION_NAMES):
+        if normalize_heading(heading) == _REFERENCES_SECTION:
+            return body
+    return None
+
+
+def find_cited_codes(text: str, own_code: Optional[tuple[str, int]] = None) -> list[dict]:
+    """One reference per distinct document code in text, skipping own_code ((type, number) of the citing document).
+
+    Each has its parsed type and sequential number, so citations of any
+    revision resolve to the same document.
+    """
+    references = []
+    seen = {own_code} if own_code else set()
+    for match in CODE_REFERENCE.finditer(text):
+        key = (match.group(1), int(match.group(2)))
+        if key in seen:
+            continue
+        seen.add(key)
+        code = match.group(0)
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        line_end = text.find("\n", match.end())
+        line = text[line_start:line_end if line_end != -1 else len(text)]
+        description = _clip(_ITEM_NUMBER.sub("", line.replace(code, "")).strip(" \t-–—:;."), _DESCRIPTION_CHARS)
+        references.append({
+            "code_or_title": code,
+            "description": description,
+            "document_type": key[0],
+            "sequential_number": key[1],
+        })
+    return references
+
+
+def extract_references_local(
+    text: str,
+    section_tree: Optional[list[dict]] = None,
+    own_code: Optional[tuple[str, int]] = None,
+) -> Optional[tuple[list[dict], list[str]]]:
+    """Deterministically extract the citations of the references section.
+
+    Returns (references, title_only_lines): the codes cited in "Documentos
+    Complementares" (see find_cited_codes) and the lines of that section
+    that cite a document by title only. Returns None when the text has no
+    references section, so the caller can fall back to the model.
+    """
+    section = references_section(text, section_tree)
+    if section is None:
+        return None
+
+    title_only = []
+    for line in section.splitlines():
+        stripped = _ITEM_NUMBER.sub("", line).strip(" \t-–•*")
+        if stripped and not CODE_REFERENCE.search(stripped) and not _NO_REFERENCE.match(stripped):
+            title_only.append(stripped)
+    return find_cited_codes(section, own_code), title_only
+
+
+def _clip(value: str, limit: int) -> str:
+    value = " ".join(value.split())
+    if len(value) <= limit:
+        return value
+    return value[:limit].rsplit(" ", 1)[0] + " …"
+
+
+def build_reference_digest(text: str, max_chars: Optional[int] = None) -> str:
+    """Short, fixed-budget summary of a document for crossref validation prompts.
+
+    Built locally from the section structure: the purpose (start of "Objetivo
+    e Abrangência"), the list of section headings and the first line of each
+    paragraph of the procedural sections. Texts without any of the standard
+    sections fall back to their beginning.
+    """
+    max_chars = max_chars or settings.CROSSREF_DIGEST_MAX_CHARS
+    sections = [(h, b) for h, b in split_into_sections(text or "", _SECTION_NAMES) if h]
+    if not any(normalize_heading(h) in _KNOWN_SECTIONS for h, _ in sections):
+        return _clip(text or "", max_chars)
+
+    lines = []
+    purpose = next((b for h, b in sections if normalize_heading(h) == _PURPOSE_SECTION), "")
+    if purpose.strip():
+        lines.append(f"Objetivo: {_clip(purpose, _DIGEST_PURPOSE_CHARS)}")
+    lines.append("Seções: " + "; ".join(dict.fromkeys(h.rstrip(" :") for h, _ in sections)))
+
+    steps = [
+        _clip(body[s:e].strip().split("\n", 1)[0], _DIGEST_STEP_CHARS)
+        for heading, body in sections
+        if normalize_heading(heading) in _STEP_SECTIONS
+        for s, e in split_paragraphs(body)
+        if TABLE_CELL_SEPARATOR not in body[s:e]
+    ]
+    if steps:
+        lines.append("Principais passos:")
+        lines.extend(f"- {step}" for step in dict.fromkeys(steps))
+
+    digest = ""
+    for line in lines:
+        if len(digest) + len(line) + 1 > max_chars:
+            break
+        digest += line + "\n"
+    return digest.rstrip() or _clip(lines[0], max_chars)
+
+
 async def extract_references(client: AsyncOpenAI, text: str) -> list[dict]:
     """Extract document references from the 'Documentos Complementares' section of a PQ."""
     response = await client.chat.completions.create(
@@ -84,15 +222,16 @@ async def validate_references(
 ) -> dict:
     """Validate cross-references between a PQ and its cited documents.
 
-    references_with_content: list of {cited_document, found_in_system, extracted_text}
+    references_with_content: list of {cited_document, found_in_system, digest}
+    where digest is the output of build_reference_digest for the cited version.
     """
     # Build context for the AI
     ref_sections = []
     for ref in references_with_content:
-        if ref.get("found_in_system") and ref.get("extracted_text"):
+        if ref.get("found_in_system") and ref.get("digest"):
             ref_sections.append(
                 f"--- DOCUMENTO: {ref['cited_document']} ---\n"
-                f"{ref['extracted_text'][:3000]}\n"
+                f"{ref['digest']}\n"
                 f"--- FIM ---"
             )
         else:
@@ -1,9 +1,14 @@
+import asyncio
 import json
 import re
 from typing import Optional
 
 from openai import AsyncOpenAI
 
+from app.config import settings
+from app.utils.chunker import Chunk, chunk_text, normalize_heading
+from app.utils.section_tree import section_body
+
 BASE_PROMPT = """Você é um especialista em formatação de documentos corporativos do sistema de qualidade TEX COTTON.
 Sua tarefa é reestruturar o conteúdo do documento de acordo com a estrutura de seções do tipo de documento.
 
@@ -109,6 +114,13 @@ def _build_sections_block(document_type: Optional[str], sections: Optional[list[
     return "\n".join(lines)
 
 
+CHUNK_PROMPT = """
+ATENÇÃO: o documento é longo e foi dividido em {total} trechos. Este é o trecho {number} de {total}.
+- Retorne APENAS as seções cujo conteúdo aparece neste trecho (não inclua seções vazias)
+- Use exatamente os títulos de seção da estrutura acima
+- Preencha metadata apenas se a informação aparecer neste trecho"""
+
+
 async def restructure(
     client: AsyncOpenAI,
     text: str,
@@ -116,7 +128,90 @@ async def restructure(
     document_type: Optional[str] = None,
     sections: Optional[list[str]] = None,
 ) -> dict:
-    """Restructure document content according to a template using OpenAI."""
+    """Restructure document content according to a template using OpenAI.
+
+    Documents above AI_CHUNK_MAX_TOKENS are restructured chunk by chunk
+    concurrently and the resulting sections merged by title.
+    """
+    section_names = sections or DEFAULT_SECTIONS.get(document_type or "PQ", [])
+    chunks = chunk_text(text, settings.AI_CHUNK_MAX_TOKENS, section_names)
+    if len(chunks) == 1:
+        return await _restructure_chunk(client, text, template_config, document_type, sections)
+
+    results = await asyncio.gather(*[
+        _restructure_chunk(client, chunk.text, template_config, document_type, sections, chunk, len(chunks))
+        for chunk in chunks
+    ])
+    return merge_restructures(list(results), document_type, section_names)
+
+
+_STEP_NUMBER = re.compile(r"^(\s*)(\d+)((?:\.\d+)*[\.\)]?\s)")
+
+
+def _continue_numbering(content: str, offset: int) -> str:
+    """Shift the top-level step numbers of a procedural section by offset (2.1 → 5.1)."""
+    if not offset:
+        return content
+    return "\n".join(
+        _STEP_NUMBER.sub(lambda m: f"{m.group(1)}{int(m.group(2)) + offset}{m.group(3)}", line)
+        for line in content.split("\n")
+    )
+
+
+def _last_step_number(content: str) -> int:
+    numbers = [int(m.group(2)) for line in content.split("\n") if (m := _STEP_NUMBER.match(line))]
+    return max(numbers, default=0)
+
+
+def merge_restructures(
+    results: list[dict],
+    document_type: Optional[str],
+    section_names: list[str],
+) -> dict:
+    """Merge per-chunk restructures into one document.
+
+    Sections with the same title are concatenated in chunk order; procedural
+    sections continue their step numbering across chunks. Template sections
+    come first in template order, followed by any extra sections in order of
+    first appearance.
+    """
+    proc_secs = PROCEDURAL_SECTIONS.get(document_type or "", set())
+    merged: dict[str, dict] = {}
+    for result in results:
+        for sec in result.get("sections", []):
+            title = (sec.get("title") or "").strip()
+            content = (sec.get("content") or "").strip()
+            if title not in merged:
+                merged[title] = {"title": title, "content": content, "level": sec.get("level", 1)}
+                continue
+            if not content:
+                continue
+            entry = merged[title]
+            if title in proc_secs:
+                content = _continue_numbering(content, _last_step_number(entry["content"]))
+            entry["content"] = f"{entry['content']}\n{content}" if entry["content"] else content
+
+    ordered = [merged.pop(name, {"title": name, "content": "", "level": 1}) for name in section_names]
+    ordered.extend(merged.values())
+
+    metadata: dict = {}
+    for result in results:
+        for key, value in (result.get("metadata") or {}).items():
+            if value and not metadata.get(key):
+                metadata[key] = value
+
+    return {"sections": ordered, "metadata": metadata}
+
+
+async def _restructure_chunk(
+    client: AsyncOpenAI,
+    text: str,
+    template_config: Optional[dict],
+    document_type: Optional[str],
+    sections: Optional[list[str]],
+    chunk: Optional[Chunk] = None,
+    total_chunks: int = 1,
+) -> dict:
     sections_block = _build_sections_block(document_type, sections)
     prompt = BASE_PROMPT.format(sections_block=sections_block)
     prompt_parts = [prompt]
@@ -129,6 +224,9 @@ async def restructure(
         prompt_parts.append(f"\nDocument type: {document_type}")
         prompt_parts.append(f"Organize the content strictly into the {document_type} section structure above.")
 
+    if chunk is not None:
+        prompt_parts.append(CHUNK_PROMPT.format(number=chunk.index + 1, total=total_chunks))
+
     system_prompt = "\n".join(prompt_parts)
 
     response = await client.chat.completions.create(
@@ -162,12 +260,44 @@ def _number_steps(text: str) -> str:
     return "\n".join(numbered)
 
 
+def _sections_from_tree(text: str, section_tree: list[dict], section_names: list[str]) -> Optional[dict[str, str]]:
+    """Content of each expected section taken from the parsed section tree.
+
+    Top-level sections that match no expected name, and the text before the
+    first heading, stay with the preceding expected section so nothing is
+    dropped. Returns None when no heading matches.
+    """
+    expected = {normalize_heading(name): name for name in section_names}
+    if not any(normalize_heading(node["title"]) in expected for node in section_tree):
+        return None
+
+    contents: dict[str, list[str]] = {name: [] for name in section_names}
+    current = section_names[0]
+    preamble = text[:section_tree[0]["start"]].strip() if section_tree else ""
+    if preamble:
+        contents[current].append(preamble)
+    for node in section_tree:
+        name = expected.get(normalize_heading(node["title"]))
+        if name is not None:
+            current = name
+            contents[current].append(section_body(text, node).strip())
+        else:
+            contents[current].append(text[node["start"]:node["end"]].strip())
+    return {name: "\n\n".join(part for part in parts if part) for name, parts in contents.items()}
+
+
 def get_mock_restructure(
     text: str,
     document_type: Optional[str] = None,
     sections: Optional[list[str]] = None,
+    section_tree: Optional[list[dict]] = None,
 ) -> dict:
-    """Return a mock restructured document organized by document type sections."""
+    """Return a mock restructured document organized by document type sections.
+
+    Content is mapped by heading when the version has a section tree whose
+    headings match the expected sections; otherwise paragraphs are
+    distributed across the sections.
+    """
     paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
 
     # Use provided sections, or fall back to defaults
@@ -176,7 +306,13 @@ def get_mock_restructure(
     else:
         section_names = DEFAULT_SECTIONS.get(document_type or "PQ", DEFAULT_SECTIONS["PQ"])
 
-    if not paragraphs:
+    from_tree = _sections_from_tree(text, section_tree, section_names) if section_tree else None
+    if from_tree is not None:
+        result_sections = [
+            {"title": name, "content": content, "level": 1}
+            for name, content in from_tree.items()
+        ]
+    elif not paragraphs:
         result_sections = [
             {"title": name, "content": "", "level": 1}
             for name in section_names
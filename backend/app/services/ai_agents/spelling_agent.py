@@ -1,8 +1,19 @@
+import asyncio
 import json
+import logging
+import time
 from typing import Optional
 
 from openai import AsyncOpenAI
 
+from app.config import settings
+from app.services.ai_agents.formatting_agent import DEFAULT_SECTIONS
+from app.services.spell_checker import get_spell_checker
+from app.utils.chunker import Chunk, chunk_text, rejoin
+from app.utils.text_patch import apply_edits
+
+logger = logging.getLogger(__name__)
+
 BASE_PROMPT = """Você é um revisor especialista em língua portuguesa (pt-BR) para documentos corporativos.
 
 Analise o texto a seguir e identifique:
@@ -56,21 +67,263 @@ REGRAS IMPORTANTES:
 
 Apenas retorne o JSON, sem texto adicional."""
 
+PATCH_PROMPT = """Você é um revisor especialista em língua portuguesa (pt-BR) para documentos corporativos.
+
+Analise o texto a seguir e identifique:
+
+1. **ERROS DE ORTOGRAFIA** (obrigatórios de corrigir):
+   - Palavras grafadas incorretamente
+   - Acentuação incorreta ou ausente
+   - Erros de concordância gramatical
+   - Uso incorreto de crase, hífen, etc.
+
+2. **SUGESTÕES DE CLAREZA** (opcionais, o usuário pode ignorar):
+   - Frases ambíguas ou confusas
+   - Jargão desnecessário que pode ser simplificado
+   - Frases muito longas que poderiam ser divididas
+   - Redundâncias
+
+NÃO reescreva o texto. Retorne apenas a lista de edições, em JSON:
+{
+    "spelling_errors": [
+        {
+            "original": "trecho exato do texto que contém o erro",
+            "corrected": "o mesmo trecho corrigido",
+            "context": "a frase completa do texto em que o trecho aparece, copiada exatamente"
+        }
+    ],
+    "clarity_suggestions": [
+        {
+            "original": "trecho exato do texto",
+            "suggested": "versão sugerida mais clara",
+            "reason": "breve explicação da melhoria",
+            "context": "a frase completa do texto em que o trecho aparece, copiada exatamente"
+        }
+    ]
+}
+
+REGRAS IMPORTANTES:
+- "original" e "context" devem ser cópias EXATAS do texto (mesmas letras, acentos, pontuação e espaços)
+- Use o menor trecho que contenha o erro (normalmente uma ou poucas palavras)
+- Uma edição por ocorrência: se o mesmo erro aparece duas vezes, retorne duas edições com seus contextos
+- Considere terminologia técnica corporativa como correta (siglas como PQ, IT, RQ, EPI, NR, etc.)
+- Não altere nomes próprios, siglas ou códigos de documentos
+- Se o texto estiver claro e bem escrito, retorne clarity_suggestions como array vazio
+- NÃO invente sugestões de clareza apenas para ter algo a dizer
+- Prefira retornar menos sugestões de alta qualidade do que muitas sugestões irrelevantes
+
+Apenas retorne o JSON, sem texto adicional."""
+
 SPELLING_ONLY_SUFFIX = """
 
 ATENÇÃO: Nesta iteração, avalie APENAS erros de ORTOGRAFIA.
 Ignore completamente sugestões de clareza — retorne clarity_suggestions como array vazio."""
 
 
+CHUNK_SUFFIX = """
+
+ATENÇÃO: o texto abaixo é o trecho {number} de {total} de um documento longo.
+O campo corrected_text deve conter o trecho COMPLETO revisado, e nada além dele."""
+
+
 async def review_spelling_clarity(
     client: AsyncOpenAI,
     text: str,
     spelling_only: bool = False,
 ) -> dict:
-    """Review text for spelling errors and clarity issues using OpenAI."""
+    """Review text for spelling errors and clarity issues using OpenAI.
+
+    Texts above AI_CHUNK_MAX_TOKENS are reviewed section by section
+    concurrently; corrected chunks are stitched back in order.
+    """
+    all_sections = [name for names in DEFAULT_SECTIONS.values() for name in names]
+    chunks = chunk_text(text, settings.AI_CHUNK_MAX_TOKENS, all_sections)
+    if len(chunks) == 1:
+        return await _review_chunk(client, text, spelling_only)
+
+    results = await asyncio.gather(*[
+        _review_chunk(client, chunk.text, spelling_only, chunk, len(chunks)) for chunk in chunks
+    ])
+    return merge_reviews(chunks, list(results))
+
+
+async def review_spans(
+    client: AsyncOpenAI,
+    text: str,
+    spans: list[tuple[int, int]],
+    spelling_only: bool = False,
+) -> dict:
+    """Review only text[start:end] for each span and stitch the corrections into text.
+
+    Text outside the spans is kept verbatim; positions in the findings are
+    shifted to be relative to the whole text.
+    """
+    results = await asyncio.gather(*[
+        review_spelling_clarity(client, text[start:end], spelling_only) for start, end in spans
+    ])
+
+    parts = []
+    pos = 0
+    spelling_errors, clarity_suggestions = [], []
+    for (start, end), result in zip(spans, results):
+        original = text[start:end]
+        trailing = original[len(original.rstrip()):]
+        parts.append(text[pos:start])
+        parts.append(result["corrected_text"].strip() + trailing)
+        pos = end
+        spelling_errors.extend(_offset_position(item, start) for item in result["spelling_errors"])
+        clarity_suggestions.extend(_offset_position(item, start) for item in result["clarity_suggestions"])
+    parts.append(text[pos:])
+
+    return {
+        "corrected_text": "".join(parts),
+        "spelling_errors": spelling_errors,
+        "clarity_suggestions": clarity_suggestions,
+        "has_spelling_errors": len(spelling_errors) > 0,
+        "has_clarity_suggestions": len(clarity_suggestions) > 0,
+    }
+
+
+def _offset_position(item: dict, offset: int) -> dict:
+    """Shift a chunk-relative numeric position to a document-relative one."""
+    position = item.get("position")
+    if isinstance(position, int) or (isinstance(position, str) and position.strip().isdigit()):
+        item = {**item, "position": int(position) + offset}
+    return item
+
+
+def merge_reviews(chunks: list[Chunk], results: list[dict]) -> dict:
+    """Combine per-chunk reviews into one, in document order."""
+    spelling_errors = [
+        _offset_position(item, chunk.start)
+        for chunk, result in zip(chunks, results)
+        for item in result["spelling_errors"]
+    ]
+    clarity_suggestions = [
+        _offset_position(item, chunk.start)
+        for chunk, result in zip(chunks, results)
+        for item in result["clarity_suggestions"]
+    ]
+    return {
+        "corrected_text": rejoin(chunks, [result["corrected_text"] for result in results]),
+        "spelling_errors": spelling_errors,
+        "clarity_suggestions": clarity_suggestions,
+        "has_spelling_errors": len(spelling_errors) > 0,
+        "has_clarity_suggestions": len(clarity_suggestions) > 0,
+    }
+
+
+async def _review_chunk(
+    client: AsyncOpenAI,
+    text: str,
+    spelling_only: bool,
+    chunk: Optional[Chunk] = None,
+    total_chunks: int = 1,
+) -> dict:
+    checker = get_spell_checker() if spelling_only else None
+    if checker and checker.is_clean(text):
+        # Every word is in the local dictionary: no model call needed
+        return _clean_review(text)
+
+    started = time.perf_counter()
+    result = None
+    if settings.SPELLING_PATCH_MODE:
+        result = await _review_chunk_patch(client, text, spelling_only, chunk, total_chunks)
+    if result is None:
+        result = await _review_chunk_full(client, text, spelling_only, chunk, total_chunks)
+    if checker and checker.ready:
+        checker.record_llm_call(time.perf_counter() - started)
+    return result
+
+
+async def _review_chunk_patch(
+    client: AsyncOpenAI,
+    text: str,
+    spelling_only: bool,
+    chunk: Optional[Chunk] = None,
+    total_chunks: int = 1,
+) -> Optional[dict]:
+    """Ask only for edits and apply them locally.
+
+    Returns None (caller falls back to the full-text review) when the answer
+    is malformed or a spelling fix cannot be placed unambiguously in the text.
+    """
+    prompt = PATCH_PROMPT
+    if spelling_only:
+        prompt += SPELLING_ONLY_SUFFIX
+    if chunk is not None:
+        prompt += f"\n\nATENÇÃO: o texto abaixo é o trecho {chunk.index + 1} de {total_chunks} de um documento longo."
+
+    response = await client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": f"Revise o seguinte texto:\n\n{text}"},
+        ],
+        temperature=0.1,
+        response_format={"type": "json_object"},
+    )
+
+    try:
+        result = json.loads(response.choices[0].message.content)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    spelling_edits = result.get("spelling_errors")
+    clarity_edits = [] if spelling_only else result.get("clarity_suggestions") or []
+    if not isinstance(spelling_edits, list) or not isinstance(clarity_edits, list):
+        return None
+
+    spelling = apply_edits(
+        text, [e for e in spelling_edits if isinstance(e, dict)], replacement_key="corrected"
+    )
+    if spelling.conflicts:
+        logger.warning(
+            f"{len(spelling.conflicts)} correções ortográficas não localizadas no texto; "
+            f"usando revisão com texto completo"
+        )
+        return None
+
+    # Clarity suggestions are applied on top of the spelling fixes, so their
+    # anchors get the same fixes first; ones that still do not match are dropped
+    fixes = [{k: e.get(k) for k in ("original", "corrected")} for e in spelling.applied]
+    clarity_edits = [
+        {
+            **e,
+            "original": apply_edits(e.get("original") or "", fixes).text,
+            "context": apply_edits(e.get("context") or "", fixes).text,
+        }
+        for e in clarity_edits
+        if isinstance(e, dict)
+    ]
+    clarity = apply_edits(spelling.text, clarity_edits, replacement_key="suggested")
+    return {
+        "corrected_text": clarity.text,
+        "spelling_errors": [
+            {k: e.get(k) for k in ("original", "corrected", "position", "context")}
+            for e in spelling.applied
+        ],
+        "clarity_suggestions": [
+            {k: e.get(k) for k in ("original", "suggested", "reason", "position")}
+            for e in clarity.applied
+        ],
+        "has_spelling_errors": len(spelling.applied) > 0,
+        "has_clarity_suggestions": len(clarity.applied) > 0,
+    }
+
+
+async def _review_chunk_full(
+    client: AsyncOpenAI,
+    text: str,
+    spelling_only: bool,
+    chunk: Optional[Chunk] = None,
+    total_chunks: int = 1,
+) -> dict:
+    """Ask for the complete corrected text (original mode, used as fallback)."""
     prompt = BASE_PROMPT
     if spelling_only:
         prompt += SPELLING_ONLY_SUFFIX
+    if chunk is not None:
+        prompt += CHUNK_SUFFIX.format(number=chunk.index + 1, total=total_chunks)
 
     response = await client.chat.completions.create(
         model="gpt-4o",
@@ -100,6 +353,16 @@ async def review_spelling_clarity(
     return result
 
 
+def _clean_review(text: str) -> dict:
+    return {
+        "corrected_text": text,
+        "spelling_errors": [],
+        "clarity_suggestions": [],
+        "has_spelling_errors": False,
+        "has_clarity_suggestions": False,
+    }
+
+
 def get_mock_review(text: str, spelling_only: bool = False) -> dict:
     """Return a mock spelling/clarity review when no OpenAI key is available."""
     return {
@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from openai import AsyncOpenAI
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -20,6 +20,12 @@ from app.models.changelog import Changelog
 from app.models.config import AdminConfig
 from app.models.template import DocumentTemplate
 from app.models.text_review import TextReview
+from app.services.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from app.services import reference_graph
+from app.services.document_service import resolve_storage_path
+from app.services.openai_client import AgentClient, get_openai_client
+from app.utils.paragraph_diff import changed_spans
+from app.utils.section_tree import rebuild_section_tree
 from app.services.ai_agents import (
     analysis_agent,
     formatting_agent,
@@ -31,20 +37,29 @@ from app.services.ai_agents import (
 logger = logging.getLogger(__name__)
 
 
-def get_openai_client() -> Optional[AsyncOpenAI]:
-    """Create an OpenAI client if the API key is configured."""
-    if settings.OPENAI_API_KEY:
-        return AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-    return None
-
+async def _call_with_fallback(
+    ai_call,
+    mock_call,
+    agent_type: Optional[str] = None,
+    use_cache: bool = True,
+    version_id: Optional[int] = None,
+) -> dict:
+    """Try calling an AI agent; fall back to mock if no client or on error.
 
-async def _call_with_fallback(ai_call, mock_call) -> dict:
-    """Try calling an AI agent; fall back to mock if no client or on error."""
-    client = get_openai_client()
+    All agents share the process-wide pooled client; agent_type selects the
+    per-agent timeout and namespaces the response cache. Pass use_cache=False
+    to force a fresh completion. Usage of every call is logged against
+    version_id. Rate limiting and retries happen inside AgentClient, so the
+    mock is only used once those are exhausted.
+    """
+    client = get_openai_client(agent_type)
     if client:
         try:
-            return await ai_call(client)
-        except Exception:
+            return await ai_call(
+                AgentClient(client, agent_type, use_cache=use_cache, version_id=version_id)
+            )
+        except Exception as e:
+            logger.warning(f"Agente '{agent_type}' falhou, usando resultado simulado: {type(e).__name__}: {e}")
             return mock_call()
     return mock_call()
 
@@ -142,12 +157,15 @@ Apenas retorne o JSON, sem texto adicional."""
 
 
 async def _validate_content_consistency(
-    old_text: str, new_text: str
+    old_text: str, new_text: str, use_cache: bool = True, version_id: Optional[int] = None
 ) -> dict:
     """Validate that a revision's content is consistent with the original document."""
     result = await _call_with_fallback(
         lambda client: _ai_consistency_check(client, old_text, new_text),
         lambda: _mock_consistency_check(old_text, new_text),
+        agent_type="consistency",
+        use_cache=use_cache,
+        version_id=version_id,
     )
     return result
 
@@ -189,59 +207,123 @@ def _mock_consistency_check(old_text: str, new_text: str) -> dict:
 async def _fetch_cited_documents(
     db: AsyncSession, references: list[dict]
 ) -> list[dict]:
-    """Look up cited documents in the database and return their content."""
+    """Look up all cited documents in one query and return a digest of their latest version.
+
+    References with a parsed code are matched on (document_type,
+    sequential_number), so a citation of an older revision still finds the
+    document; title-only references are matched by title substring.
+    """
+    by_code = [r for r in references if r.get("document_type") and r.get("sequential_number") is not None]
+    by_title = [
+        r for r in references
+        if r not in by_code and (r.get("code_or_title") or "").strip()
+    ]
+    if not by_code and not by_title:
+        return []
+
+    conditions = [
+        (Document.document_type == r["document_type"]) & (Document.sequential_number == r["sequential_number"])
+        for r in by_code
+    ] + [Document.title.ilike(f"%{r['code_or_title'].strip()}%") for r in by_title]
+
+    latest = (
+        select(DocumentVersion.document_id, func.max(DocumentVersion.version_number).label("version_number"))
+        .group_by(DocumentVersion.document_id)
+        .subquery()
+    )
+    rows = await db.execute(
+        select(
+            Document.document_type,
+            Document.sequential_number,
+            Document.title,
+            DocumentVersion.extracted_text,
+            DocumentVersion.reference_digest,
+        )
+        .join(latest, latest.c.document_id == Document.id)
+        .join(
+            DocumentVersion,
+            (DocumentVersion.document_id == Document.id)
+            & (DocumentVersion.version_number == latest.c.version_number),
+        )
+        .where(or_(*conditions))
+    )
+    found = rows.all()
+
     results = []
     for ref in references:
-        code_or_title = ref.get("code_or_title", "")
-        if not code_or_title:
+        if ref not in by_code and ref not in by_title:
             continue
-
-        search_pattern = f"%{code_or_title.strip()}%"
-        stmt = (
-            select(Document)
-            .options(selectinload(Document.versions))
-            .where(
-                or_(
-                    Document.code.ilike(search_pattern),
-                    Document.title.ilike(search_pattern),
-                )
+        cited = ref["code_or_title"].strip()
+        if ref in by_code:
+            match = next(
+                (row for row in found
+                 if row.document_type == ref["document_type"] and row.sequential_number == ref["sequential_number"]),
+                None,
             )
-            .limit(1)
-        )
-        row = await db.execute(stmt)
-        doc = row.scalar_one_or_none()
-
-        if doc and doc.versions:
-            latest_version = doc.versions[-1]
-            results.append({
-                "cited_document": code_or_title,
-                "found_in_system": True,
-                "extracted_text": latest_version.extracted_text or "",
-            })
         else:
-            results.append({
-                "cited_document": code_or_title,
-                "found_in_system": False,
-                "extracted_text": None,
-            })
-
+            match = next((row for row in found if cited.lower() in (row.title or "").lower()), None)
+        digest = None
+        if match:
+            # Versions published before the digest existed (or not yet published) get one on the fly
+            digest = match.reference_digest or crossref_agent.build_reference_digest(match.extracted_text or "")
+        results.append({
+            "cited_document": cited,
+            "found_in_system": match is not None,
+            "digest": digest,
+        })
     return results
 
 
 async def _run_crossref_validation(
-    db: AsyncSession, text: str
+    db: AsyncSession,
+    text: str,
+    use_cache: bool = True,
+    version_id: Optional[int] = None,
+    section_tree: Optional[list[dict]] = None,
+    own_code: Optional[tuple[str, int]] = None,
 ) -> list[dict]:
-    """Run cross-reference validation for PQ documents. Returns feedback items."""
-    # Step 1: Extract references from the PQ text
-    references = await _call_with_fallback(
-        lambda client: crossref_agent.extract_references(client, text),
-        lambda: [],
-    )
+    """Run cross-reference validation for PQ documents. Returns feedback items.
+
+    own_code is the (document_type, sequential_number) of the validated
+    document, so it is never reported as a citation of itself.
+    """
+    # Step 1: Extract cited codes locally from "Documentos Complementares"; the
+    # model is only asked about citations made by title alone, or about the
+    # whole text when there is no such section
+    local = crossref_agent.extract_references_local(text, section_tree, own_code)
+    if local is None:
+        references, extract_source = [], text
+        extract_fallback = lambda: crossref_agent.find_cited_codes(text, own_code)
+    else:
+        references, title_only = local
+        extract_source = "2. Documentos Complementares\n" + "\n".join(title_only) if title_only else ""
+        extract_fallback = lambda: []
+    if extract_source:
+        extra = await _call_with_fallback(
+            lambda client: crossref_agent.extract_references(client, extract_source),
+            extract_fallback,
+            agent_type="crossref",
+            use_cache=use_cache,
+            version_id=version_id,
+        )
+        known = {(r["document_type"], r["sequential_number"]) for r in references}
+        if own_code:
+            known.add(own_code)
+        for ref in extra:
+            cited = (ref.get("code_or_title") or "").strip()
+            code = crossref_agent.CODE_REFERENCE.search(cited)
+            if code:
+                ref = {**ref, "code_or_title": code.group(0), "document_type": code.group(1),
+                       "sequential_number": int(code.group(2))}
+            key = (ref["document_type"], ref["sequential_number"]) if code else cited
+            if cited and key not in known:
+                known.add(key)
+                references.append(ref)
 
     if not references:
         return []
 
-    # Step 2: Look up cited documents in the database
+    # Step 2: Look up cited documents in the database (single query)
     refs_with_content = await _fetch_cited_documents(db, references)
 
     # Step 3: Validate with AI
@@ -250,6 +332,9 @@ async def _run_crossref_validation(
             client, text, refs_with_content
         ),
         lambda: crossref_agent.get_mock_crossref(text),
+        agent_type="crossref",
+        use_cache=use_cache,
+        version_id=version_id,
     )
 
     # Convert to feedback items
@@ -289,12 +374,42 @@ async def _run_crossref_validation(
 # Analysis (with consistency check + auto-changelog for revisions)
 # ──────────────────────────────────────────────────────────────
 
-async def run_analysis(db: AsyncSession, version_id: int) -> AIAnalysis:
+async def _skipped_stage() -> None:
+    """Placeholder for a pipeline stage that does not apply to this version."""
+    return None
+
+
+async def _generate_changelog(
+    text: str,
+    old_text: Optional[str],
+    use_cache: bool = True,
+    version_id: Optional[int] = None,
+) -> dict:
+    """Run the changelog agent; the section diff is computed once, in the process pool,
+    and shared by the model call and the mock fallback."""
+    sections = await changelog_agent.compute_section_diff(text, old_text) if old_text is not None else None
+    return await _call_with_fallback(
+        lambda client: changelog_agent.generate_changelog(client, text, old_text, sections),
+        lambda: changelog_agent.get_mock_changelog(text, old_text, sections),
+        agent_type="changelog",
+        use_cache=use_cache,
+        version_id=version_id,
+    )
+
+
+async def run_analysis(db: AsyncSession, version_id: int, use_cache: bool = True) -> AIAnalysis:
     """Run the analysis agent on a document version.
 
     For revisions (version_number > 1):
     - Validates content consistency with the original document
     - Auto-generates changelog comparing with previous version
+
+    The pipeline is staged: all DB reads happen first, then every independent
+    agent (analysis, consistency, changelog, crossref, spelling) runs
+    concurrently, and only after all of them finish are the results merged and
+    written. Each agent keeps its own mock fallback via _call_with_fallback, so
+    one failing agent does not affect the others. use_cache=False bypasses the
+    LLM response cache for every agent call.
     """
     version = await _get_version(db, version_id)
     version.status = "analyzing"
@@ -308,22 +423,39 @@ async def run_analysis(db: AsyncSession, version_id: int) -> AIAnalysis:
         category_id = doc.category_id if doc else None
         document_type = doc.document_type if doc else None
 
-        # Get rules from admin config
+        # Stage 1: reads
         rules = await _get_admin_config(db, "analysis_rules", category_id)
-
-        # Run standard analysis
-        result = await _call_with_fallback(
-            lambda client: analysis_agent.analyze(client, text, rules=rules, document_type=document_type),
-            lambda: analysis_agent.get_mock_analysis(text),
-        )
-
-        # For revisions: validate content consistency + auto-generate changelog
         prev_version = await _get_previous_version(db, version)
-        if prev_version and prev_version.extracted_text:
-            old_text = prev_version.extracted_text
+        old_text = prev_version.extracted_text if prev_version else None
+
+        # Stage 2: agents, in parallel. The crossref pipeline is the only stage
+        # that touches the session (read-only lookups), so sharing it is safe.
+        result, consistency, changelog_result, crossref_items, spelling_result = await asyncio.gather(
+            _call_with_fallback(
+                lambda client: analysis_agent.analyze(client, text, rules=rules, document_type=document_type),
+                lambda: analysis_agent.get_mock_analysis(text),
+                agent_type="analysis",
+                use_cache=use_cache,
+                version_id=version_id,
+            ),
+            _validate_content_consistency(old_text, text, use_cache, version_id) if old_text else _skipped_stage(),
+            _generate_changelog(text, old_text, use_cache, version_id) if old_text else _skipped_stage(),
+            _run_crossref_validation(
+                db, text, use_cache, version_id, version.section_tree,
+                (doc.document_type, doc.sequential_number) if doc else None,
+            )
+            if document_type == "PQ" else _skipped_stage(),
+            _call_with_fallback(
+                lambda client: spelling_agent.review_spelling_clarity(client, text),
+                lambda: spelling_agent.get_mock_review(text),
+                agent_type="spelling",
+                use_cache=use_cache,
+                version_id=version_id,
+            ),
+        )
 
-            # Content consistency validation
-            consistency = await _validate_content_consistency(old_text, text)
+        # Stage 3: merge results and write
+        if consistency is not None:
             result["consistency_check"] = consistency
 
             if not consistency.get("is_consistent", True):
@@ -338,12 +470,7 @@ async def run_analysis(db: AsyncSession, version_id: int) -> AIAnalysis:
                     "suggestion": warning_msg,
                 })
 
-            # Auto-generate changelog
-            changelog_result = await _call_with_fallback(
-                lambda client: changelog_agent.generate_changelog(client, text, old_text),
-                lambda: changelog_agent.get_mock_changelog(text, old_text),
-            )
-
+        if changelog_result is not None or version.version_number == 1:
             # Remove existing changelog for this version (prevents duplicates on re-analysis)
             existing_cls = await db.execute(
                 select(Changelog).where(Changelog.version_id == version_id)
@@ -351,6 +478,7 @@ async def run_analysis(db: AsyncSession, version_id: int) -> AIAnalysis:
             for old_cl in existing_cls.scalars().all():
                 await db.delete(old_cl)
 
+        if changelog_result is not None:
             # Save changelog record
             cl = Changelog(
                 version_id=version_id,
@@ -370,12 +498,6 @@ async def run_analysis(db: AsyncSession, version_id: int) -> AIAnalysis:
             }
         elif version.version_number == 1:
             # First version — no changelog needed, just a marker record
-            existing_cls = await db.execute(
-                select(Changelog).where(Changelog.version_id == version_id)
-            )
-            for old_cl in existing_cls.scalars().all():
-                await db.delete(old_cl)
-
             cl = Changelog(
                 version_id=version_id,
                 previous_version_id=None,
@@ -387,10 +509,8 @@ async def run_analysis(db: AsyncSession, version_id: int) -> AIAnalysis:
             version.change_summary = "Versão inicial do documento"
 
         # Cross-reference validation (PQ documents only)
-        if document_type == "PQ":
-            crossref_items = await _run_crossref_validation(db, text)
-            if crossref_items:
-                result["feedback_items"].extend(crossref_items)
+        if crossref_items:
+            result["feedback_items"].extend(crossref_items)
 
         # Save analysis
         analysis = AIAnalysis(
@@ -406,12 +526,6 @@ async def run_analysis(db: AsyncSession, version_id: int) -> AIAnalysis:
         # Update version
         version.ai_approved = result.get("approved")
 
-        # Spelling/clarity review
-        spelling_result = await _call_with_fallback(
-            lambda client: spelling_agent.review_spelling_clarity(client, text),
-            lambda: spelling_agent.get_mock_review(text),
-        )
-
         # Remove existing text reviews for this version (prevents duplicates on re-analysis)
         existing_trs = await db.execute(
             select(TextReview).where(TextReview.version_id == version_id)
@@ -441,6 +555,8 @@ async def run_analysis(db: AsyncSession, version_id: int) -> AIAnalysis:
             if version.document:
                 version.document.status = "in_review"
 
+        await reference_graph.update_document_references(db, version)
+
         await db.flush()
 
         return analysis
@@ -477,6 +593,10 @@ async def get_text_review_history(db: AsyncSession, version_id: int) -> list[Tex
     return list(result.scalars().all())
 
 
+# Above this share of changed text, re-review the whole document in one pass
+INCREMENTAL_REVIEW_MAX_RATIO = 0.6
+
+
 async def submit_user_text(
     db: AsyncSession, version_id: int, user_text: str, skip_clarity: bool = False
 ) -> TextReview:
@@ -495,12 +615,41 @@ async def submit_user_text(
     )
     current_review.resolved_at = datetime.now(timezone.utc)
 
-    # Run spelling-only re-review
-    spelling_result = await _call_with_fallback(
-        lambda client: spelling_agent.review_spelling_clarity(
-            client, user_text, spelling_only=True
-        ),
-        lambda: spelling_agent.get_mock_review(user_text, spelling_only=True),
+    # Run spelling-only re-review, limited to the paragraphs the user changed
+    # relative to the text the AI already corrected
+    baseline = current_review.ai_corrected_text or current_review.original_text or ""
+    spans = changed_spans(baseline, user_text)
+    reviewed_chars = sum(end - start for start, end in spans)
+    if not spans:
+        # Every paragraph is exactly as the AI corrected it
+        spelling_result = {
+            "corrected_text": user_text,
+            "spelling_errors": [],
+            "clarity_suggestions": [],
+            "has_spelling_errors": False,
+            "has_clarity_suggestions": False,
+        }
+    elif reviewed_chars > INCREMENTAL_REVIEW_MAX_RATIO * len(user_text):
+        spelling_result = await _call_with_fallback(
+            lambda client: spelling_agent.review_spelling_clarity(
+                client, user_text, spelling_only=True
+            ),
+            lambda: spelling_agent.get_mock_review(user_text, spelling_only=True),
+            agent_type="spelling",
+            version_id=version_id,
+        )
+    else:
+        spelling_result = await _call_with_fallback(
+            lambda client: spelling_agent.review_spans(
+                client, user_text, spans, spelling_only=True
+            ),
+            lambda: spelling_agent.get_mock_review(user_text, spelling_only=True),
+            agent_type="spelling",
+            version_id=version_id,
+        )
+    logger.info(
+        f"Revisão ortográfica da versão {version_id}: {len(spans)} trechos alterados, "
+        f"{reviewed_chars}/{len(user_text)} caracteres reenviados"
     )
 
     new_review = TextReview(
@@ -519,6 +668,8 @@ async def submit_user_text(
     if not spelling_result.get("has_spelling_errors", False):
         # Spelling is clean — update version text and advance
         version.extracted_text = user_text
+        version.section_tree = rebuild_section_tree(user_text, version.section_tree)
+        version.reference_digest = None
         version.status = "in_review"
         if version.document:
             version.document.status = "in_review"
@@ -547,6 +698,8 @@ async def accept_text_and_advance(db: AsyncSession, version_id: int) -> TextRevi
     current_review.resolved_at = datetime.now(timezone.utc)
 
     version.extracted_text = final_text
+    version.section_tree = rebuild_section_tree(final_text, version.section_tree)
+    version.reference_digest = None
     version.status = "in_review"
     if version.document:
         version.document.status = "in_review"
@@ -570,7 +723,9 @@ async def _get_active_template(db: AsyncSession, document_type: str) -> Optional
     return result.scalars().first()
 
 
-async def run_formatting(db: AsyncSession, version_id: int) -> tuple[DocumentVersion, str, list[str]]:
+async def run_formatting(
+    db: AsyncSession, version_id: int, use_cache: bool = True
+) -> tuple[DocumentVersion, str, list[str]]:
     """Run the formatting agent on a document version.
 
     If an active template exists for the document type, uses template_service
@@ -600,7 +755,12 @@ async def run_formatting(db: AsyncSession, version_id: int) -> tuple[DocumentVer
             lambda client: formatting_agent.restructure(
                 client, text, template_config=template_config, document_type=document_type, sections=sections
             ),
-            lambda: formatting_agent.get_mock_restructure(text, document_type=document_type, sections=sections),
+            lambda: formatting_agent.get_mock_restructure(
+                text, document_type=document_type, sections=sections, section_tree=version.section_tree
+            ),
+            agent_type="formatting",
+            use_cache=use_cache,
+            version_id=version_id,
         )
 
         # Save formatting analysis record
@@ -698,7 +858,7 @@ async def run_formatting(db: AsyncSession, version_id: int) -> tuple[DocumentVer
                     template_path=template_path_for_formatting,
                     structured_content=result,
                     metadata=metadata,
-                    source_docx_path=version.original_file_path,
+                    source_docx_path=resolve_storage_path(version.original_file_path),
                     changelog_entries=changelog_entries,
                     approval_data=approval_data,
                     output_docx_path=docx_path,
@@ -779,10 +939,7 @@ async def run_changelog(db: AsyncSession, version_id: int) -> Changelog:
         old_text = prev_version.extracted_text
         previous_version_id = prev_version.id
 
-    result = await _call_with_fallback(
-        lambda client: changelog_agent.generate_changelog(client, text, old_text),
-        lambda: changelog_agent.get_mock_changelog(text, old_text),
-    )
+    result = await _generate_changelog(text, old_text, version_id=version_id)
 
     # Save changelog
     cl = Changelog(
@@ -858,38 +1015,51 @@ async def _force_set_analysis_failed(version_id: int) -> None:
         )
 
 
-async def run_analysis_background(version_id: int) -> None:
-    """Run AI analysis as a background task with its own DB session.
+def _raise_if_circuit_open() -> None:
+    """Postpone queued AI work while the OpenAI circuit breaker is open."""
+    breaker = get_circuit_breaker()
+    if get_openai_client() is not None and breaker.is_open():
+        raise CircuitOpenError(breaker.retry_after())
 
-    Called from BackgroundTasks after document upload/resubmit.
-    Creates a fresh session because the request session is already closed.
-    Includes a 5-minute timeout to prevent indefinitely stuck tasks.
+
+async def run_analysis_job(version_id: int, use_cache: bool = True) -> None:
+    """Run AI analysis in its own session for the background job queue.
+
+    Raises on failure or timeout so the queue can retry; the queue marks the
+    version as analysis_failed once the last attempt has failed. While the
+    OpenAI circuit is open the job is postponed instead of producing a
+    mock-only analysis.
     """
     from app.database import async_session_factory
 
-    try:
-        async with async_session_factory() as db:
-            try:
-                await asyncio.wait_for(
-                    run_analysis(db, version_id),
-                    timeout=ANALYSIS_TIMEOUT_SECONDS,
-                )
-                await db.commit()
-            except asyncio.TimeoutError:
-                await db.rollback()
-                logger.error(
-                    f"Analysis timed out after {ANALYSIS_TIMEOUT_SECONDS}s "
-                    f"for version {version_id}"
-                )
-                await _force_set_analysis_failed(version_id)
-            except Exception as e:
-                await db.rollback()
-                logger.error(
-                    f"Background analysis failed for version {version_id}: {e}"
-                )
-                await _force_set_analysis_failed(version_id)
-    except Exception as outer_err:
-        logger.critical(
-            f"CRITICAL: Background task crashed for version {version_id}: {outer_err}"
-        )
-        await _force_set_analysis_failed(version_id)
+    _raise_if_circuit_open()
+    async with async_session_factory() as db:
+        try:
+            await asyncio.wait_for(
+                run_analysis(db, version_id, use_cache=use_cache),
+                timeout=ANALYSIS_TIMEOUT_SECONDS,
+            )
+            await db.commit()
+        except asyncio.TimeoutError:
+            await db.rollback()
+            raise TimeoutError(
+                f"Analysis timed out after {ANALYSIS_TIMEOUT_SECONDS}s for version {version_id}"
+            )
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def run_formatting_job(version_id: int, use_cache: bool = True) -> None:
+    """Run formatting in its own session for the background job queue."""
+    from app.database import async_session_factory
+
+    _raise_if_circuit_open()
+    async with async_session_factory() as db:
+        try:
+            await run_formatting(db, version_id, use_cache=use_cache)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
@@ -0,0 +1,141 @@
+"""Records token usage, latency and estimated cost of every OpenAI call.
+
+Calls are buffered in memory and written to ai_usage_logs in batches by a
+background flusher started in the FastAPI lifespan, so instrumentation never
+adds a DB round trip to an agent call.
+"""
+
+import asyncio
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens: (input, output)
+MODEL_PRICES_PER_1M: dict[str, tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+# Hard cap so an unreachable DB cannot grow the buffer without bound
+_MAX_BUFFERED = 10_000
+
+_buffer: list[dict] = []
+_flush_requested: Optional[asyncio.Event] = None
+_flusher_task: Optional[asyncio.Task] = None
+
+
+def estimate_cost_usd(model: Optional[str], tokens_input: int, tokens_output: int) -> Optional[float]:
+    """Estimate the cost of a call from the price table (None for unknown models)."""
+    if not model:
+        return None
+    prices = MODEL_PRICES_PER_1M.get(model)
+    if prices is None:
+        # Dated snapshots such as gpt-4o-2024-08-06 share the base model's price
+        base = next((m for m in sorted(MODEL_PRICES_PER_1M, key=len, reverse=True) if model.startswith(m)), None)
+        prices = MODEL_PRICES_PER_1M.get(base) if base else None
+    if prices is None:
+        return None
+    price_in, price_out = prices
+    return (tokens_input * price_in + tokens_output * price_out) / 1_000_000
+
+
+def record_usage(
+    *,
+    version_id: Optional[int],
+    agent_type: Optional[str],
+    model: Optional[str],
+    tokens_input: int,
+    tokens_output: int,
+    latency_ms: float,
+    cache_hit: bool,
+) -> None:
+    """Buffer one agent call for the next batched write.
+
+    Cache hits keep their token counts (tokens saved) but cost nothing.
+    """
+    _buffer.append({
+        "version_id": version_id,
+        "agent_type": agent_type or "unknown",
+        "model": model or "unknown",
+        "tokens_input": tokens_input,
+        "tokens_output": tokens_output,
+        "latency_ms": round(latency_ms, 2),
+        "cache_hit": cache_hit,
+        "estimated_cost_usd": 0.0 if cache_hit else estimate_cost_usd(model, tokens_input, tokens_output),
+        "created_at": datetime.now(timezone.utc),
+    })
+    if len(_buffer) > _MAX_BUFFERED:
+        dropped = len(_buffer) - _MAX_BUFFERED
+        del _buffer[:dropped]
+        logger.warning(f"Buffer de uso de IA cheio, {dropped} registros descartados")
+    if _flush_requested is not None and len(_buffer) >= settings.AI_USAGE_FLUSH_BATCH_SIZE:
+        _flush_requested.set()
+
+
+async def flush_usage() -> int:
+    """Write all buffered rows in a single transaction. Returns rows written."""
+    from app.database import async_session_factory
+    from app.models.ai_usage_log import AIUsageLog
+
+    if not _buffer:
+        return 0
+    batch = _buffer[:]
+    del _buffer[:len(batch)]
+    try:
+        async with async_session_factory() as db:
+            db.add_all([AIUsageLog(**row) for row in batch])
+            await db.commit()
+    except Exception as e:
+        # Put the rows back for the next attempt (e.g. SQLite busy)
+        _buffer[:0] = batch
+        logger.warning(f"Falha ao gravar uso de IA ({len(batch)} registros): {e}")
+        return 0
+    return len(batch)
+
+
+async def _flusher_loop() -> None:
+    while True:
+        try:
+            await asyncio.wait_for(
+                _flush_requested.wait(), timeout=settings.AI_USAGE_FLUSH_INTERVAL_SECONDS
+            )
+        except asyncio.TimeoutError:
+            pass
+        _flush_requested.clear()
+        await flush_usage()
+
+
+def start_usage_flusher() -> None:
+    """Start the periodic batch writer (called from the FastAPI lifespan)."""
+    global _flush_requested, _flusher_task
+    if _flusher_task is None:
+        _flush_requested = asyncio.Event()
+        _flusher_task = asyncio.create_task(_flusher_loop())
+
+
+async def stop_usage_flusher() -> None:
+    """Stop the batch writer and flush whatever is still buffered."""
+    global _flush_requested, _flusher_task
+    if _flusher_task is not None:
+        _flusher_task.cancel()
+        try:
+            await _flusher_task
+        except asyncio.CancelledError:
+            pass
+        _flusher_task = None
+        _flush_requested = None
+    await flush_usage()
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
@@ -3,20 +3,22 @@
 import logging
 import os
 import re
-import shutil
-import uuid
 from collections import defaultdict
 from datetime import datetime, timezone
+from functools import partial
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.database import after_commit
 from app.models.document import Document
 from app.models.version import DocumentVersion
-from app.services import coding_service
-from app.services.document_parser import extract_text
+from app.services import coding_service, file_store
+from app.services.executor import run_io
 from app.services.master_list_service import add_to_master_list
+from app.services.reference_graph import update_document_references
+from app.services.suggest_index import get_suggest_index
 from app.schemas.bulk_import import (
     ConflictItem,
     GroupedDocument,
@@ -169,7 +171,7 @@ async def _get_existing_codes(db: AsyncSession, codes: list[str]) -> dict[str, t
 
 async def scan_import_folder(db: AsyncSession) -> ScanResponse:
     """Scan the import folder, parse filenames, check for conflicts, return preview."""
-    parsed, errors = _scan_files()
+    parsed, errors = await run_io(_scan_files)
 
     all_codes = [item.code for item in parsed]
     existing = await _get_existing_codes(db, all_codes)
@@ -187,34 +189,10 @@ async def scan_import_folder(db: AsyncSession) -> ScanResponse:
     )
 
 
-def _copy_file_to_storage(src_filename: str) -> str:
-    """Copy a file from the import folder to storage/originals/ with a UUID name.
-    Returns the destination path."""
-    originals_dir = os.path.join(settings.STORAGE_PATH, "originals")
-    os.makedirs(originals_dir, exist_ok=True)
-
-    src_path = os.path.join(IMPORT_DIR, src_filename)
-    ext = os.path.splitext(src_filename)[1]
-    dest_filename = f"{uuid.uuid4().hex}{ext}"
-    dest_path = os.path.join(originals_dir, dest_filename)
-
-    shutil.copy2(src_path, dest_path)
-    return dest_path
-
-
-def _extract_text_safe(file_path: str) -> str:
-    """Extract text from a file, returning empty string on failure."""
-    try:
-        return extract_text(file_path)
-    except Exception as e:
-        logger.warning(f"Não foi possível extrair texto de {file_path}: {e}")
-        return ""
-
-
 async def execute_import(db: AsyncSession, request: ImportRequest) -> ImportResponse:
     """Execute the bulk import: create documents, versions, and master list entries."""
     # Re-scan to get fresh state
-    parsed, _ = _scan_files()
+    parsed, _ = await run_io(_scan_files)
     all_codes = [item.code for item in parsed]
     existing = await _get_existing_codes(db, all_codes)
     grouped = _group_documents(parsed, existing)
@@ -269,26 +247,36 @@ async def execute_import(db: AsyncSession, request: ImportRequest) -> ImportResp
             )
             db.add(document)
             await db.flush()
+            after_commit(db, partial(get_suggest_index().upsert, document.id, document.code, document.title))
 
             # Create DocumentVersions for each revision
             for idx, rev in enumerate(group.revisions):
-                file_path = _copy_file_to_storage(rev.filename)
-                extracted_text = _extract_text_safe(file_path)
+                # Stored by content: re-imported or repeated files are not copied or parsed again
+                stored, _ = await file_store.store_local_file(db, os.path.join(IMPORT_DIR, rev.filename))
+                extracted_text, section_tree = await file_store.get_parsed_content(stored)
 
                 is_latest = (idx == len(group.revisions) - 1)
                 version = DocumentVersion(
                     document_id=document.id,
                     version_number=idx + 1,
-                    original_file_path=file_path,
+                    original_file_path=stored.path,
+                    file_sha256=stored.sha256,
                     extracted_text=extracted_text,
+                    section_tree=section_tree,
                     status="approved" if is_latest else "archived",
                     submitted_at=now,
                     archived_at=None if is_latest else now,
                 )
                 db.add(version)
+                if is_latest:
+                    latest_version = version
 
             await db.flush()
 
+            # Index the citations of the imported text in the reference graph
+            latest_version.document = document
+            await update_document_references(db, latest_version)
+
             # Add to master list
             ml_entry = await add_to_master_list(db, document.id)
 
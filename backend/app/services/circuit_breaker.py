@@ -0,0 +1,122 @@
+"""Circuit breaker around the OpenAI backend, shared by every agent.
+
+After OPENAI_CIRCUIT_FAILURE_THRESHOLD consecutive connection/timeout/5xx
+failures the circuit opens and calls fail immediately (agents fall back to the
+mock, queued analyses are postponed) instead of each waiting for a network
+timeout. After OPENAI_CIRCUIT_RESET_SECONDS one probe request is let through
+(half-open); its outcome closes the circuit or opens it again.
+"""
+
+import logging
+import time
+from typing import Callable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling OpenAI while the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Circuito OpenAI aberto; nova tentativa em {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.short_circuited = 0
+        self.last_error: Optional[str] = None
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 when not open)."""
+        if self.state != OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_seconds - self._clock())
+
+    def is_open(self) -> bool:
+        return self.state == OPEN and self.retry_after() > 0
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpenError."""
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                self.short_circuited += 1
+                raise CircuitOpenError(self.retry_after())
+            self.state = HALF_OPEN
+            logger.info("Circuito OpenAI semiaberto: enviando requisição de teste")
+        if self.state == HALF_OPEN:
+            # Only one probe at a time; everyone else keeps failing fast
+            if self._probe_in_flight:
+                self.short_circuited += 1
+                raise CircuitOpenError(self.reset_seconds)
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("Circuito OpenAI fechado: backend respondeu")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self, error: Exception) -> None:
+        self.consecutive_failures += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        was_probe = self.state == HALF_OPEN
+        self._probe_in_flight = False
+        if was_probe or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+                logger.error(
+                    f"Circuito OpenAI aberto após {self.consecutive_failures} falhas consecutivas: "
+                    f"{self.last_error}"
+                )
+            self.state = OPEN
+            self.opened_at = self._clock()
+
+    def record_neutral(self) -> None:
+        """Release a half-open probe whose outcome says nothing about availability (e.g. 429)."""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state if not (self.state == OPEN and self.retry_after() == 0) else HALF_OPEN,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "times_opened": self.times_opened,
+            "short_circuited_calls": self.short_circuited,
+            "last_error": self.last_error,
+        }
+
+
+_breaker: Optional[CircuitBreaker] = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Return the process-wide breaker for the OpenAI backend."""
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            failure_threshold=settings.OPENAI_CIRCUIT_FAILURE_THRESHOLD,
+            reset_seconds=settings.OPENAI_CIRCUIT_RESET_SECONDS,
+        )
+    return _breaker
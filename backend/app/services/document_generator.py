@@ -1,5 +1,4 @@
 import os
-import subprocess
 from typing import Optional
 
 from docx import Document as DocxDocument
@@ -7,6 +6,8 @@ from docx.shared import Pt, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
 from app.models.version import DocumentVersion
+from app.services.executor import run_cpu
+from app.services.office_pool import convert_document
 
 
 def generate_docx(
@@ -98,42 +99,6 @@ def generate_docx(
     return output_path
 
 
-def convert_to_pdf(docx_path: str, output_path: str) -> str:
-    """Convert a .docx file to PDF using LibreOffice headless."""
-    output_dir = os.path.dirname(output_path)
-    os.makedirs(output_dir, exist_ok=True)
-
-    result = subprocess.run(
-        [
-            "libreoffice",
-            "--headless",
-            "--convert-to",
-            "pdf",
-            "--outdir",
-            output_dir,
-            docx_path,
-        ],
-        capture_output=True,
-        text=True,
-        timeout=60,
-    )
-
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"LibreOffice conversion failed: {result.stderr}"
-        )
-
-    # LibreOffice outputs with the same base name but .pdf extension in output_dir
-    base_name = os.path.splitext(os.path.basename(docx_path))[0]
-    generated_pdf = os.path.join(output_dir, f"{base_name}.pdf")
-
-    # Rename to desired output path if different
-    if generated_pdf != output_path:
-        os.rename(generated_pdf, output_path)
-
-    return output_path
-
-
 async def format_document(
     version: DocumentVersion,
     structured_content: dict,
@@ -152,11 +117,11 @@ async def format_document(
     pdf_path = os.path.join(formatted_dir, f"{base_name}.pdf")
 
     # Generate .docx
-    generate_docx(structured_content, template_config, docx_path)
+    await run_cpu(generate_docx, structured_content, template_config, docx_path)
 
     # Convert to PDF
     try:
-        convert_to_pdf(docx_path, pdf_path)
+        await convert_document(docx_path, pdf_path)
     except Exception:
         # PDF conversion might fail if LibreOffice is not available
         pdf_path = ""
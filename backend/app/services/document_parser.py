@@ -1,24 +1,379 @@
+import asyncio
 import os
-from docx import Document as DocxDocument
+import re
+import zipfile
+from typing import IO, Iterator, Optional
+from xml.etree.ElementTree import iterparse
+
 import fitz  # PyMuPDF
 
+from app.config import settings
+from app.services.executor import run_cpu, run_io
+from app.utils.chunker import detect_headings
+from app.utils.section_tree import build_section_tree
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_HEADER_PART = re.compile(r"^word/header(\d*)\.xml$")
+_FOOTER_PART = re.compile(r"^word/footer(\d*)\.xml$")
+
+# Separator between the cells of a table row in the extracted text
+TABLE_CELL_SEPARATOR = " | "
+
+
+def _docx_heading_styles(archive: zipfile.ZipFile) -> dict[str, int]:
+    """styleId → heading level (1-based) of the paragraph styles in word/styles.xml.
+
+    A style is a heading when it is a built-in "heading N" style, sets an
+    outline level, or is based on such a style.
+    """
+    if "word/styles.xml" not in archive.namelist():
+        return {}
+    levels: dict[str, int] = {}
+    based_on: dict[str, str] = {}
+    with archive.open("word/styles.xml") as stream:
+        for _event, elem in iterparse(stream):
+            if elem.tag != f"{_W}style" or elem.get(f"{_W}type") != "paragraph":
+                continue
+            style_id = elem.get(f"{_W}styleId")
+            name = elem.find(f"{_W}name")
+            outline = elem.find(f"{_W}pPr/{_W}outlineLvl")
+            parent = elem.find(f"{_W}basedOn")
+            heading = re.fullmatch(r"heading (\d)", (name.get(f"{_W}val") or "").lower()) if name is not None else None
+            if heading:
+                levels[style_id] = int(heading.group(1))
+            elif outline is not None and int(outline.get(f"{_W}val", "9")) < 9:
+                levels[style_id] = int(outline.get(f"{_W}val")) + 1
+            elif parent is not None:
+                based_on[style_id] = parent.get(f"{_W}val")
+            elem.clear()
+
+    def resolve(style_id: str, depth: int = 0) -> Optional[int]:
+        if style_id in levels or depth > 10:
+            return levels.get(style_id)
+        return resolve(based_on[style_id], depth + 1) if style_id in based_on else None
+
+    return {style_id: level for style_id in {*levels, *based_on} if (level := resolve(style_id)) is not None}
+
+
+def _iter_part_blocks(
+    stream: IO[bytes], heading_styles: Optional[dict[str, int]] = None
+) -> Iterator[tuple[str, Optional[int]]]:
+    """(text, heading level) blocks of one WordprocessingML part, in document order.
+
+    Body paragraphs yield one block each, with their heading level (from
+    the paragraph style or outline level) or None; a table row yields one
+    block with its non-empty cells joined by TABLE_CELL_SEPARATOR (a nested
+    table ends up inside the cell that holds it). The XML is read with
+    iterparse and every element is cleared once handled, so memory stays
+    bounded by the size of one paragraph or table row rather than the whole
+    part.
+    """
+    heading_styles = heading_styles or {}
+    paragraphs: list[list[str]] = []  # open paragraphs (text boxes nest inside a paragraph)
+    levels: list[Optional[int]] = []  # heading level of each open paragraph
+    cells: list[list[str]] = []       # open table cells: their finished paragraphs
+    rows: list[list[str]] = []        # open table rows: their finished cells
+    skip_depth = 0                    # inside mc:Fallback, a duplicate of the preferred content
+    body = None
+
+    for event, elem in iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _MC_FALLBACK:
+                skip_depth += 1
+            elif skip_depth:
+                pass
+            elif tag == f"{_W}p":
+                paragraphs.append([])
+                levels.append(None)
+            elif tag == f"{_W}tc":
+                cells.append([])
+            elif tag == f"{_W}tr":
+                rows.append([])
+            elif tag in (f"{_W}body", f"{_W}hdr", f"{_W}ftr") and body is None:
+                body = elem
+            continue
+
+        if tag == _MC_FALLBACK:
+            skip_depth -= 1
+        elif skip_depth:
+            pass
+        elif tag == f"{_W}t" and paragraphs:
+            paragraphs[-1].append(elem.text or "")
+        elif tag == f"{_W}tab" and paragraphs:
+            paragraphs[-1].append("\t")
+        elif tag in (f"{_W}br", f"{_W}cr") and paragraphs:
+            paragraphs[-1].append("\n")
+        elif tag == f"{_W}noBreakHyphen" and paragraphs:
+            paragraphs[-1].append("-")
+        elif tag == f"{_W}pStyle" and paragraphs:
+            levels[-1] = heading_styles.get(elem.get(f"{_W}val"), levels[-1])
+        elif tag == f"{_W}outlineLvl" and paragraphs:
+            outline = int(elem.get(f"{_W}val", "9"))
+            levels[-1] = outline + 1 if outline < 9 else None
+        elif tag == f"{_W}p":
+            text = "".join(paragraphs.pop()).strip()
+            level = levels.pop()
+            if text:
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield text, level
+        elif tag == f"{_W}tc":
+            text = " ".join(cells.pop())
+            if rows:
+                rows[-1].append(text)
+        elif tag == f"{_W}tr":
+            text = TABLE_CELL_SEPARATOR.join(cell for cell in rows.pop() if cell)
+            if text:
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield text, None
+
+        elem.clear()
+        if body is not None and not paragraphs and not cells:
+            # Drop the emptied shells of finished top-level blocks as well
+            del body[:]
+
+
+def _part_sort_key(name: str, pattern: re.Pattern) -> int:
+    number = pattern.match(name).group(1)
+    return int(number) if number else 0
+
+
+def extract_docx_blocks(file_path: str) -> list[tuple[str, Optional[int]]]:
+    """(text, heading level) blocks of the body of a .docx file: paragraphs and table rows.
+
+    Streams word/document.xml straight from the zip instead of building the
+    python-docx object model. Page headers and footers are not part of the
+    body; see extract_header_footer_text.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open("word/document.xml") as stream:
+            return list(_iter_part_blocks(stream, _docx_heading_styles(archive)))
+
+
+def _docx_header_footer_blocks(file_path: str) -> list[str]:
+    """Blocks of the header and footer parts; parts repeated across sections are included once."""
+    blocks: list[str] = []
+    with zipfile.ZipFile(file_path) as archive:
+        names = archive.namelist()
+        headers = sorted((n for n in names if _HEADER_PART.match(n)), key=lambda n: _part_sort_key(n, _HEADER_PART))
+        footers = sorted((n for n in names if _FOOTER_PART.match(n)), key=lambda n: _part_sort_key(n, _FOOTER_PART))
+        seen: set[tuple[str, ...]] = set()
+        for name in headers + footers:
+            with archive.open(name) as stream:
+                part_blocks = tuple(text for text, _ in _iter_part_blocks(stream))
+            if part_blocks and part_blocks not in seen:
+                seen.add(part_blocks)
+                blocks.extend(part_blocks)
+    return blocks
+
 
 def extract_text_from_docx(file_path: str) -> str:
-    """Extract all paragraph text from a .docx file."""
-    doc = DocxDocument(file_path)
-    return "\n\n".join(p.text.strip() for p in doc.paragraphs if p.text.strip())
+    """Extract text from a .docx file (see extract_docx_blocks)."""
+    return "\n\n".join(text for text, _ in extract_docx_blocks(file_path))
+
+
+def parse_docx(file_path: str, section_names: Optional[list[str]] = None) -> tuple[str, list[dict]]:
+    """Text of a .docx file and its section tree.
+
+    Paragraphs with a heading style are headings alongside the numbered and
+    known-name lines found in the text (see chunker.detect_headings), so a
+    document that styles only some of its headings keeps the others.
+    """
+    parts = []
+    styled_levels = {}
+    offset = 0
+    for text, level in extract_docx_blocks(file_path):
+        if parts:
+            offset += 2  # "\n\n" separator
+        if level is not None:
+            styled_levels[offset] = level
+        parts.append(text)
+        offset += len(text)
+    text = "\n\n".join(parts)
+    return text, build_section_tree(text, detect_headings(text, section_names, styled_levels=styled_levels))
+
+
+_TEXT = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+_TABLE = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+_OFFICE = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+_STYLE = "{urn:oasis:names:tc:opendocument:xmlns:style:1.0}"
+
+_ODF_PARAGRAPHS = (f"{_TEXT}p", f"{_TEXT}h")
+# Not part of the visible text: deleted text of tracked changes, comments, footnote marks
+_ODF_SKIPPED = (f"{_TEXT}tracked-changes", f"{_OFFICE}annotation", f"{_TEXT}note-citation")
+_ODF_HEADERS = (f"{_STYLE}header", f"{_STYLE}header-first", f"{_STYLE}header-left")
+_ODF_FOOTERS = (f"{_STYLE}footer", f"{_STYLE}footer-first", f"{_STYLE}footer-left")
+
+
+def _odf_inline_text(elem, parts: list[str], nested: list[str]) -> None:
+    """Append the text under elem to parts; paragraphs nested in it (text boxes,
+    footnote bodies) are finished separately into nested."""
+    for child in elem:
+        tag = child.tag
+        if tag == f"{_TEXT}s":
+            parts.append(" " * int(child.get(f"{_TEXT}c", "1")))
+        elif tag == f"{_TEXT}tab":
+            parts.append("\t")
+        elif tag == f"{_TEXT}line-break":
+            parts.append("\n")
+        elif tag in _ODF_PARAGRAPHS:
+            text = _odf_paragraph_text(child, nested)
+            if text:
+                nested.append(text)
+        elif tag not in _ODF_SKIPPED:
+            parts.append(child.text or "")
+            _odf_inline_text(child, parts, nested)
+        parts.append(child.tail or "")
+
+
+def _odf_paragraph_text(elem, nested: list[str]) -> str:
+    parts = [elem.text or ""]
+    _odf_inline_text(elem, parts, nested)
+    return "".join(parts).strip()
+
+
+def _iter_odf_blocks(stream: IO[bytes], scopes: tuple[str, ...]) -> Iterator[str]:
+    """Text blocks of the elements named in scopes of an ODF XML part, in document order.
+
+    Same block layout as the .docx extractor: one block per paragraph or
+    heading, one per table row. ODF text is mixed content (text between
+    child elements), so each top-level paragraph is read once complete and
+    then cleared; memory stays bounded by one paragraph or table row.
+    """
+    cells: list[list[str]] = []
+    rows: list[list[str]] = []
+    scope_depth = 0
+    paragraph_depth = 0
+    skip_depth = 0
+    containers = []  # open scope elements, emptied as their top-level blocks finish
+
+    for event, elem in iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag in scopes:
+                scope_depth += 1
+                containers.append(elem)
+            elif not scope_depth:
+                pass
+            elif paragraph_depth:
+                if tag in _ODF_PARAGRAPHS:
+                    paragraph_depth += 1
+            elif tag in _ODF_SKIPPED:
+                skip_depth += 1
+            elif skip_depth:
+                pass
+            elif tag in _ODF_PARAGRAPHS:
+                paragraph_depth += 1
+            elif tag in (f"{_TABLE}table-cell", f"{_TABLE}covered-table-cell"):
+                cells.append([])
+            elif tag == f"{_TABLE}table-row":
+                rows.append([])
+            continue
+
+        if tag in scopes:
+            scope_depth -= 1
+            containers.pop()
+        elif not scope_depth:
+            continue
+        elif paragraph_depth:
+            if tag in _ODF_PARAGRAPHS:
+                paragraph_depth -= 1
+            if paragraph_depth:
+                continue  # inline content and nested paragraphs, read with the top-level paragraph
+            nested: list[str] = []
+            text = _odf_paragraph_text(elem, nested)
+            for block in nested + ([text] if text else []):
+                if cells:
+                    cells[-1].append(block)
+                else:
+                    yield block
+        elif tag in _ODF_SKIPPED:
+            skip_depth -= 1
+        elif skip_depth:
+            pass
+        elif tag in (f"{_TABLE}table-cell", f"{_TABLE}covered-table-cell"):
+            text = " ".join(cells.pop())
+            if rows:
+                rows[-1].append(text)
+        elif tag == f"{_TABLE}table-row":
+            text = TABLE_CELL_SEPARATOR.join(cell for cell in rows.pop() if cell)
+            if text:
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield text
+
+        elem.clear()
+        if containers and not cells and not skip_depth:
+            # Drop the emptied shells of finished top-level blocks as well
+            del containers[-1][:]
+
+
+def extract_text_from_odt(file_path: str) -> str:
+    """Extract text from an .odt file: body paragraphs, lists and tables.
+
+    Streams content.xml from the zip, without LibreOffice. Page headers and
+    footers (in styles.xml) are not included; see extract_header_footer_text.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open("content.xml") as stream:
+            return "\n\n".join(_iter_odf_blocks(stream, (f"{_OFFICE}text",)))
+
+
+def _odt_header_footer_blocks(file_path: str) -> list[str]:
+    """Blocks of the master page headers and footers in styles.xml, each repeated block once."""
+    with zipfile.ZipFile(file_path) as archive:
+        if "styles.xml" not in archive.namelist():
+            return []
+        blocks: list[str] = []
+        for scopes in (_ODF_HEADERS, _ODF_FOOTERS):
+            with archive.open("styles.xml") as stream:
+                blocks.extend(dict.fromkeys(_iter_odf_blocks(stream, scopes)))
+    return blocks
+
+
+def extract_header_footer_text(file_path: str) -> str:
+    """Text of the page headers and footers of a .docx or .odt file.
+
+    Kept out of extract_text: it repeats the document's own code, revision
+    and page numbers, which would reach every agent prompt, the spelling
+    diff and reference extraction. Used where header fields matter, such as
+    template placeholders.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".docx":
+        return "\n\n".join(_docx_header_footer_blocks(file_path))
+    if ext == ".odt":
+        return "\n\n".join(_odt_header_footer_blocks(file_path))
+    return ""
+
+
+def pdf_page_count(file_path: str) -> int:
+    with fitz.open(file_path) as doc:
+        return doc.page_count
+
+
+def extract_pdf_pages(file_path: str, start: int, stop: int) -> list[str]:
+    """Stripped text of pages [start, stop) of a PDF, one entry per page."""
+    with fitz.open(file_path) as doc:
+        return [doc[number].get_text().strip() for number in range(start, min(stop, doc.page_count))]
 
 
 def extract_text_from_pdf(file_path: str) -> str:
     """Extract text from all pages of a PDF file using PyMuPDF."""
-    doc = fitz.open(file_path)
-    texts = [page.get_text().strip() for page in doc if page.get_text().strip()]
-    doc.close()
-    return "\n\n".join(texts)
+    texts = extract_pdf_pages(file_path, 0, pdf_page_count(file_path))
+    return "\n\n".join(text for text in texts if text)
 
 
 _PARSERS = {
     ".docx": extract_text_from_docx,
+    ".odt": extract_text_from_odt,
     ".pdf": extract_text_from_pdf,
 }
 
@@ -28,5 +383,46 @@ def extract_text(file_path: str) -> str:
     ext = os.path.splitext(file_path)[1].lower()
     parser = _PARSERS.get(ext)
     if parser is None:
-        raise ValueError(f"Unsupported file type: {ext}. Supported types: .docx, .pdf")
+        raise ValueError(f"Unsupported file type: {ext}. Supported types: .docx, .odt, .pdf")
     return parser(file_path)
+
+
+async def extract_text_in_pool(file_path: str) -> str:
+    """extract_text on the CPU pool; long PDFs are split into page ranges extracted in parallel.
+
+    The result is identical to extract_text: pages are reassembled in order
+    and joined the same way.
+    """
+    pages_per_task = settings.PDF_PAGES_PER_TASK
+    if not file_path.lower().endswith(".pdf") or pages_per_task <= 0:
+        return await run_cpu(extract_text, file_path)
+
+    page_count = await run_io(pdf_page_count, file_path)
+    if page_count <= pages_per_task:
+        return await run_cpu(extract_text, file_path)
+
+    ranges = await asyncio.gather(*(
+        run_cpu(extract_pdf_pages, file_path, start, start + pages_per_task)
+        for start in range(0, page_count, pages_per_task)
+    ))
+    return "\n\n".join(text for texts in ranges for text in texts if text)
+
+
+def parse_document(file_path: str, section_names: Optional[list[str]] = None) -> tuple[str, list[dict]]:
+    """extract_text plus the section tree of the text (see utils.section_tree).
+
+    section_names are the expected section titles, recognized as headings
+    even when they are not numbered.
+    """
+    if file_path.lower().endswith(".docx"):
+        return parse_docx(file_path, section_names)
+    text = extract_text(file_path)
+    return text, build_section_tree(text, section_names=section_names)
+
+
+async def parse_document_in_pool(file_path: str, section_names: Optional[list[str]] = None) -> tuple[str, list[dict]]:
+    """parse_document on the CPU pool, with long PDFs split into page ranges (see extract_text_in_pool)."""
+    if file_path.lower().endswith(".pdf"):
+        text = await extract_text_in_pool(file_path)
+        return text, build_section_tree(text, section_names=section_names)
+    return await run_cpu(parse_document, file_path, section_names)
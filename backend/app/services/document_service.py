@@ -1,6 +1,7 @@
+import logging
 import os
-import uuid
 from datetime import datetime, timezone
+from functools import partial
 from typing import Optional
 
 from fastapi import UploadFile
@@ -9,19 +10,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.config import settings
+from app.database import after_commit
 from app.models.document import Document
+from app.models.stored_file import StoredFile
 from app.models.version import DocumentVersion
 from app.models.config import Tag, DocumentTag, Category
-from app.services.document_parser import extract_text
-from app.services import coding_service
+from app.services import coding_service, file_store
+from app.services.suggest_index import get_suggest_index
 
-
-def _to_relative_path(absolute_path: str) -> str:
-    """Store paths relative to STORAGE_PATH for portability."""
-    try:
-        return os.path.relpath(absolute_path, settings.STORAGE_PATH)
-    except ValueError:
-        return absolute_path
+logger = logging.getLogger(__name__)
 
 
 def resolve_storage_path(relative_path: str) -> str:
@@ -31,25 +28,23 @@ def resolve_storage_path(relative_path: str) -> str:
     return os.path.join(settings.STORAGE_PATH, relative_path)
 
 
-async def _save_uploaded_file(file: UploadFile) -> tuple[str, str]:
-    """Save an uploaded file to storage and extract its text. Returns (file_path, extracted_text)."""
-    originals_dir = os.path.join(settings.STORAGE_PATH, "originals")
-    os.makedirs(originals_dir, exist_ok=True)
-
-    ext = os.path.splitext(file.filename)[1] if file.filename else ".docx"
-    unique_filename = f"{uuid.uuid4().hex}{ext}"
-    file_path = os.path.join(originals_dir, unique_filename)
-
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
-
-    try:
-        extracted_text = extract_text(file_path)
-    except Exception:
-        extracted_text = ""
-
-    return _to_relative_path(file_path), extracted_text
+async def _save_uploaded_file(
+    db: AsyncSession, file: UploadFile
+) -> tuple[StoredFile, str, Optional[list[dict]]]:
+    """Store an uploaded file by content and parse it.
+
+    Returns (stored_file, extracted_text, section_tree). Bytes already in
+    storage are not written again and their cached parse is reused (see
+    file_store); UploadTooLargeError is raised for files above MAX_UPLOAD_BYTES.
+    """
+    stored, duplicate = await file_store.store_upload(db, file)
+    if duplicate:
+        logger.info(
+            f"Upload idêntico a arquivo já armazenado ({stored.sha256[:12]}) "
+            "— reaproveitando arquivo e texto extraído"
+        )
+    extracted_text, section_tree = await file_store.get_parsed_content(stored)
+    return stored, extracted_text, section_tree
 
 
 async def upload_document(
@@ -66,7 +61,7 @@ async def upload_document(
     if not coding_service.validate_document_type(document_type):
         raise ValueError(f"Tipo de documento inválido: '{document_type}'. Use PQ, IT ou RQ.")
 
-    file_path, extracted_text = await _save_uploaded_file(file)
+    stored, extracted_text, section_tree = await _save_uploaded_file(db, file)
 
     # Auto-generate code
     seq_number = await coding_service.get_next_sequential_number(db, document_type)
@@ -86,6 +81,7 @@ async def upload_document(
     )
     db.add(document)
     await db.flush()
+    after_commit(db, partial(get_suggest_index().upsert, document.id, document.code, document.title))
 
     if tags:
         await _sync_tags(db, document.id, tags)
@@ -93,8 +89,10 @@ async def upload_document(
     version = DocumentVersion(
         document_id=document.id,
         version_number=1,
-        original_file_path=file_path,
+        original_file_path=stored.path,
+        file_sha256=stored.sha256,
         extracted_text=extracted_text,
+        section_tree=section_tree,
         status="draft",
         submitted_at=datetime.now(timezone.utc),
         change_summary="Versão inicial do documento",
@@ -178,6 +176,35 @@ async def get_document_by_code(db: AsyncSession, code: str) -> Optional[Document
     return result.scalar_one_or_none()
 
 
+async def search_documents_ranked(
+    db: AsyncSession, query_str: str, limit: int = 50
+) -> list[tuple[Document, Optional[float], Optional[str]]]:
+    """Search documents, best match first, with (document, score, snippet).
+
+    Uses the FTS5 index (BM25 ranking, highlighted snippets) when available and
+    falls back to search_documents (no score or snippet) otherwise.
+    """
+    from app.services import search_index
+
+    if not search_index.is_available():
+        return [(doc, None, None) for doc in await search_documents(db, query_str)]
+
+    hits = await search_index.search(db, query_str, limit)
+    if not hits:
+        return []
+    result = await db.execute(
+        select(Document)
+        .options(selectinload(Document.tags))
+        .where(Document.id.in_([hit.document_id for hit in hits]))
+    )
+    documents = {doc.id: doc for doc in result.scalars().all()}
+    return [
+        (documents[hit.document_id], hit.score, hit.snippet)
+        for hit in hits
+        if hit.document_id in documents
+    ]
+
+
 async def search_documents(db: AsyncSession, query_str: str) -> list[Document]:
     """Full-text search on documents using ILIKE on code, title and extracted_text."""
     search_pattern = f"%{query_str}%"
@@ -222,6 +249,15 @@ async def resubmit_document(
             "O documento precisa estar com status 'rejected', 'draft' ou 'approved' para ser reenviado."
         )
 
+    stored, extracted_text, section_tree = await _save_uploaded_file(db, file)
+
+    # An unchanged file has nothing new to analyze or approve
+    if document.versions and document.versions[-1].file_sha256 == stored.sha256:
+        raise file_store.DuplicateUploadError(
+            f"O arquivo enviado é idêntico ao da versão atual (v{document.versions[-1].version_number}) "
+            "— nenhuma alteração para analisar."
+        )
+
     # Archive the current latest version if it exists
     if document.versions:
         latest = document.versions[-1]
@@ -229,8 +265,6 @@ async def resubmit_document(
             latest.status = "archived"
             latest.archived_at = datetime.now(timezone.utc)
 
-    file_path, extracted_text = await _save_uploaded_file(file)
-
     # Increment version and revision
     document.current_version += 1
     document.status = "draft"
@@ -242,12 +276,15 @@ async def resubmit_document(
         document.code = coding_service.generate_code(
             document.document_type, document.sequential_number, document.revision_number
         )
+        after_commit(db, partial(get_suggest_index().upsert, document.id, document.code, document.title))
 
     version = DocumentVersion(
         document_id=document.id,
         version_number=document.current_version,
-        original_file_path=file_path,
+        original_file_path=stored.path,
+        file_sha256=stored.sha256,
         extracted_text=extracted_text,
+        section_tree=section_tree,
         status="draft",
         submitted_at=datetime.now(timezone.utc),
     )
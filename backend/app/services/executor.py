@@ -0,0 +1,161 @@
+"""Managed executors for blocking work called from async handlers.
+
+CPU-bound parsing and rendering (python-docx, PyMuPDF, template filling) runs
+in a process pool so it neither blocks the event loop nor holds the GIL of
+the API process; blocking I/O and LibreOffice subprocess calls run in a
+thread pool. Both pools are sized from settings and track submitted,
+running, queued and failed tasks for the admin metrics endpoint.
+
+Functions sent to the process pool must be importable top-level functions
+and their arguments picklable. With EXECUTOR_PROCESS_WORKERS = 0 CPU-bound
+work runs in the thread pool instead.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolMetrics:
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "running": min(self.in_flight, self.workers),
+            # Tasks submitted but waiting for a free worker
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "max_in_flight": self.max_in_flight,
+            "avg_task_seconds": round(self.busy_seconds / finished, 3) if finished else None,
+            "avg_wait_seconds": round(self.wait_seconds / finished, 3) if finished else None,
+        }
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple[Any, float]:
+    """Run fn in the worker and report when it actually started (for queue wait)."""
+    started = time.time()
+    return fn(*args, **kwargs), started
+
+
+class ManagedExecutor:
+    """Process pool (CPU) + thread pool (I/O) with per-pool metrics."""
+
+    def __init__(self, process_workers: int, thread_workers: int):
+        self._process_workers = process_workers
+        self._thread_workers = thread_workers
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self.cpu = _PoolMetrics("process", process_workers or thread_workers)
+        self.io = _PoolMetrics("thread", thread_workers)
+
+    def start(self) -> None:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self._thread_workers, thread_name_prefix="blocking-io")
+        if self._process_pool is None and self._process_workers > 0:
+            # spawn: forking a process that runs an event loop and DB connections is unsafe
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self._process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def shutdown(self) -> None:
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True, cancel_futures=True)
+            self._process_pool = None
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=True, cancel_futures=True)
+            self._thread_pool = None
+
+    async def _run(self, pool: Executor, metrics: _PoolMetrics, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        loop = asyncio.get_running_loop()
+        metrics.submitted += 1
+        metrics.in_flight += 1
+        metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+        submitted_at = time.time()
+        try:
+            result, started = await loop.run_in_executor(pool, functools.partial(_timed_call, fn, args, kwargs))
+        except Exception:
+            metrics.failed += 1
+            metrics.busy_seconds += time.time() - submitted_at
+            raise
+        finally:
+            metrics.in_flight -= 1
+        metrics.completed += 1
+        metrics.wait_seconds += max(0.0, started - submitted_at)
+        metrics.busy_seconds += time.time() - started
+        return result
+
+    async def run_cpu(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a CPU-bound function in the process pool."""
+        self.start()
+        if self._process_pool is None:
+            return await self._run(self._thread_pool, self.cpu, fn, args, kwargs)
+        try:
+            return await self._run(self._process_pool, self.cpu, fn, args, kwargs)
+        except BrokenProcessPool:
+            # A worker died (e.g. a crashing parser); replace the pool so later calls work
+            logger.error(f"Pool de processos quebrado ao executar {getattr(fn, '__name__', fn)} — recriando")
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+            raise
+
+    async def run_io(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking I/O or subprocess call in the thread pool."""
+        self.start()
+        return await self._run(self._thread_pool, self.io, fn, args, kwargs)
+
+    def metrics(self) -> dict:
+        return {
+            "process_pool": {**self.cpu.snapshot(), "enabled": self._process_workers > 0},
+            "thread_pool": self.io.snapshot(),
+        }
+
+
+_executor = ManagedExecutor(settings.EXECUTOR_PROCESS_WORKERS, settings.EXECUTOR_THREAD_WORKERS)
+
+
+async def run_cpu(fn: Callable, *args, **kwargs) -> Any:
+    return await _executor.run_cpu(fn, *args, **kwargs)
+
+
+async def run_io(fn: Callable, *args, **kwargs) -> Any:
+    return await _executor.run_io(fn, *args, **kwargs)
+
+
+def get_executor_metrics() -> dict:
+    return _executor.metrics()
+
+
+def start_executors() -> None:
+    """Create the pools (FastAPI lifespan). Pools are also created lazily on first use."""
+    _executor.start()
+    logger.info(
+        f"Executores iniciados: {settings.EXECUTOR_PROCESS_WORKERS} processos, "
+        f"{settings.EXECUTOR_THREAD_WORKERS} threads"
+    )
+
+
+def shutdown_executors() -> None:
+    _executor.shutdown()
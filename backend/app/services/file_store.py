@@ -0,0 +1,173 @@
+"""Content-addressed storage for original documents.
+
+Originals are stored once, under their SHA-256, at
+<STORAGE_PATH>/originals/<first two hex digits>/<sha256><ext>, and tracked in
+stored_files (document versions point at them through file_sha256).
+Uploading or importing bytes that are already stored reuses the existing file
+and its cached extracted text instead of writing a copy and parsing it again.
+A file written for a new row is removed again if the transaction does not
+commit.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from typing import Optional
+
+import aiofiles.os
+from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import after_commit, after_rollback
+from app.models.stored_file import LegacyOriginalFile, StoredFile
+from app.models.version import DocumentVersion
+from app.services.ai_agents.formatting_agent import DEFAULT_SECTIONS
+from app.services.document_parser import parse_document_in_pool
+from app.services.executor import run_io
+from app.utils.section_tree import build_section_tree
+from app.utils.upload import stream_upload_to_disk
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# Unnumbered headings with these titles still open a section in the tree
+_SECTION_NAMES = [name for names in DEFAULT_SECTIONS.values() for name in names]
+
+
+class DuplicateUploadError(ValueError):
+    """The uploaded file is identical to the document's current version."""
+
+
+def cas_relative_path(sha256: str, ext: str) -> str:
+    """Path of a stored file relative to STORAGE_PATH."""
+    return os.path.join("originals", sha256[:2], f"{sha256}{ext.lower()}")
+
+
+def hash_file(path: str) -> tuple[str, int]:
+    """(sha256, size) of a file on disk, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _place_file(src: str, dest: str, move: bool) -> None:
+    """Put src at dest atomically (rename, or copy to a temp name and rename)."""
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    if move:
+        os.replace(src, dest)
+        return
+    tmp = f"{dest}.{uuid.uuid4().hex}.part"
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dest)
+
+
+def _insert(db: AsyncSession):
+    """Dialect insert() supporting on_conflict_do_nothing (a savepoint would commit on SQLite)."""
+    return postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def _adopt(db: AsyncSession, src: str, sha256: str, size: int, ext: str, move: bool) -> tuple[StoredFile, bool]:
+    """Register src under its hash. Returns (stored_file, is_duplicate)."""
+    result = await db.execute(select(StoredFile).where(StoredFile.sha256 == sha256))
+    stored = result.scalar_one_or_none()
+
+    if stored is None:
+        dest_rel = cas_relative_path(sha256, ext)
+        dest = os.path.join(settings.STORAGE_PATH, dest_rel)
+        # Placed before the row is committed: the caller parses it right away
+        await run_io(_place_file, src, dest, move)
+        inserted = await db.execute(
+            _insert(db)(StoredFile)
+            .values(sha256=sha256, path=dest_rel, size=size)
+            .on_conflict_do_nothing(index_elements=["sha256"])
+        )
+        result = await db.execute(select(StoredFile).where(StoredFile.sha256 == sha256))
+        stored = result.scalar_one()
+        if inserted.rowcount == 0:
+            # Same bytes stored concurrently by another request: the file is theirs now
+            return stored, True
+        after_rollback(db, lambda: _discard(dest))
+        return stored, False
+
+    dest = os.path.join(settings.STORAGE_PATH, stored.path)
+    if not await aiofiles.os.path.exists(dest):
+        # Row survived but the file did not (manual cleanup): restore it from this copy
+        await run_io(_place_file, src, dest, move)
+    elif move:
+        await aiofiles.os.remove(src)
+    return stored, True
+
+
+async def store_upload(db: AsyncSession, file: UploadFile) -> tuple[StoredFile, bool]:
+    """Stream an upload to disk and store it by content. Returns (stored_file, is_duplicate)."""
+    ext = os.path.splitext(file.filename)[1] if file.filename else ".docx"
+    incoming = os.path.join(settings.STORAGE_PATH, "originals", "incoming", f"{uuid.uuid4().hex}{ext}")
+    upload = await stream_upload_to_disk(file, incoming)
+    try:
+        return await _adopt(db, incoming, upload.sha256, upload.size, ext, move=True)
+    except BaseException:
+        if await aiofiles.os.path.exists(incoming):
+            await aiofiles.os.remove(incoming)
+        raise
+
+
+async def store_local_file(db: AsyncSession, src_path: str) -> tuple[StoredFile, bool]:
+    """Store a copy of a local file (bulk import) by content. Returns (stored_file, is_duplicate)."""
+    sha256, size = await run_io(hash_file, src_path)
+    return await _adopt(db, src_path, sha256, size, os.path.splitext(src_path)[1], move=False)
+
+
+async def remove_legacy_originals(db: AsyncSession) -> int:
+    """Forget the pre-deduplication originals kept by migration 015 and delete their files after commit.
+
+    Files still used as a version's original_file_path are kept. Returns the
+    number of files scheduled for removal.
+    """
+    legacy = (await db.execute(select(LegacyOriginalFile))).scalars().all()
+    in_use = set((await db.execute(select(DocumentVersion.original_file_path))).scalars().all())
+    paths = set()
+    for row in legacy:
+        if row.path not in in_use:
+            path = row.path if os.path.isabs(row.path) else os.path.join(settings.STORAGE_PATH, row.path)
+            paths.add(path)
+        await db.delete(row)
+    await db.flush()
+
+    def discard_all() -> None:
+        for path in paths:
+            _discard(path)
+
+    after_commit(db, discard_all)
+    return len(paths)
+
+
+async def get_parsed_content(stored: StoredFile) -> tuple[str, Optional[list[dict]]]:
+    """Text and section tree of a stored file, parsed once and cached on the row (failures are not cached)."""
+    if stored.extracted_text is None:
+        path = os.path.join(settings.STORAGE_PATH, stored.path)
+        try:
+            stored.extracted_text, stored.section_tree = await parse_document_in_pool(path, _SECTION_NAMES)
+        except Exception as e:
+            logger.warning(f"Não foi possível extrair texto de {stored.path}: {e}")
+            return "", None
+    elif stored.section_tree is None:
+        # Text cached before section trees were stored: derive it from the text
+        stored.section_tree = build_section_tree(stored.extracted_text, section_names=_SECTION_NAMES)
+    return stored.extracted_text, stored.section_tree
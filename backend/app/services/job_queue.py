@@ -0,0 +1,413 @@
+"""Durable background job queue for AI analysis and formatting.
+
+Jobs are rows in background_jobs, so queued and in-flight work survives a
+restart. A pool of asyncio workers started in the FastAPI lifespan claims jobs
+by priority, holds a lease while running them (renewed by a heartbeat), and
+retries failures with exponential backoff. The pool size caps how many
+analyses run at once when a batch of uploads lands.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.circuit_breaker import CircuitOpenError
+from app.database import after_commit, async_session_factory
+from app.models.job import BackgroundJob
+from app.models.version import DocumentVersion
+
+logger = logging.getLogger(__name__)
+
+# Default priorities (higher runs first)
+PRIORITY_NORMAL = 0
+PRIORITY_USER_RETRY = 10
+
+
+async def _run_analysis(version_id: int, payload: dict) -> None:
+    from app.services.ai_service import run_analysis_job
+
+    await run_analysis_job(version_id, use_cache=payload.get("use_cache", True))
+
+
+async def _run_formatting(version_id: int, payload: dict) -> None:
+    from app.services.ai_service import run_formatting_job
+
+    await run_formatting_job(version_id, use_cache=payload.get("use_cache", True))
+
+
+async def _analysis_failed(version_id: int) -> None:
+    from app.services.ai_service import _force_set_analysis_failed
+
+    await _force_set_analysis_failed(version_id)
+
+
+# job_type → (handler, called once the last attempt has failed)
+_HANDLERS: dict[str, tuple[Callable[[int, dict], Awaitable[None]], Optional[Callable[[int], Awaitable[None]]]]] = {
+    "analysis": (_run_analysis, _analysis_failed),
+    "formatting": (_run_formatting, None),
+}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """SQLite returns naive datetimes; treat them as UTC."""
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    job_type: str,
+    version_id: int,
+    payload: Optional[dict] = None,
+    priority: int = PRIORITY_NORMAL,
+) -> BackgroundJob:
+    """Add a job in the caller's transaction; the workers are woken once it commits.
+
+    If the same job is already queued or running for this version, that job is
+    returned instead of creating a duplicate.
+    """
+    if job_type not in _HANDLERS:
+        raise ValueError(f"Tipo de job desconhecido: '{job_type}'")
+
+    result = await db.execute(
+        select(BackgroundJob).where(
+            BackgroundJob.job_type == job_type,
+            BackgroundJob.version_id == version_id,
+            BackgroundJob.status.in_(("queued", "running")),
+        ).limit(1)
+    )
+    existing = result.scalar_one_or_none()
+    if existing:
+        if existing.status == "queued" and priority > existing.priority:
+            existing.priority = priority
+            await db.flush()
+        return existing
+
+    job = BackgroundJob(
+        job_type=job_type,
+        version_id=version_id,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+    db.add(job)
+    await db.flush()
+
+    # Waking earlier would let a worker look for the job before it is visible
+    after_commit(db, _wake_workers)
+    return job
+
+
+def _wake_workers() -> None:
+    if _pool is not None:
+        _pool.wake()
+
+
+def _backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter for the given (1-based) attempt count."""
+    base = settings.JOB_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    return base * random.uniform(0.8, 1.2)
+
+
+class JobWorkerPool:
+    """Fixed-size pool of asyncio workers draining background_jobs."""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.running = 0
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        await recover_jobs()
+        for i in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._worker_loop(i)))
+        logger.info(f"Fila de jobs iniciada com {self.concurrency} workers")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _worker_loop(self, index: int) -> None:
+        while not self._stopping:
+            try:
+                job = await self._claim_next()
+            except Exception as e:
+                logger.error(f"Worker {index}: falha ao buscar job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.running += 1
+            try:
+                await self._execute(job)
+            finally:
+                self.running -= 1
+
+    async def _claim_next(self) -> Optional[BackgroundJob]:
+        """Atomically take the highest-priority runnable job (or an expired lease)."""
+        now = _utcnow()
+        async with async_session_factory() as db:
+            result = await db.execute(
+                select(BackgroundJob.id)
+                .where(
+                    or_(
+                        (BackgroundJob.status == "queued") & (BackgroundJob.run_after <= now),
+                        (BackgroundJob.status == "running") & (BackgroundJob.lease_expires_at < now),
+                    )
+                )
+                .order_by(BackgroundJob.priority.desc(), BackgroundJob.run_after, BackgroundJob.id)
+                .limit(1)
+            )
+            job_id = result.scalar_one_or_none()
+            if job_id is None:
+                return None
+
+            # Optimistic claim: only succeeds if nobody took it in between
+            claimed = await db.execute(
+                update(BackgroundJob)
+                .where(
+                    BackgroundJob.id == job_id,
+                    or_(
+                        BackgroundJob.status == "queued",
+                        (BackgroundJob.status == "running") & (BackgroundJob.lease_expires_at < now),
+                    ),
+                )
+                .values(
+                    status="running",
+                    attempts=BackgroundJob.attempts + 1,
+                    started_at=now,
+                    lease_expires_at=now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                    locked_by=self.worker_id,
+                )
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                return None
+            return await db.get(BackgroundJob, job_id)
+
+    async def _heartbeat(self, job_id: int) -> None:
+        """Extend the lease of a running job so it is not reclaimed while still in progress."""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                async with async_session_factory() as db:
+                    renewed = await db.execute(
+                        update(BackgroundJob)
+                        .where(
+                            BackgroundJob.id == job_id,
+                            BackgroundJob.status == "running",
+                            BackgroundJob.locked_by == self.worker_id,
+                        )
+                        .values(lease_expires_at=_utcnow() + timedelta(seconds=settings.JOB_LEASE_SECONDS))
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Job {job_id}: falha ao renovar o lease: {e}")
+                continue
+            if renewed.rowcount != 1:
+                logger.warning(f"Job {job_id}: lease perdido para outro worker")
+                return
+
+    async def _run_handler(self, job: BackgroundJob, handler: Callable[[int, dict], Awaitable[None]]) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            await handler(job.version_id, job.payload or {})
+        finally:
+            heartbeat.cancel()
+
+    async def _execute(self, job: BackgroundJob) -> None:
+        handler, on_final_failure = _HANDLERS[job.job_type]
+        try:
+            await self._run_handler(job, handler)
+        except asyncio.CancelledError:
+            # Shutdown: leave the job running; recover_jobs() requeues it on restart
+            raise
+        except CircuitOpenError as e:
+            # OpenAI is down: postpone until the circuit can probe again, without
+            # spending one of the job's attempts
+            logger.warning(f"Job {job.id} adiado: {e}")
+            async with async_session_factory() as db:
+                await db.execute(
+                    update(BackgroundJob)
+                    .where(BackgroundJob.id == job.id)
+                    .values(
+                        status="queued",
+                        attempts=BackgroundJob.attempts - 1,
+                        run_after=_utcnow() + timedelta(seconds=max(e.retry_after, 1.0)),
+                        lease_expires_at=None,
+                        locked_by=None,
+                    )
+                )
+                await db.commit()
+            return
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            final = job.attempts >= job.max_attempts
+            logger.error(
+                f"Job {job.id} ({job.job_type}, versão {job.version_id}) falhou "
+                f"na tentativa {job.attempts}/{job.max_attempts}: {error}"
+            )
+            async with async_session_factory() as db:
+                values = {"last_error": error, "lease_expires_at": None, "locked_by": None}
+                if final:
+                    values.update(status="failed", finished_at=_utcnow())
+                else:
+                    values.update(
+                        status="queued",
+                        run_after=_utcnow() + timedelta(seconds=_backoff_seconds(job.attempts)),
+                    )
+                await db.execute(update(BackgroundJob).where(BackgroundJob.id == job.id).values(**values))
+                await db.commit()
+            if final and on_final_failure:
+                await on_final_failure(job.version_id)
+            return
+
+        async with async_session_factory() as db:
+            await db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job.id)
+                .values(status="succeeded", finished_at=_utcnow(), lease_expires_at=None, locked_by=None)
+            )
+            await db.commit()
+
+
+async def recover_jobs() -> None:
+    """Requeue work interrupted by a restart.
+
+    - Jobs left 'running' by a previous process go back to 'queued'
+      (single-process deployment; other processes rely on lease expiry).
+    - Versions stuck in 'analyzing' with no pending job get a new analysis job.
+    """
+    async with async_session_factory() as db:
+        requeued = await db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.status == "running")
+            .values(status="queued", lease_expires_at=None, locked_by=None, run_after=_utcnow())
+        )
+
+        pending = select(BackgroundJob.version_id).where(
+            BackgroundJob.job_type == "analysis",
+            BackgroundJob.status.in_(("queued", "running")),
+        )
+        orphaned = await db.execute(
+            select(DocumentVersion.id).where(
+                DocumentVersion.status == "analyzing",
+                DocumentVersion.id.not_in(pending),
+            )
+        )
+        orphan_ids = list(orphaned.scalars().all())
+        for version_id in orphan_ids:
+            db.add(BackgroundJob(
+                job_type="analysis",
+                version_id=version_id,
+                payload={},
+                priority=PRIORITY_NORMAL,
+                max_attempts=settings.JOB_MAX_ATTEMPTS,
+            ))
+        await db.commit()
+
+    if requeued.rowcount or orphan_ids:
+        logger.warning(
+            f"Recuperação da fila: {requeued.rowcount} jobs reenfileirados, "
+            f"{len(orphan_ids)} versões presas em 'analyzing' reenviadas para análise"
+        )
+
+
+async def get_queue_stats(db: AsyncSession) -> dict:
+    """Queue depth per status/type, throughput and timing for the admin panel."""
+    now = _utcnow()
+
+    counts = await db.execute(
+        select(BackgroundJob.job_type, BackgroundJob.status, func.count(BackgroundJob.id))
+        .group_by(BackgroundJob.job_type, BackgroundJob.status)
+    )
+    by_type: dict[str, dict[str, int]] = {}
+    for job_type, status, count in counts.all():
+        by_type.setdefault(job_type, {})[status] = count
+
+    ready = await db.execute(
+        select(func.count(BackgroundJob.id)).where(
+            BackgroundJob.status == "queued", BackgroundJob.run_after <= now
+        )
+    )
+    oldest = await db.execute(
+        select(func.min(BackgroundJob.created_at)).where(BackgroundJob.status == "queued")
+    )
+    oldest_queued = _as_utc(oldest.scalar())
+
+    throughput = {}
+    for label, window in (("last_hour", timedelta(hours=1)), ("last_24h", timedelta(days=1))):
+        finished = await db.execute(
+            select(BackgroundJob.status, func.count(BackgroundJob.id))
+            .where(BackgroundJob.finished_at >= now - window)
+            .group_by(BackgroundJob.status)
+        )
+        throughput[label] = dict(finished.all())
+
+    recent = await db.execute(
+        select(BackgroundJob.started_at, BackgroundJob.finished_at)
+        .where(BackgroundJob.status == "succeeded", BackgroundJob.finished_at >= now - timedelta(days=1))
+    )
+    durations = [
+        (_as_utc(finished) - _as_utc(started)).total_seconds()
+        for started, finished in recent.all()
+        if started and finished
+    ]
+
+    return {
+        "concurrency": _pool.concurrency if _pool else 0,
+        "running_in_this_process": _pool.running if _pool else 0,
+        "ready": ready.scalar() or 0,
+        "oldest_queued_age_seconds": (now - oldest_queued).total_seconds() if oldest_queued else None,
+        "by_type": by_type,
+        "throughput": throughput,
+        "avg_duration_seconds_24h": round(sum(durations) / len(durations), 2) if durations else None,
+    }
+
+
+_pool: Optional[JobWorkerPool] = None
+
+
+async def start_job_workers() -> None:
+    """Recover interrupted jobs and start the worker pool (FastAPI lifespan)."""
+    global _pool
+    if _pool is None:
+        _pool = JobWorkerPool(settings.JOB_WORKER_CONCURRENCY)
+        await _pool.start()
+
+
+async def stop_job_workers() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
@@ -0,0 +1,242 @@
+"""Content-addressed cache for OpenAI chat completions.
+
+Entries are keyed by a SHA-256 of (agent, model, messages, temperature and the
+other request parameters) and stored in a dedicated SQLite file, separate from
+the application database so cache writes never contend with the long-running
+analysis transaction. Eviction is TTL-based plus an LRU cap on entry count and
+total size.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Request parameters that do not change the model output and must not split the cache
+_IGNORED_PARAMS = {"timeout", "extra_headers", "extra_query", "extra_body"}
+
+# Run eviction every N writes rather than on every put
+_EVICT_EVERY = 50
+
+
+def make_key(agent_type: Optional[str], params: dict) -> str:
+    """Hash an agent name and chat-completion request into a cache key."""
+    relevant = {k: v for k, v in params.items() if k not in _IGNORED_PARAMS}
+    payload = json.dumps(
+        {"agent": agent_type or "", "params": relevant},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with TTL/LRU eviction and hit counters."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int,
+        max_entries: int,
+        max_bytes: int,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    # ── connection ────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    agent_type TEXT,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ── sync operations (run in a worker thread) ─────────────
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                self.evictions += 1
+                return None
+            conn.execute(
+                "UPDATE llm_cache SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (now, key),
+            )
+            conn.commit()
+            return response
+
+    def _put_sync(self, key: str, agent_type: Optional[str], model: Optional[str], response: str) -> None:
+        now = self._clock()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                """INSERT OR REPLACE INTO llm_cache
+                   (key, agent_type, model, response, size_bytes, created_at, last_access, hit_count)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 0)""",
+                (key, agent_type, model, response, len(response.encode("utf-8")), now, now),
+            )
+            conn.commit()
+            self.writes += 1
+            if self.writes % _EVICT_EVERY == 0:
+                self._evict_locked(conn)
+
+    def _evict_locked(self, conn: sqlite3.Connection) -> None:
+        """Drop expired entries, then least-recently-used ones until under the caps."""
+        removed = 0
+        if self.ttl_seconds:
+            cur = conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (self._clock() - self.ttl_seconds,)
+            )
+            removed += cur.rowcount
+
+        count, total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_cache"
+        ).fetchone()
+        if count > self.max_entries or total_bytes > self.max_bytes:
+            rows = conn.execute(
+                "SELECT key, size_bytes FROM llm_cache ORDER BY last_access ASC"
+            ).fetchall()
+            to_delete = []
+            for key, size in rows:
+                if count <= self.max_entries and total_bytes <= self.max_bytes:
+                    break
+                to_delete.append((key,))
+                count -= 1
+                total_bytes -= size
+            conn.executemany("DELETE FROM llm_cache WHERE key = ?", to_delete)
+            removed += len(to_delete)
+
+        conn.commit()
+        self.evictions += removed
+
+    def _stats_sync(self) -> dict:
+        with self._lock:
+            conn = self._connect()
+            count, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "entries": count,
+            "size_bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def _clear_sync(self) -> int:
+        with self._lock:
+            conn = self._connect()
+            cur = conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+            return cur.rowcount
+
+    # ── async API ─────────────────────────────────────────────
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            response = await asyncio.to_thread(self._get_sync, key)
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao ler cache LLM: {e}")
+            response = None
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    async def put(self, key: str, agent_type: Optional[str], model: Optional[str], response: str) -> None:
+        try:
+            await asyncio.to_thread(self._put_sync, key, agent_type, model, response)
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao gravar cache LLM: {e}")
+
+    async def stats(self) -> dict:
+        return await asyncio.to_thread(self._stats_sync)
+
+    async def clear(self) -> int:
+        return await asyncio.to_thread(self._clear_sync)
+
+
+_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Return the process-wide cache instance."""
+    global _cache
+    if _cache is None:
+        _cache = LLMCache(
+            path=settings.LLM_CACHE_PATH or os.path.join(settings.STORAGE_PATH, "llm_cache.db"),
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            max_bytes=settings.LLM_CACHE_MAX_BYTES,
+        )
+    return _cache
+
+
+def close_llm_cache() -> None:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
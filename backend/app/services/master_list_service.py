@@ -1,14 +1,17 @@
 import csv
 import io
 from datetime import datetime, timezone
+from functools import partial
 from typing import Optional
 
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.database import after_commit
 from app.models.document import Document
 from app.models.master_list import MasterListEntry
+from app.services.suggest_index import get_suggest_index
 
 
 async def get_next_master_list_code(db: AsyncSession) -> str:
@@ -32,6 +35,7 @@ async def add_to_master_list(db: AsyncSession, document_id: int) -> MasterListEn
         # Reactivate if it was removed
         existing.removed_at = None
         await db.flush()
+        after_commit(db, partial(get_suggest_index().set_master_list_code, document_id, existing.master_list_code))
         return existing
 
     # Get the document to determine entry_type
@@ -52,6 +56,7 @@ async def add_to_master_list(db: AsyncSession, document_id: int) -> MasterListEn
     )
     db.add(entry)
     await db.flush()
+    after_commit(db, partial(get_suggest_index().set_master_list_code, document_id, master_list_code))
     return entry
 
 
@@ -64,6 +69,7 @@ async def remove_from_master_list(db: AsyncSession, document_id: int) -> None:
     if entry:
         entry.removed_at = datetime.now(timezone.utc)
         await db.flush()
+        after_commit(db, partial(get_suggest_index().set_master_list_code, document_id, None))
 
 
 async def get_master_list(
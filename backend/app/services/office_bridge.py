@@ -0,0 +1,86 @@
+"""UNO bridge process for office_pool.
+
+Runs under a Python that can import uno (LibreOffice's bundled python, or the
+system python3 with python3-uno), not in the application's environment, so
+it must not import anything from app:
+
+    <uno-python> office_bridge.py <accept-string> <startup-timeout-seconds>
+
+Connects to the soffice listener started with --accept=<accept-string> and
+serves one JSON request per stdin line, answering one JSON line on stdout:
+
+    {"op": "ping"}                                   -> {"ok": true}
+    {"op": "convert", "src": ..., "dest": ..., "filter": ...} -> {"ok": true}
+    on failure                                       -> {"ok": false, "error": "..."}
+"""
+
+import json
+import sys
+import time
+
+import uno
+from com.sun.star.beans import PropertyValue
+
+
+def _props(**values):
+    props = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+def connect(accept, timeout):
+    local = uno.getComponentContext()
+    resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            ctx = resolver.resolve(f"uno:{accept}StarOffice.ComponentContext")
+            return ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+        except Exception:
+            # soffice is still starting (first start also creates the profile)
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.25)
+
+
+def convert(desktop, src, dest, filter_name):
+    doc = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(src), "_blank", 0, _props(Hidden=True, ReadOnly=True)
+    )
+    if doc is None:
+        raise RuntimeError(f"LibreOffice não conseguiu abrir {src}")
+    try:
+        doc.storeToURL(uno.systemPathToFileUrl(dest), _props(FilterName=filter_name, Overwrite=True))
+    finally:
+        doc.close(True)
+
+
+def main():
+    accept, timeout = sys.argv[1], float(sys.argv[2])
+    try:
+        desktop = connect(accept, timeout)
+    except Exception as e:
+        print(json.dumps({"ok": False, "error": f"Falha ao conectar ao LibreOffice: {e}"}), flush=True)
+        return 1
+    print(json.dumps({"ok": True}), flush=True)
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            if request["op"] == "convert":
+                convert(desktop, request["src"], request["dest"], request["filter"])
+            else:
+                desktop.getComponents()  # round trip to soffice
+            response = {"ok": True}
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        print(json.dumps(response), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
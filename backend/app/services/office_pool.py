@@ -0,0 +1,427 @@
+"""Pool of LibreOffice workers for document conversion (.odt → .docx, .docx → .pdf).
+
+Each worker owns an isolated LibreOffice profile under
+<STORAGE_PATH>/office_profiles/, so concurrent conversions never collide on
+the shared user profile. When a Python able to import uno is available
+(LibreOffice's bundled python or python3-uno; see OFFICE_UNO_PYTHON), a
+worker is a long-lived soffice listener plus a small bridge process
+(office_bridge.py) that converts over UNO, so conversions skip the
+seconds-long soffice cold start. Otherwise each conversion runs
+`soffice --convert-to` with the worker's profile.
+
+Requests wait in a bounded queue for a free worker (OfficePoolBusyError when
+it is full) and each conversion has a timeout; a worker that times out or
+dies is killed and restarted, and workers are also restarted after
+OFFICE_MAX_CONVERSIONS_PER_WORKER conversions. Idle listeners are pinged
+every OFFICE_HEALTH_CHECK_SECONDS. Blocking process I/O runs in the
+executor's thread pool.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+from app.services.executor import run_io
+
+logger = logging.getLogger(__name__)
+
+# LibreOffice export filter per output extension
+_FILTERS = {
+    ".pdf": "writer_pdf_Export",
+    ".docx": "MS Word 2007 XML",
+    ".odt": "writer8",
+}
+
+_BRIDGE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "office_bridge.py")
+_PING_TIMEOUT_SECONDS = 10.0
+_STOP_TIMEOUT_SECONDS = 5.0
+
+
+class OfficeUnavailableError(RuntimeError):
+    """LibreOffice is not installed or could not be started."""
+
+
+class OfficePoolBusyError(RuntimeError):
+    """Too many conversions already waiting for a worker."""
+
+
+def find_office_binary() -> Optional[str]:
+    """soffice executable: OFFICE_BINARY, soffice/libreoffice on PATH, or the default macOS install."""
+    candidates = [settings.OFFICE_BINARY] if settings.OFFICE_BINARY else []
+    candidates += [shutil.which("soffice"), shutil.which("libreoffice"),
+                   "/Applications/LibreOffice.app/Contents/MacOS/soffice"]
+    return next((c for c in candidates if c and os.path.exists(c)), None)
+
+
+def find_uno_python(office_binary: str) -> Optional[str]:
+    """A Python that can import uno: OFFICE_UNO_PYTHON, LibreOffice's bundled python, or python3."""
+    if settings.OFFICE_UNO_PYTHON:
+        candidates = [settings.OFFICE_UNO_PYTHON]
+    else:
+        program_dir = os.path.dirname(os.path.realpath(office_binary))
+        candidates = [
+            os.path.join(program_dir, "python"),
+            os.path.join(program_dir, "python.exe"),
+            os.path.join(program_dir, "..", "Resources", "python"),  # macOS bundle
+            shutil.which("python3"),
+            sys.executable,
+        ]
+    for candidate in candidates:
+        if not candidate or not os.path.exists(candidate):
+            continue
+        try:
+            result = subprocess.run([candidate, "-c", "import uno"], capture_output=True, timeout=15)
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if result.returncode == 0:
+            return candidate
+    return None
+
+
+def _kill(process: Optional[subprocess.Popen]) -> None:
+    """Terminate a process and its children (soffice forks soffice.bin)."""
+    if process is None or process.poll() is not None:
+        return
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGTERM)
+        else:
+            process.terminate()
+        process.wait(timeout=_STOP_TIMEOUT_SECONDS)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            process.kill()
+        process.wait()
+
+
+class _OfficeWorker:
+    """One isolated LibreOffice profile; subclasses decide how conversions run on it."""
+
+    mode = ""
+
+    def __init__(self, index: int, office_binary: str):
+        self.index = index
+        self.office_binary = office_binary
+        self.profile_dir = os.path.join(settings.STORAGE_PATH, "office_profiles", f"worker-{index}")
+        self.conversions = 0
+        self.restarts = 0
+
+    @property
+    def profile_url(self) -> str:
+        return Path(self.profile_dir).resolve().as_uri()
+
+    def start(self) -> None:
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+    def stop(self) -> None:
+        pass
+
+    def is_alive(self) -> bool:
+        return True
+
+    def ping(self) -> bool:
+        return True
+
+    def convert(self, src: str, dest: str, timeout: float) -> None:
+        raise NotImplementedError
+
+    def restart(self) -> None:
+        self.stop()
+        self.start()
+        self.conversions = 0
+        self.restarts += 1
+
+
+class _ListenerWorker(_OfficeWorker):
+    """Long-lived soffice listener driven over UNO by an office_bridge.py process."""
+
+    mode = "uno"
+
+    def __init__(self, index: int, office_binary: str, uno_python: str):
+        super().__init__(index, office_binary)
+        self.uno_python = uno_python
+        self._office: Optional[subprocess.Popen] = None
+        self._bridge: Optional[subprocess.Popen] = None
+
+    def start(self) -> None:
+        super().start()
+        accept = f"pipe,name=office_pool_{os.getpid()}_{self.index}_{uuid.uuid4().hex[:8]};urp;"
+        self._office = subprocess.Popen(
+            [self.office_binary, "--headless", "--invisible", "--nologo", "--norestore", "--nodefault",
+             "--nolockcheck", f"-env:UserInstallation={self.profile_url}", f"--accept={accept}"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        self._bridge = subprocess.Popen(
+            [self.uno_python, _BRIDGE_SCRIPT, accept, str(settings.OFFICE_STARTUP_TIMEOUT_SECONDS)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1, start_new_session=True,
+        )
+        ready = self._read_response()
+        if not ready.get("ok"):
+            self.stop()
+            raise OfficeUnavailableError(ready.get("error") or "LibreOffice não iniciou")
+
+    def stop(self) -> None:
+        if self._bridge is not None and self._bridge.stdin:
+            try:
+                self._bridge.stdin.close()
+            except OSError:
+                pass
+        _kill(self._bridge)
+        _kill(self._office)
+        self._bridge = self._office = None
+
+    def is_alive(self) -> bool:
+        return all(p is not None and p.poll() is None for p in (self._office, self._bridge))
+
+    def _read_response(self) -> dict:
+        line = self._bridge.stdout.readline()
+        if not line:
+            raise OfficeUnavailableError("Processo do LibreOffice encerrou inesperadamente")
+        return json.loads(line)
+
+    def _request(self, payload: dict) -> dict:
+        self._bridge.stdin.write(json.dumps(payload) + "\n")
+        self._bridge.stdin.flush()
+        return self._read_response()
+
+    def ping(self) -> bool:
+        return self.is_alive() and self._request({"op": "ping"}).get("ok", False)
+
+    def convert(self, src: str, dest: str, timeout: float) -> None:
+        # The timeout is enforced by the pool, which kills the worker to unblock this call
+        response = self._request({
+            "op": "convert",
+            "src": os.path.abspath(src),
+            "dest": os.path.abspath(dest),
+            "filter": _FILTERS[os.path.splitext(dest)[1].lower()],
+        })
+        if not response.get("ok"):
+            raise RuntimeError(f"Falha na conversão pelo LibreOffice: {response.get('error')}")
+
+
+class _SubprocessWorker(_OfficeWorker):
+    """One `soffice --convert-to` run per conversion, on the worker's own profile."""
+
+    mode = "subprocess"
+
+    def convert(self, src: str, dest: str, timeout: float) -> None:
+        out_dir = os.path.join(os.path.dirname(dest), f".office-{uuid.uuid4().hex}")
+        os.makedirs(out_dir)
+        try:
+            process = subprocess.Popen(
+                [self.office_binary, "--headless", "--norestore", "--nolockcheck",
+                 f"-env:UserInstallation={self.profile_url}",
+                 "--convert-to", os.path.splitext(dest)[1].lstrip(".").lower(), "--outdir", out_dir, src],
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, start_new_session=True,
+            )
+            try:
+                _, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                _kill(process)
+                raise TimeoutError(f"Conversão excedeu {timeout:.0f}s")
+            produced = os.path.join(out_dir, f"{os.path.splitext(os.path.basename(src))[0]}{os.path.splitext(dest)[1]}")
+            if process.returncode != 0 or not os.path.exists(produced):
+                raise RuntimeError(f"Falha na conversão pelo LibreOffice: {stderr.strip()}")
+            os.replace(produced, dest)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+
+class OfficePool:
+    """Fixed set of office workers behind a bounded wait queue."""
+
+    def __init__(self, size: int, queue_size: int):
+        self.size = max(1, size)
+        self.queue_size = queue_size
+        self.mode: Optional[str] = None
+        self._workers: list[_OfficeWorker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self._started = False
+        self.waiting = 0
+        self.conversions = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.convert_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            office_binary = await run_io(find_office_binary)
+            if office_binary is None:
+                logger.warning("LibreOffice não encontrado — conversões de documentos indisponíveis")
+                return
+            uno_python = await run_io(find_uno_python, office_binary)
+            if uno_python:
+                self._workers = [_ListenerWorker(i, office_binary, uno_python) for i in range(self.size)]
+            else:
+                self._workers = [_SubprocessWorker(i, office_binary) for i in range(self.size)]
+            self.mode = self._workers[0].mode
+            self._idle = asyncio.Queue()
+            results = await asyncio.gather(*(run_io(w.start) for w in self._workers), return_exceptions=True)
+            for worker, result in zip(self._workers, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Worker LibreOffice {worker.index} não iniciou: {result}")
+                self._idle.put_nowait(worker)
+            if self.mode == "uno":
+                self._health_task = asyncio.create_task(self._health_loop())
+            logger.info(f"Pool LibreOffice iniciado: {self.size} workers ({self.mode})")
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        await asyncio.gather(*(run_io(w.stop) for w in self._workers), return_exceptions=True)
+        self._workers = []
+        self._idle = None
+        self._started = False
+
+    async def _restart(self, worker: _OfficeWorker, reason: str) -> None:
+        logger.warning(f"Reiniciando worker LibreOffice {worker.index}: {reason}")
+        self.restarts += 1
+        await run_io(worker.restart)
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.OFFICE_HEALTH_CHECK_SECONDS)
+            # Idle workers are taken out one at a time and put back right after
+            # their check, and none while a conversion is waiting; busy workers
+            # are covered by the conversion timeout
+            for _ in range(self._idle.qsize() if self._idle is not None else 0):
+                idle = self._idle
+                if idle is None or idle.empty() or self.waiting:
+                    break
+                worker = idle.get_nowait()
+                try:
+                    await self._check(worker)
+                finally:
+                    if self._idle is idle:
+                        idle.put_nowait(worker)
+
+    async def _check(self, worker: _OfficeWorker) -> None:
+        try:
+            healthy = await asyncio.wait_for(run_io(worker.ping), _PING_TIMEOUT_SECONDS)
+        except Exception:
+            healthy = False
+        if not healthy:
+            try:
+                await self._restart(worker, "falha no health check")
+            except Exception as e:
+                logger.error(f"Worker LibreOffice {worker.index} não reiniciou: {e}")
+
+    async def convert(self, src_path: str, dest_path: str) -> str:
+        """Convert src_path to the format of dest_path's extension; returns dest_path."""
+        ext = os.path.splitext(dest_path)[1].lower()
+        if ext not in _FILTERS:
+            raise ValueError(f"Formato de conversão não suportado: {ext}")
+        await self.start()
+        if not self._workers:
+            raise OfficeUnavailableError("LibreOffice não está instalado")
+        if self.waiting >= self.queue_size:
+            self.rejected += 1
+            raise OfficePoolBusyError("Fila de conversões cheia — tente novamente em instantes")
+
+        idle = self._idle
+        self.waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            worker = await idle.get()
+        finally:
+            self.waiting -= 1
+        started = time.perf_counter()
+        self.wait_seconds += started - queued_at
+
+        timeout = settings.OFFICE_CONVERSION_TIMEOUT_SECONDS
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        tmp_path = os.path.join(os.path.dirname(dest_path), f".{uuid.uuid4().hex}{ext}")
+        try:
+            if not worker.is_alive():
+                await self._restart(worker, "processo encerrado")
+            elif worker.conversions >= settings.OFFICE_MAX_CONVERSIONS_PER_WORKER:
+                await self._restart(worker, f"{worker.conversions} conversões")
+            try:
+                await asyncio.wait_for(run_io(worker.convert, src_path, tmp_path, timeout), timeout)
+            except (asyncio.TimeoutError, TimeoutError):
+                self.timeouts += 1
+                self.failures += 1
+                await self._restart(worker, f"conversão excedeu {timeout:.0f}s")
+                raise RuntimeError(f"Conversão de {os.path.basename(src_path)} excedeu {timeout:.0f}s")
+            except Exception:
+                self.failures += 1
+                if not worker.is_alive():
+                    await self._restart(worker, "processo encerrado durante a conversão")
+                raise
+            await run_io(os.replace, tmp_path, dest_path)
+            worker.conversions += 1
+            self.conversions += 1
+            self.convert_seconds += time.perf_counter() - started
+            return dest_path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            # After stop() the worker belongs to no queue any more
+            if self._idle is idle:
+                idle.put_nowait(worker)
+
+    def metrics(self) -> dict:
+        finished = self.conversions + self.failures
+        return {
+            "mode": self.mode,
+            "workers": len(self._workers),
+            "alive": sum(1 for w in self._workers if w.is_alive()),
+            "busy": len(self._workers) - self._idle.qsize() if self._idle is not None else 0,
+            "queue_depth": self.waiting,
+            "queue_size": self.queue_size,
+            "conversions": self.conversions,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "avg_convert_seconds": round(self.convert_seconds / self.conversions, 3) if self.conversions else None,
+            "avg_wait_seconds": round(self.wait_seconds / finished, 3) if finished else None,
+        }
+
+
+_pool = OfficePool(settings.OFFICE_POOL_SIZE, settings.OFFICE_QUEUE_SIZE)
+
+
+async def convert_document(src_path: str, dest_path: str) -> str:
+    """Convert a document with LibreOffice, e.g. .odt → .docx or .docx → .pdf (format from dest_path)."""
+    return await _pool.convert(src_path, dest_path)
+
+
+def get_office_pool_metrics() -> dict:
+    return _pool.metrics()
+
+
+async def start_office_pool() -> None:
+    """Find LibreOffice and start the workers (FastAPI lifespan). Also started lazily on first use."""
+    await _pool.start()
+
+
+async def stop_office_pool() -> None:
+    await _pool.stop()
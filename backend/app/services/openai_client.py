@@ -0,0 +1,225 @@
+"""Process-wide OpenAI client shared by every AI agent.
+
+A single AsyncOpenAI instance (and therefore a single httpx connection pool) is
+created in the FastAPI lifespan and reused by all agent calls, so keep-alive
+connections avoid a fresh TLS handshake per request. Agents receive it wrapped
+in an AgentClient, which routes chat completions through the response cache and
+the per-model rate limiter, retries rate-limited and transient failures, and
+records token usage for each call.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Optional
+
+import httpx
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    InternalServerError,
+    RateLimitError,
+)
+from openai.types.chat import ChatCompletion
+
+from app.config import settings
+from app.services.ai_usage_service import record_usage
+from app.services.circuit_breaker import get_circuit_breaker
+from app.services.llm_cache import get_llm_cache, make_key
+from app.services.rate_limiter import estimate_request_tokens, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def init_openai_client() -> Optional[AsyncOpenAI]:
+    """Create the shared client if the API key is configured (idempotent)."""
+    global _client
+    if _client is not None or not settings.OPENAI_API_KEY:
+        return _client
+
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+    _client = AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=http_client,
+        timeout=settings.OPENAI_TIMEOUT_SECONDS,
+        # Retries are done by AgentClient so 429s go through the shared limiter
+        max_retries=0,
+    )
+    logger.info(
+        f"Cliente OpenAI inicializado (max_connections={settings.OPENAI_MAX_CONNECTIONS}, "
+        f"keepalive={settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS})"
+    )
+    return _client
+
+
+async def close_openai_client() -> None:
+    """Close the shared client and its connection pool."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def get_openai_client(agent_type: Optional[str] = None) -> Optional[AsyncOpenAI]:
+    """Return the shared client, with the per-agent timeout applied if configured.
+
+    Falls back to lazy initialization so scripts running outside the FastAPI
+    lifespan still get a client.
+    """
+    client = _client or init_openai_client()
+    if client is None:
+        return None
+
+    timeout = settings.OPENAI_AGENT_TIMEOUTS.get(agent_type or "")
+    if timeout:
+        # with_options() returns a copy that reuses the same httpx pool
+        return client.with_options(timeout=timeout)
+    return client
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-suggested wait from the Retry-After(-ms) headers, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        # HTTP-date form is not used by the OpenAI API
+        return None
+    return None
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry attempt."""
+    ceiling = min(settings.OPENAI_RETRY_MAX_SECONDS, settings.OPENAI_RETRY_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+class _ChatCompletions:
+    def __init__(self, owner: "AgentClient"):
+        self._owner = owner
+
+    async def create(self, **kwargs) -> ChatCompletion:
+        return await self._owner._create_chat_completion(**kwargs)
+
+
+class _Chat:
+    def __init__(self, owner: "AgentClient"):
+        self.completions = _ChatCompletions(owner)
+
+
+class AgentClient:
+    """Stand-in for AsyncOpenAI handed to agents.
+
+    Exposes client.chat.completions.create() with the same signature and
+    return type, serving identical requests from the response cache and
+    recording tokens, latency and cost of every call in AIUsageLog.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        agent_type: Optional[str],
+        use_cache: bool = True,
+        version_id: Optional[int] = None,
+    ):
+        self._client = client
+        self.agent_type = agent_type
+        self.use_cache = use_cache and settings.LLM_CACHE_ENABLED
+        self.version_id = version_id
+        self.chat = _Chat(self)
+
+    async def _create_chat_completion(self, **kwargs) -> ChatCompletion:
+        started = time.perf_counter()
+        key = None
+        if self.use_cache:
+            key = make_key(self.agent_type, kwargs)
+            cached = await get_llm_cache().get(key)
+            if cached is not None:
+                response = ChatCompletion.model_validate_json(cached)
+                self._record(kwargs, response, started, cache_hit=True)
+                return response
+
+        response = await self._create_with_retries(kwargs)
+        self._record(kwargs, response, started, cache_hit=False)
+
+        # Only cache complete answers; truncated output would be replayed forever
+        if key and response.choices and response.choices[0].finish_reason == "stop":
+            await get_llm_cache().put(
+                key, self.agent_type, kwargs.get("model"), response.model_dump_json()
+            )
+        return response
+
+    async def _create_with_retries(self, kwargs: dict) -> ChatCompletion:
+        """Send the request through the circuit breaker and the model's rate limiter.
+
+        429s pause the model for Retry-After (or a jittered backoff) and are
+        retried, as are connection errors and 5xx responses; the last error is
+        re-raised so the caller can fall back to the mock agent. While the
+        circuit is open, CircuitOpenError is raised without calling OpenAI.
+        """
+        breaker = get_circuit_breaker()
+        limiter = get_rate_limiter(kwargs.get("model"))
+        estimated = estimate_request_tokens(kwargs)
+        attempt = 0
+        while True:
+            breaker.before_call()
+            if limiter:
+                await limiter.acquire(estimated)
+            try:
+                response = await self._client.chat.completions.create(**kwargs)
+            except (RateLimitError, APIConnectionError, InternalServerError) as e:
+                if isinstance(e, RateLimitError):
+                    breaker.record_neutral()
+                else:
+                    breaker.record_failure(e)
+                if limiter:
+                    # Nothing was consumed by a failed request
+                    limiter.reconcile(estimated, 0)
+                if attempt >= settings.OPENAI_MAX_RETRIES:
+                    raise
+                delay = _retry_after_seconds(e) or _backoff_seconds(attempt)
+                if isinstance(e, RateLimitError) and limiter:
+                    limiter.pause(delay)
+                logger.warning(
+                    f"OpenAI {type(e).__name__} ({self.agent_type}), "
+                    f"nova tentativa {attempt + 1}/{settings.OPENAI_MAX_RETRIES} em {delay:.1f}s"
+                )
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                breaker.record_neutral()
+                raise
+
+            breaker.record_success()
+            if limiter and response.usage:
+                limiter.reconcile(estimated, response.usage.total_tokens)
+            return response
+
+    def _record(self, kwargs: dict, response: ChatCompletion, started: float, cache_hit: bool) -> None:
+        usage = response.usage
+        record_usage(
+            version_id=self.version_id,
+            agent_type=self.agent_type,
+            model=response.model or kwargs.get("model"),
+            tokens_input=usage.prompt_tokens if usage else 0,
+            tokens_output=usage.completion_tokens if usage else 0,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            cache_hit=cache_hit,
+        )
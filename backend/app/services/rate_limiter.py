@@ -0,0 +1,154 @@
+"""Per-model token-bucket rate limiter for OpenAI calls.
+
+Every agent call reserves one request and an estimate of its tokens from the
+model's requests-per-minute and tokens-per-minute buckets before it is sent,
+and the estimate is corrected with the real usage once the response arrives.
+Waiters are served in arrival order, and a 429 pauses the whole model for the
+server's Retry-After so concurrent analyses back off together.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Output budget assumed when the request does not set max_tokens
+_DEFAULT_OUTPUT_TOKENS = 1000
+
+
+def estimate_request_tokens(params: dict) -> int:
+    """Rough token count of a chat-completion request (≈4 chars per token)."""
+    chars = 0
+    for message in params.get("messages") or []:
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            chars += sum(len(part.get("text", "")) for part in content if isinstance(part, dict))
+    output = params.get("max_tokens") or params.get("max_completion_tokens") or _DEFAULT_OUTPUT_TOKENS
+    return chars // 4 + output
+
+
+class TokenBucket:
+    """Continuously refilling bucket; the level may go negative after reconciliation."""
+
+    def __init__(self, capacity: float, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self.level = capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it already is)."""
+        # A request larger than the whole bucket waits for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate else float("inf")
+
+
+class ModelRateLimiter:
+    """RPM and TPM buckets for one model, with FIFO admission."""
+
+    def __init__(self, model: str, rpm: int, tpm: int, clock: Callable[[], float] = time.monotonic):
+        self.model = model
+        self._clock = clock
+        self.requests = TokenBucket(rpm, rpm, clock)
+        self.tokens = TokenBucket(tpm, tpm, clock)
+        # asyncio.Lock wakes waiters in FIFO order, which makes admission fair
+        self._lock = asyncio.Lock()
+        self._blocked_until = 0.0
+        self.waiting = 0
+        self.admitted = 0
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+        self.rate_limit_errors = 0
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request and `tokens` tokens fit in the budget."""
+        started = self._clock()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                waited = False
+                while True:
+                    self.requests.refill()
+                    self.tokens.refill()
+                    delay = max(
+                        self._blocked_until - self._clock(),
+                        self.requests.wait_time(1),
+                        self.tokens.wait_time(tokens),
+                    )
+                    if delay <= 0:
+                        break
+                    waited = True
+                    await asyncio.sleep(delay)
+                self.requests.level -= 1
+                self.tokens.level -= tokens
+        finally:
+            self.waiting -= 1
+        self.admitted += 1
+        if waited:
+            self.throttled += 1
+            self.total_wait_seconds += self._clock() - started
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        """Replace a reservation's token estimate with the real usage."""
+        self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated - actual)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller of this model (server-reported Retry-After)."""
+        self.rate_limit_errors += 1
+        self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def metrics(self) -> dict:
+        self.requests.refill()
+        self.tokens.refill()
+        return {
+            "model": self.model,
+            "rpm_limit": self.requests.capacity,
+            "tpm_limit": self.tokens.capacity,
+            "requests_available": round(self.requests.level, 2),
+            "tokens_available": round(self.tokens.level),
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+            "rate_limit_errors": self.rate_limit_errors,
+            "paused_for_seconds": round(max(0.0, self._blocked_until - self._clock()), 3),
+        }
+
+
+_limiters: dict[str, ModelRateLimiter] = {}
+
+
+def get_rate_limiter(model: Optional[str]) -> Optional[ModelRateLimiter]:
+    """Return the limiter for a model, or None if the model has no configured budget.
+
+    Dated snapshots (e.g. gpt-4o-2024-08-06) share the base model's budget.
+    """
+    if not model:
+        return None
+    limits = settings.OPENAI_RATE_LIMITS
+    base = model if model in limits else next(
+        (m for m in sorted(limits, key=len, reverse=True) if model.startswith(m)), None
+    )
+    if base is None:
+        return None
+    if base not in _limiters:
+        _limiters[base] = ModelRateLimiter(base, limits[base]["rpm"], limits[base]["tpm"])
+    return _limiters[base]
+
+
+def get_rate_limit_metrics() -> list[dict]:
+    return [limiter.metrics() for limiter in _limiters.values()]
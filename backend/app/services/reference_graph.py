@@ -0,0 +1,153 @@
+"""Persisted document cross-reference graph.
+
+Every time a version is analyzed or imported, the document codes cited in its
+text are stored as edges in document_references (source document → cited
+type/sequential number). Edges point at the revision-independent
+(document_type, sequential_number) pair, so a citation of IT-003.00 still
+resolves after IT-003 is revised. The table is indexed on both ends, so
+outbound/inbound lookups and the transitive impact of retiring a document are
+plain index queries instead of re-running the crossref agent.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document
+from app.models.document_reference import DocumentReference
+from app.models.version import DocumentVersion
+from app.services.ai_agents.crossref_agent import CODE_REFERENCE
+
+logger = logging.getLogger(__name__)
+
+# Source documents in these states no longer depend on what they cite
+INACTIVE_STATUSES = ("obsolete", "cancelled", "archived")
+
+
+def extract_cited_codes(text: str) -> dict[tuple[str, int], str]:
+    """(document_type, sequential_number) → first code written in the text for it."""
+    cited: dict[tuple[str, int], str] = {}
+    for match in CODE_REFERENCE.finditer(text or ""):
+        cited.setdefault((match.group(1), int(match.group(2))), match.group(0))
+    return cited
+
+
+async def update_document_references(db: AsyncSession, version: DocumentVersion) -> int:
+    """Replace the outbound edges of version's document with the codes cited in its text.
+
+    Self-citations are ignored. Returns the number of edges written.
+    """
+    doc = version.document
+    if doc is None:
+        return 0
+
+    cited = extract_cited_codes(version.extracted_text or "")
+    cited.pop((doc.document_type, doc.sequential_number), None)
+
+    await db.execute(delete(DocumentReference).where(DocumentReference.source_document_id == doc.id))
+    for (doc_type, seq), code in cited.items():
+        db.add(DocumentReference(
+            source_document_id=doc.id,
+            source_version_id=version.id,
+            cited_code=code,
+            cited_type=doc_type,
+            cited_sequential=seq,
+        ))
+    await db.flush()
+    logger.debug(f"Grafo de referências: {doc.code} cita {len(cited)} documento(s)")
+    return len(cited)
+
+
+def _document_summary(doc: Optional[Document]) -> Optional[dict]:
+    if doc is None:
+        return None
+    return {"id": doc.id, "code": doc.code, "title": doc.title, "status": doc.status}
+
+
+async def get_outbound(db: AsyncSession, document: Document) -> list[dict]:
+    """Documents cited by document; targets not in the system have document=None."""
+    result = await db.execute(
+        select(DocumentReference, Document)
+        .outerjoin(
+            Document,
+            (Document.document_type == DocumentReference.cited_type)
+            & (Document.sequential_number == DocumentReference.cited_sequential),
+        )
+        .where(DocumentReference.source_document_id == document.id)
+        .order_by(DocumentReference.cited_type, DocumentReference.cited_sequential)
+    )
+    return [
+        {"cited_code": ref.cited_code, "document": _document_summary(target)}
+        for ref, target in result.all()
+    ]
+
+
+async def get_inbound(db: AsyncSession, document: Document) -> list[dict]:
+    """Documents that cite document."""
+    result = await db.execute(
+        select(DocumentReference, Document)
+        .join(Document, Document.id == DocumentReference.source_document_id)
+        .where(
+            DocumentReference.cited_type == document.document_type,
+            DocumentReference.cited_sequential == document.sequential_number,
+        )
+        .order_by(Document.code)
+    )
+    return [
+        {"cited_code": ref.cited_code, "document": _document_summary(source)}
+        for ref, source in result.all()
+    ]
+
+
+async def get_impact(
+    db: AsyncSession,
+    document: Document,
+    max_depth: int = 5,
+    include_inactive: bool = False,
+) -> list[dict]:
+    """Documents that depend on document, directly or transitively.
+
+    Breadth-first over inbound edges, one indexed query per level. Each
+    affected document is reported once, at its shortest distance, with the
+    citation path from it down to document. Obsolete/cancelled/archived
+    citing documents are skipped unless include_inactive is set.
+    """
+    if document.document_type is None or document.sequential_number is None:
+        return []
+
+    root = (document.document_type, document.sequential_number)
+    paths: dict[tuple[str, int], list[str]] = {root: [document.code]}
+    seen = {document.id}
+    frontier = [root]
+    impacted: list[dict] = []
+
+    for depth in range(1, max_depth + 1):
+        if not frontier:
+            break
+        stmt = (
+            select(Document, DocumentReference.cited_type, DocumentReference.cited_sequential)
+            .join(DocumentReference, DocumentReference.source_document_id == Document.id)
+            .where(tuple_(DocumentReference.cited_type, DocumentReference.cited_sequential).in_(frontier))
+            .order_by(Document.code)
+        )
+        if not include_inactive:
+            stmt = stmt.where(Document.status.notin_(INACTIVE_STATUSES))
+        result = await db.execute(stmt)
+
+        next_frontier = []
+        for source, cited_type, cited_seq in result.all():
+            if source.id in seen:
+                continue
+            seen.add(source.id)
+            path = [source.code] + paths[(cited_type, cited_seq)]
+            impacted.append({**_document_summary(source), "depth": depth, "path": path})
+            # Documents without a parsed code cannot be cited, so they end the chain
+            if source.document_type is not None and source.sequential_number is not None:
+                key = (source.document_type, source.sequential_number)
+                paths[key] = path
+                next_frontier.append(key)
+        frontier = next_frontier
+
+    return impacted
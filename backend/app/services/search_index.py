@@ -0,0 +1,170 @@
+"""SQLite FTS5 index for document search.
+
+One row per document version (rowid = version id) with the document code,
+title and extracted text, tokenized with unicode61 + remove_diacritics so
+"descricao" matches "Descrição". Triggers on documents/document_versions keep
+the index in sync with every write path (ORM, bulk import, raw SQL).
+Migrated databases get the table and triggers from migration 014, which keeps
+its own copy of the DDL; _CREATE_STATEMENTS only serves databases built with
+create_all (the dev startup in main.py, tests), and the tests check that both
+produce the same schema.
+Results are ranked with BM25 (code and title weigh more than body text) and
+come with a highlighted snippet: the document text is HTML-escaped and only
+the match markers are markup. On databases without FTS5 search falls back to
+the ILIKE query in document_service.
+"""
+
+import html
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "document_search"
+
+# BM25 column weights: document_id (unindexed), code, title, body
+_BM25_WEIGHTS = (0.0, 10.0, 5.0, 1.0)
+_SNIPPET_TOKENS = 12
+SNIPPET_OPEN, SNIPPET_CLOSE = "<mark>", "</mark>"
+# Private-use characters passed to snippet() and swapped for the markers after escaping
+_SENTINEL_OPEN, _SENTINEL_CLOSE = "\ue000", "\ue001"
+
+# Versions of one document compete for the same slot; fetch extra rows before deduplicating
+_ROWS_PER_RESULT = 4
+
+_TERM = re.compile(r"[^\W_]+(?:[-.][^\W_]+)*")
+
+_CREATE_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        document_id UNINDEXED, code, title, body,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_version_ai AFTER INSERT ON document_versions BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, document_id, code, title, body)
+        SELECT NEW.id, NEW.document_id, d.code, d.title, COALESCE(NEW.extracted_text, '')
+        FROM documents d WHERE d.id = NEW.document_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_version_au AFTER UPDATE OF extracted_text ON document_versions BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+        INSERT INTO {SEARCH_TABLE}(rowid, document_id, code, title, body)
+        SELECT NEW.id, NEW.document_id, d.code, d.title, COALESCE(NEW.extracted_text, '')
+        FROM documents d WHERE d.id = NEW.document_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_version_ad AFTER DELETE ON document_versions BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_document_au AFTER UPDATE OF code, title ON documents BEGIN
+        UPDATE {SEARCH_TABLE} SET code = NEW.code, title = NEW.title WHERE document_id = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_document_ad AFTER DELETE ON documents BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE document_id = OLD.id;
+    END
+    """,
+]
+
+_REBUILD_STATEMENTS = [
+    f"DELETE FROM {SEARCH_TABLE}",
+    f"""
+    INSERT INTO {SEARCH_TABLE}(rowid, document_id, code, title, body)
+    SELECT v.id, v.document_id, d.code, d.title, COALESCE(v.extracted_text, '')
+    FROM document_versions v JOIN documents d ON d.id = v.document_id
+    """,
+]
+
+_available = False
+
+
+@dataclass
+class SearchHit:
+    document_id: int
+    score: float      # higher is better (negated BM25)
+    snippet: str      # HTML-escaped matched fragment with SNIPPET_OPEN/SNIPPET_CLOSE markers
+
+
+def is_available() -> bool:
+    return _available
+
+
+async def init_search_index(conn: AsyncConnection) -> None:
+    """Create the FTS5 table and triggers, and fill the table if it is out of sync (FastAPI lifespan)."""
+    global _available
+    if conn.dialect.name != "sqlite":
+        logger.info("Índice de busca FTS5 indisponível (banco não é SQLite) — usando ILIKE")
+        return
+    try:
+        for statement in _CREATE_STATEMENTS:
+            await conn.exec_driver_sql(statement)
+        indexed = (await conn.exec_driver_sql(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar()
+        versions = (await conn.exec_driver_sql("SELECT count(*) FROM document_versions")).scalar()
+        if indexed != versions:
+            for statement in _REBUILD_STATEMENTS:
+                await conn.exec_driver_sql(statement)
+            logger.info(f"Índice de busca reconstruído: {versions} versões indexadas")
+    except Exception as e:
+        logger.warning(f"Índice de busca FTS5 indisponível — usando ILIKE: {e}")
+        return
+    _available = True
+
+
+def build_match_query(query_str: str) -> Optional[str]:
+    """FTS5 MATCH expression: every word of the query, as a prefix, in any column.
+
+    Each term is quoted so codes ("PQ-001.02") and FTS5 operators typed by the
+    user are treated as plain text.
+    """
+    terms = _TERM.findall(query_str)
+    if not terms:
+        return None
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+
+def render_snippet(raw: str) -> str:
+    """Escape a snippet() result and turn its sentinels into SNIPPET_OPEN/SNIPPET_CLOSE."""
+    # At worst a sentinel typed into the document becomes a stray <mark>; nothing else is markup
+    return html.escape(raw).replace(_SENTINEL_OPEN, SNIPPET_OPEN).replace(_SENTINEL_CLOSE, SNIPPET_CLOSE)
+
+
+async def search(db: AsyncSession, query_str: str, limit: int = 50) -> list[SearchHit]:
+    """Best-ranked versions per document for query_str, best first."""
+    match = build_match_query(query_str)
+    if match is None:
+        return []
+
+    weights = ", ".join(str(w) for w in _BM25_WEIGHTS)
+    result = await db.execute(
+        text(
+            f"SELECT document_id, bm25({SEARCH_TABLE}, {weights}) AS bm25_score, "
+            f"snippet({SEARCH_TABLE}, -1, :open, :close, '…', {_SNIPPET_TOKENS}) AS snippet "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match "
+            f"ORDER BY bm25_score LIMIT :rows"
+        ),
+        {
+            "match": match,
+            "open": _SENTINEL_OPEN,
+            "close": _SENTINEL_CLOSE,
+            "rows": limit * _ROWS_PER_RESULT,
+        },
+    )
+    hits: dict[int, SearchHit] = {}
+    for document_id, bm25_score, snippet in result.all():
+        if document_id not in hits:
+            hits[document_id] = SearchHit(int(document_id), -bm25_score, render_snippet(snippet or ""))
+            if len(hits) >= limit:
+                break
+    return list(hits.values())
@@ -0,0 +1,223 @@
+"""In-process pt-BR spelling pre-pass for the spelling-only review loop.
+
+A Hunspell pt_BR dictionary (.dic + .aff, see utils.hunspell) is loaded once at
+startup, together with a corporate whitelist and the words used in several
+published documents. Before the spelling agent is called in spelling-only
+mode, the text is tokenized and looked up locally; when every word is known
+the LLM call is skipped. The dictionary is SPELLING_DICTIONARY_PATH or, when
+empty, the pt_BR dictionary bundled with LibreOffice or installed for
+Hunspell; without one the checker stays disabled and every text goes to the
+agent as before.
+"""
+
+import logging
+import os
+import re
+import time
+from collections import Counter
+from typing import Iterable, Optional
+
+from app.config import settings
+from app.services.coding_service import CODE_PATTERN, VALID_DOCUMENT_TYPES
+from app.services.executor import run_io
+from app.utils.hunspell import HunspellDictionary, fold
+
+logger = logging.getLogger(__name__)
+
+# Words, optionally hyphenated (compound words and enclisis: "guarda-chuva", "verificá-lo")
+_WORD = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*")
+# Document codes in running text ("conforme PQ-001.02"), same format as coding_service
+_CODE_IN_TEXT = re.compile(r"\b" + CODE_PATTERN.pattern.lstrip("^").rstrip("$") + r"\b")
+
+# pt_BR dictionaries looked up when SPELLING_DICTIONARY_PATH is empty
+_SYSTEM_DICTIONARIES = [
+    "/usr/share/hunspell/pt_BR.dic",
+    "/usr/share/myspell/pt_BR.dic",
+    "/usr/share/myspell/dicts/pt_BR.dic",
+    "/usr/lib/libreoffice/share/extensions/dict-pt-BR/pt_BR.dic",
+    "/opt/homebrew/share/hunspell/pt_BR.dic",
+]
+
+
+def find_dictionary() -> Optional[str]:
+    """SPELLING_DICTIONARY_PATH, else the pt_BR dictionary of LibreOffice or of a system Hunspell."""
+    if settings.SPELLING_DICTIONARY_PATH:
+        return settings.SPELLING_DICTIONARY_PATH
+    from app.services.office_pool import find_office_binary
+
+    candidates = []
+    office_binary = find_office_binary()
+    if office_binary:
+        program_dir = os.path.dirname(os.path.realpath(office_binary))
+        candidates += [
+            os.path.join(program_dir, "..", "share", "extensions", "dict-pt-BR", "pt_BR.dic"),
+            os.path.join(program_dir, "..", "Resources", "extensions", "dict-pt-BR", "pt_BR.dic"),  # macOS bundle
+        ]
+    candidates += _SYSTEM_DICTIONARIES
+    return next((os.path.normpath(c) for c in candidates if os.path.exists(c)), None)
+
+
+class SpellChecker:
+    """Word-set lookup with hit/skip counters."""
+
+    def __init__(self):
+        self._words: frozenset[str] = frozenset()
+        self._dictionary = HunspellDictionary()
+        self.ready = False
+        self.dictionary_words = 0
+        self.affix_rules = 0
+        self.whitelist_words = 0
+        self.corpus_words = 0
+        self.checks = 0
+        self.clean = 0
+        self.check_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def load(self, dictionary_path: str, whitelist: Iterable[str], corpus_words: Iterable[str] = ()) -> None:
+        dictionary = HunspellDictionary.load(dictionary_path)
+        self.dictionary_words = len(dictionary)
+        self.affix_rules = dictionary.affix_rules
+
+        extra = {fold(w) for w in whitelist if w}
+        self.whitelist_words = sum(1 for w in extra if w not in dictionary)
+
+        corpus = {fold(w) for w in corpus_words} - extra
+        self.corpus_words = sum(1 for w in corpus if w not in dictionary)
+
+        self._dictionary = dictionary
+        self._words = frozenset(extra | corpus)
+        self.ready = True
+
+    def _known_word(self, word: str) -> bool:
+        return word in self._words or word in self._dictionary
+
+    def _known(self, token: str) -> bool:
+        # All-caps tokens are only accepted as words, whitelisted acronyms or document type codes
+        if token in VALID_DOCUMENT_TYPES:
+            return True
+        folded = fold(token)
+        if self._known_word(folded):
+            return True
+        # Hyphenated compounds and enclitic pronouns: every part must be known
+        if "-" in folded:
+            return all(self._known_word(part) for part in folded.split("-"))
+        return False
+
+    def suspicious_tokens(self, text: str) -> list[str]:
+        """Words not found in the dictionary, whitelist or published vocabulary."""
+        text = _CODE_IN_TEXT.sub(" ", text)
+        unknown = []
+        seen = set()
+        for match in _WORD.finditer(text):
+            token = match.group()
+            if token in seen:
+                continue
+            seen.add(token)
+            if not self._known(token):
+                unknown.append(token)
+        return unknown
+
+    def is_clean(self, text: str) -> Optional[bool]:
+        """True if every word is known, False if not, None if the checker is not loaded."""
+        if not self.ready:
+            return None
+        started = time.perf_counter()
+        clean = not self.suspicious_tokens(text)
+        self.check_seconds += time.perf_counter() - started
+        self.checks += 1
+        if clean:
+            self.clean += 1
+        return clean
+
+    def record_llm_call(self, seconds: float) -> None:
+        """Duration of a spelling-only agent call the pre-pass could not avoid."""
+        self.llm_calls += 1
+        self.llm_seconds += seconds
+
+    def stats(self) -> dict:
+        avg_llm = self.llm_seconds / self.llm_calls if self.llm_calls else None
+        return {
+            "ready": self.ready,
+            "dictionary_words": self.dictionary_words,
+            "affix_rules": self.affix_rules,
+            "whitelist_words": self.whitelist_words,
+            "published_vocabulary_words": self.corpus_words,
+            "checks": self.checks,
+            "llm_calls_skipped": self.clean,
+            "hit_rate": round(self.clean / self.checks, 4) if self.checks else 0.0,
+            "local_check_seconds": round(self.check_seconds, 3),
+            "avg_llm_call_seconds": round(avg_llm, 3) if avg_llm is not None else None,
+            # Skipped calls valued at the average duration of the calls that were made
+            "estimated_seconds_saved": (
+                round(self.clean * avg_llm - self.check_seconds, 1) if avg_llm is not None else None
+            ),
+        }
+
+
+_checker = SpellChecker()
+
+
+def get_spell_checker() -> SpellChecker:
+    return _checker
+
+
+def frequent_words(texts: Iterable[tuple[int, str]], min_documents: int) -> set[str]:
+    """Words (folded) found in the texts of at least min_documents distinct documents."""
+    documents: dict[int, set[str]] = {}
+    for document_id, text in texts:
+        if text:
+            words = documents.setdefault(document_id, set())
+            words.update(fold(m.group()) for m in _WORD.finditer(_CODE_IN_TEXT.sub(" ", text)))
+    counts = Counter(word for words in documents.values() for word in words)
+    return {word for word, count in counts.items() if count >= min_documents}
+
+
+async def _published_vocabulary() -> set[str]:
+    """Words used in several published versions (already reviewed and approved).
+
+    A word must appear in SPELLING_PUBLISHED_VOCABULARY_MIN_DOCUMENTS documents,
+    so a typo that slipped into one published document is not trusted.
+    """
+    from sqlalchemy import select
+
+    from app.database import async_session_factory
+    from app.models.version import DocumentVersion
+
+    async with async_session_factory() as db:
+        result = await db.execute(
+            select(DocumentVersion.document_id, DocumentVersion.extracted_text)
+            .where(DocumentVersion.status == "published")
+        )
+        texts = result.all()
+    return frequent_words(texts, settings.SPELLING_PUBLISHED_VOCABULARY_MIN_DOCUMENTS)
+
+
+async def load_spell_checker() -> None:
+    """Load the dictionary, whitelist and published vocabulary (FastAPI lifespan)."""
+    if not settings.SPELLING_PRE_PASS_ENABLED:
+        logger.info("Verificador ortográfico local desativado (SPELLING_PRE_PASS_ENABLED)")
+        return
+    path = find_dictionary()
+    if not path:
+        logger.info(
+            "Verificador ortográfico local desativado: dicionário pt_BR não encontrado "
+            "(instale o LibreOffice ou o hunspell-pt-br, ou defina SPELLING_DICTIONARY_PATH)"
+        )
+        return
+    if not os.path.exists(path):
+        logger.warning(f"Dicionário ortográfico não encontrado: {path}")
+        return
+
+    try:
+        corpus = await _published_vocabulary() if settings.SPELLING_USE_PUBLISHED_VOCABULARY else set()
+    except Exception as e:
+        logger.warning(f"Falha ao carregar vocabulário dos documentos publicados: {e}")
+        corpus = set()
+
+    await run_io(_checker.load, path, settings.SPELLING_WHITELIST, corpus)
+    logger.info(
+        f"Verificador ortográfico carregado de {path}: {_checker.dictionary_words} radicais, "
+        f"{_checker.affix_rules} regras de afixo, {_checker.whitelist_words} da lista corporativa, "
+        f"{_checker.corpus_words} dos documentos publicados"
+    )
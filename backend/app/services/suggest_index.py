@@ -0,0 +1,266 @@
+"""In-memory prefix index for search-as-you-type suggestions.
+
+Keys are document codes ("pq-001.02"), master list codes ("lm-003") and the
+accent-stripped words of each title, kept in one sorted list and looked up by
+prefix with bisect. Every word typed must prefix-match some key of a
+document. Words are matched longest (most selective) first and each later
+word only among the documents still in the running, so a short word never
+crowds out the documents a longer one would keep. When a word has too few
+exact prefix matches, variants at edit distance 1 (deletion, insertion, substitution, transposition) are tried too,
+so "PQ-01" also finds "PQ-001.02" and "limpesa" finds "Limpeza". Exact
+matches always rank above typo matches. The index is built at startup and
+updated by the services that create, recode or list documents, once their
+transaction commits (database.after_commit); the endpoint never touches the
+database.
+"""
+
+import logging
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Match kinds, best first
+MATCH_CODE, MATCH_TITLE, MATCH_FUZZY = "code", "title", "fuzzy"
+_MATCH_SCORE = {MATCH_CODE: 3, MATCH_TITLE: 2, MATCH_FUZZY: 1}
+
+# Title words shorter than this are not indexed ("de", "da", "e")
+_MIN_WORD_LEN = 3
+# Query terms shorter than this are not tried with typos
+_MIN_FUZZY_LEN = 3
+
+_QUERY_TERM = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]*)*")
+_TITLE_WORD = re.compile(r"[a-z0-9]+")
+_CODE_SEPARATORS = re.compile(r"[-.\s]")
+# Sorts after every character used in keys
+_PREFIX_END = "\uffff"
+
+
+def fold(value: str) -> str:
+    """Lowercase, accent-stripped form used for keys and queries ("Descrição" → "descricao")."""
+    value = unicodedata.normalize("NFKD", value)
+    return "".join(c for c in value if not unicodedata.combining(c)).lower()
+
+
+@dataclass
+class _Entry:
+    code: str
+    title: str
+    master_list_code: Optional[str] = None
+
+
+class SuggestIndex:
+    """Sorted (key, kind, document_id) list with prefix lookup."""
+
+    def __init__(self):
+        self._entries: dict[int, _Entry] = {}
+        self._keys: list[tuple[str, str, int]] = []
+        self._strings: list[str] = []  # self._keys[i][0], for fast bisect on plain strings
+        self.ready = False
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    def _document_keys(self, document_id: int, entry: _Entry) -> list[tuple[str, str, int]]:
+        keys = set()
+        for code in (entry.code, entry.master_list_code):
+            if not code:
+                continue
+            code = fold(code)
+            # "pq-001.02", plus "pq00102" and "001.02" so "PQ001" and "PQ 001" match too
+            keys.add((code, MATCH_CODE, document_id))
+            keys.add((_CODE_SEPARATORS.sub("", code), MATCH_CODE, document_id))
+            if "-" in code:
+                keys.add((code.split("-", 1)[1], MATCH_CODE, document_id))
+        for word in _TITLE_WORD.findall(fold(entry.title)):
+            if len(word) >= _MIN_WORD_LEN:
+                keys.add((word, MATCH_TITLE, document_id))
+        return sorted(keys)
+
+    def _remove_keys(self, document_id: int) -> None:
+        entry = self._entries.get(document_id)
+        if entry is None:
+            return
+        for key in self._document_keys(document_id, entry):
+            pos = bisect_left(self._keys, key)
+            if pos < len(self._keys) and self._keys[pos] == key:
+                del self._keys[pos]
+                del self._strings[pos]
+
+    def build(self, documents: list[tuple[int, str, str, Optional[str]]]) -> None:
+        """Rebuild from (document_id, code, title, master_list_code) rows."""
+        self._entries = {doc_id: _Entry(code, title or "", lm) for doc_id, code, title, lm in documents}
+        self._keys = sorted(
+            key for doc_id, entry in self._entries.items() for key in self._document_keys(doc_id, entry)
+        )
+        self._strings = [key for key, _, _ in self._keys]
+        self.ready = True
+
+    def upsert(
+        self,
+        document_id: int,
+        code: str,
+        title: str,
+        master_list_code: Optional[str] = None,
+        keep_master_list_code: bool = True,
+    ) -> None:
+        """Add or update a document (new document, new revision code, retitle)."""
+        previous = self._entries.get(document_id)
+        if keep_master_list_code and master_list_code is None and previous is not None:
+            master_list_code = previous.master_list_code
+        self._remove_keys(document_id)
+        entry = _Entry(code, title or "", master_list_code)
+        self._entries[document_id] = entry
+        for key in self._document_keys(document_id, entry):
+            pos = bisect_left(self._keys, key)
+            self._keys.insert(pos, key)
+            self._strings.insert(pos, key[0])
+
+    def set_master_list_code(self, document_id: int, master_list_code: Optional[str]) -> None:
+        entry = self._entries.get(document_id)
+        if entry is not None:
+            self.upsert(document_id, entry.code, entry.title, master_list_code, keep_master_list_code=False)
+
+    def remove(self, document_id: int) -> None:
+        self._remove_keys(document_id)
+        self._entries.pop(document_id, None)
+
+    def _has_prefix(self, prefix: str) -> bool:
+        pos = bisect_left(self._strings, prefix)
+        return pos < len(self._strings) and self._strings[pos].startswith(prefix)
+
+    def _next_chars(self, prefix: str) -> list[str]:
+        """Distinct characters that follow prefix in some key, jumping over runs with bisect."""
+        chars = []
+        pos = bisect_left(self._strings, prefix)
+        n = len(prefix)
+        while pos < len(self._strings) and self._strings[pos].startswith(prefix):
+            key = self._strings[pos]
+            if len(key) > n:
+                chars.append(key[n])
+                pos = bisect_left(self._strings, prefix + key[n] + _PREFIX_END, pos)
+            else:
+                pos += 1
+        return chars
+
+    def _typo_variants(self, term: str) -> set[str]:
+        """Edit-distance-1 variants of term that are a prefix of some key.
+
+        An edit at position i keeps term[:i], so only positions up to the
+        longest live prefix are tried, and substitutions/insertions only use
+        characters that actually follow term[:i] in the index.
+        """
+        live = 0
+        while live < len(term) and self._has_prefix(term[:live + 1]):
+            live += 1
+        variants = set()
+        for i in range(live + 1):
+            head, tail = term[:i], term[i:]
+            if tail:
+                variants.add(head + tail[1:])  # deletion
+            if len(tail) > 1:
+                variants.add(head + tail[1] + tail[0] + tail[2:])  # transposition
+            for c in self._next_chars(head):
+                variants.add(head + c + tail)  # insertion
+                if tail:
+                    variants.add(head + c + tail[1:])  # substitution
+        variants.discard(term)
+        variants.discard("")
+        return {v for v in variants if self._has_prefix(v)}
+
+    def _prefix_matches(self, prefix: str, among: Optional[dict] = None) -> dict[int, str]:
+        """document_id → best match kind among keys starting with prefix.
+
+        among restricts the result to the documents matched by earlier terms.
+        """
+        found: dict[int, str] = {}
+        start = bisect_left(self._strings, prefix)
+        end = bisect_left(self._strings, prefix + _PREFIX_END, start)
+        for _key, kind, doc_id in self._keys[start:end]:
+            if among is not None and doc_id not in among:
+                continue
+            if _MATCH_SCORE[kind] > _MATCH_SCORE.get(found.get(doc_id), 0):
+                found[doc_id] = kind
+        return found
+
+    def _term_matches(self, term: str, wanted: int, among: Optional[dict] = None) -> dict[int, str]:
+        found = self._prefix_matches(term, among)
+        if among is not None:
+            wanted = min(wanted, len(among))
+        if len(found) < wanted and len(term) >= _MIN_FUZZY_LEN:
+            for variant in self._typo_variants(term):
+                for doc_id in self._prefix_matches(variant, among):
+                    found.setdefault(doc_id, MATCH_FUZZY)
+        return found
+
+    def suggest(self, query: str, limit: int = 10) -> list[dict]:
+        """Documents whose keys match every term of query, best matches first."""
+        started = time.perf_counter()
+        terms = sorted(_QUERY_TERM.findall(fold(query)), key=len, reverse=True)
+        scores: dict[int, int] = {}
+        kinds: dict[int, str] = {}
+        for i, term in enumerate(terms):
+            matches = self._term_matches(term, limit, scores if i else None)
+            next_scores = {}
+            for doc_id in matches:
+                kind = matches[doc_id]
+                next_scores[doc_id] = scores.get(doc_id, 0) + _MATCH_SCORE[kind]
+                # Reported kind is the weakest match among the terms
+                kinds[doc_id] = min(kinds.get(doc_id, kind), kind, key=_MATCH_SCORE.get)
+            scores = next_scores
+            if not scores:
+                break
+
+        ranked = sorted(scores, key=lambda d: (-scores[d], self._entries[d].code))[:limit]
+        self.queries += 1
+        self.query_seconds += time.perf_counter() - started
+        return [
+            {
+                "document_id": doc_id,
+                "code": self._entries[doc_id].code,
+                "title": self._entries[doc_id].title,
+                "master_list_code": self._entries[doc_id].master_list_code,
+                "match": kinds[doc_id],
+            }
+            for doc_id in ranked
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "documents": len(self._entries),
+            "keys": len(self._keys),
+            "queries": self.queries,
+            "avg_query_ms": round(self.query_seconds / self.queries * 1000, 3) if self.queries else None,
+        }
+
+
+_index = SuggestIndex()
+
+
+def get_suggest_index() -> SuggestIndex:
+    return _index
+
+
+async def load_suggest_index() -> None:
+    """Build the index from all documents and active master list entries (FastAPI lifespan)."""
+    from sqlalchemy import select
+
+    from app.database import async_session_factory
+    from app.models.document import Document
+    from app.models.master_list import MasterListEntry
+
+    async with async_session_factory() as db:
+        result = await db.execute(
+            select(Document.id, Document.code, Document.title, MasterListEntry.master_list_code)
+            .outerjoin(
+                MasterListEntry,
+                (MasterListEntry.document_id == Document.id) & (MasterListEntry.removed_at.is_(None)),
+            )
+        )
+        rows = [tuple(row) for row in result.all()]
+    _index.build(rows)
+    logger.info(f"Índice de sugestões carregado: {len(rows)} documentos")
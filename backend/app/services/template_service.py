@@ -7,8 +7,8 @@ import os
 import re
 import copy
 import shutil
-import subprocess
 import unicodedata
+import uuid
 from typing import Optional
 from io import BytesIO
 from zipfile import ZipFile
@@ -18,6 +18,9 @@ from docx.shared import Pt, Cm, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
 from app.config import settings
+from app.services.document_parser import extract_header_footer_text, extract_text_from_odt
+from app.services.executor import run_cpu
+from app.services.office_pool import convert_document
 
 
 def _strip_accents(text: str) -> str:
@@ -230,44 +233,17 @@ def _populate_approval_table(doc: DocxDocument, approvers: list[dict]):
             return
 
 
-# ──────────────────────────────────────────────────────────────
-# ODT to DOCX conversion
-# ──────────────────────────────────────────────────────────────
-
-def convert_odt_to_docx(odt_path: str, output_dir: str) -> str:
-    """Convert .odt to .docx using LibreOffice headless."""
-    os.makedirs(output_dir, exist_ok=True)
-    result = subprocess.run(
-        ["libreoffice", "--headless", "--convert-to", "docx", "--outdir", output_dir, odt_path],
-        capture_output=True, text=True, timeout=60,
-    )
-    if result.returncode != 0:
-        raise RuntimeError(f"LibreOffice conversion failed: {result.stderr}")
-
-    base_name = os.path.splitext(os.path.basename(odt_path))[0]
-    return os.path.join(output_dir, f"{base_name}.docx")
-
-
-def convert_docx_to_pdf(docx_path: str, output_dir: str) -> str:
-    """Convert .docx to .pdf using LibreOffice headless."""
-    os.makedirs(output_dir, exist_ok=True)
-    result = subprocess.run(
-        ["libreoffice", "--headless", "--convert-to", "pdf", "--outdir", output_dir, docx_path],
-        capture_output=True, text=True, timeout=60,
-    )
-    if result.returncode != 0:
-        raise RuntimeError(f"LibreOffice PDF conversion failed: {result.stderr}")
-
-    base_name = os.path.splitext(os.path.basename(docx_path))[0]
-    return os.path.join(output_dir, f"{base_name}.pdf")
-
-
 # ──────────────────────────────────────────────────────────────
 # Find placeholders in a template
 # ──────────────────────────────────────────────────────────────
 
 def find_placeholders(template_path: str) -> list[str]:
-    """Scan a .docx template and return all {{PLACEHOLDER}} names found."""
+    """Scan a .docx or .odt template and return all {{PLACEHOLDER}} names found."""
+    if template_path.lower().endswith(".odt"):
+        # Read natively; the .docx conversion is only needed for formatting
+        text = f"{extract_header_footer_text(template_path)}\n\n{extract_text_from_odt(template_path)}"
+        return sorted({m.group(1) for m in PLACEHOLDER_RE.finditer(text)})
+
     doc = DocxDocument(template_path)
     found = set()
 
@@ -311,7 +287,7 @@ def format_with_template(
 ) -> str:
     """
     Full formatting pipeline:
-    1. Load template .docx (convert .odt if needed)
+    1. Load template .docx (.odt templates are converted by the caller)
     2. Replace header placeholders (TITULO, CODIGO, REVISAO, DATA, SETOR)
     3. Inject section content at {{SECTION}} markers
     4. Populate revision history table
@@ -323,13 +299,11 @@ def format_with_template(
     temp_dir = os.path.join(settings.STORAGE_PATH, "temp")
     os.makedirs(temp_dir, exist_ok=True)
 
-    # Convert .odt if needed
-    working_template = template_path
     if template_path.lower().endswith(".odt"):
-        working_template = convert_odt_to_docx(template_path, temp_dir)
+        raise ValueError("Template .odt deve ser convertido para .docx antes da formatação")
 
     # Open template
-    doc = DocxDocument(working_template)
+    doc = DocxDocument(template_path)
 
     # 1. Header placeholders
     header_replacements = {
@@ -427,28 +401,38 @@ async def format_document_with_template(
     # Extract images from source document
     images = None
     if source_docx_path and os.path.exists(source_docx_path):
-        images = extract_images_from_docx(source_docx_path)
-
-    # Run formatting
-    docx_path = format_with_template(
-        template_path=template_path,
-        sections=sections,
-        metadata=metadata,
-        history_entries=history,
-        approvers=approval_data,
-        source_images=images,
-        output_path=output_docx_path,
-    )
+        images = await run_cpu(extract_images_from_docx, source_docx_path)
+
+    # .odt templates without a stored .docx copy: convert through the LibreOffice pool
+    converted_template = None
+    if template_path.lower().endswith(".odt"):
+        temp_dir = os.path.join(settings.STORAGE_PATH, "temp")
+        os.makedirs(temp_dir, exist_ok=True)
+        converted_template = await convert_document(
+            template_path, os.path.join(temp_dir, f"template_{uuid.uuid4().hex}.docx")
+        )
+        template_path = converted_template
+
+    # Run formatting (CPU-bound python-docx work, in the process pool)
+    try:
+        docx_path = await run_cpu(
+            format_with_template,
+            template_path=template_path,
+            sections=sections,
+            metadata=metadata,
+            history_entries=history,
+            approvers=approval_data,
+            source_images=images,
+            output_path=output_docx_path,
+        )
+    finally:
+        if converted_template and os.path.exists(converted_template):
+            os.remove(converted_template)
 
     # Convert to PDF
     pdf_path = ""
     try:
-        output_dir = os.path.dirname(output_pdf_path)
-        pdf_path = convert_docx_to_pdf(docx_path, output_dir)
-        # Rename if needed
-        if pdf_path != output_pdf_path:
-            os.rename(pdf_path, output_pdf_path)
-            pdf_path = output_pdf_path
+        pdf_path = await convert_document(docx_path, output_pdf_path)
     except Exception:
         pdf_path = ""
 
@@ -0,0 +1,192 @@
+"""Section-aware, token-budgeted splitting of document text.
+
+Long documents are cut at the top-level headings already present in the
+extracted text (numbered headings such as "3. Descrição das Atividades:" or the
+known section names in formatting_agent.DEFAULT_SECTIONS) and consecutive
+sections are packed into chunks that fit a token budget. Chunks are exact
+slices of the original text, so concatenating them gives the input back.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+# Rough pt-BR average; good enough for budgeting, not for billing
+CHARS_PER_TOKEN = 4
+
+# "3. Título", "3.1 Título:", "3.1.2) Título", "3 - Título" — short numbered line starting with a capital
+_NUMBERED_HEADING = re.compile(r"^(\d{1,2}(?:\.\d{1,2}){0,3})[\.\)]?\s*(?:[-–]\s*)?[A-ZÀ-Ý][^\n]{0,100}$")
+
+_MAX_HEADING_CHARS = 100
+
+# Joins the cells of a table row in the extracted text (document_parser.TABLE_CELL_SEPARATOR)
+_TABLE_CELL_SEPARATOR = " | "
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A slice text[start:end] of the original document."""
+
+    index: int
+    start: int
+    end: int
+    text: str
+    headings: tuple[str, ...] = ()
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def normalize_heading(value: str) -> str:
+    """Accent-, case- and numbering-insensitive form of a heading ("3. Definições:" → "definicoes")."""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    value = re.sub(r"^[\s\d\.\)\-–]+", "", value)
+    value = re.sub(r"[\s:]+$", "", value)
+    return re.sub(r"\s+", " ", value).lower()
+
+
+def heading_level(line: str, known_levels: dict[str, int], styled_level: Optional[int] = None) -> Optional[int]:
+    """Level of line as a section heading, or None when it is body text.
+
+    Numbered lines get one level per number ("3.1" is level 2); other lines
+    are headings when their normalized title is in known_levels or when the
+    .docx gave them a heading style (styled_level). Steps ending in "." or
+    ";", "Termo: definição" lines and table rows are never headings; a
+    trailing ":" is allowed, as the templates write "1. OBJETIVO E ABRANGÊNCIA:".
+    """
+    stripped = line.strip()
+    if (
+        not stripped
+        or len(stripped) > _MAX_HEADING_CHARS
+        or _TABLE_CELL_SEPARATOR in stripped
+        or stripped.endswith((".", ";"))
+        or ":" in stripped.rstrip(":")
+    ):
+        return None
+    numbered = _NUMBERED_HEADING.match(stripped)
+    if numbered:
+        return numbered.group(1).count(".") + 1
+    return known_levels.get(normalize_heading(stripped), styled_level)
+
+
+def detect_headings(
+    text: str,
+    section_names: Optional[Iterable[str]] = None,
+    known_levels: Optional[dict[str, int]] = None,
+    styled_levels: Optional[dict[int, int]] = None,
+) -> list[tuple[int, int, str]]:
+    """(offset, level, heading line) of the heading lines of a plain text.
+
+    section_names are level 1; known_levels maps normalized titles to levels
+    (e.g. from a previous tree of the same document); styled_levels maps line
+    offsets to the level of their .docx heading style.
+    """
+    known_levels = dict(known_levels or {})
+    for name in section_names or ():
+        known_levels.setdefault(normalize_heading(name), 1)
+    styled_levels = styled_levels or {}
+
+    headings = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        level = heading_level(line, known_levels, styled_levels.get(offset))
+        if level is not None:
+            headings.append((offset, level, line.strip()))
+        offset += len(line)
+    return headings
+
+
+def split_sections(text: str, section_names: Optional[Iterable[str]] = None) -> list[tuple[int, str]]:
+    """Return (offset, heading) for each top-level heading line found in the text.
+
+    An implicit section at offset 0 (heading "") covers any preamble.
+    """
+    boundaries: list[tuple[int, str]] = [(0, "")]
+    for offset, level, heading in detect_headings(text, section_names):
+        if level != 1:
+            continue
+        if offset == 0:
+            boundaries[0] = (0, heading)
+        else:
+            boundaries.append((offset, heading))
+    return boundaries
+
+
+def _split_oversized(text: str, start: int, end: int, max_chars: int) -> list[tuple[int, int]]:
+    """Break one section that exceeds the budget at paragraph, then line, then hard limits."""
+    pieces: list[tuple[int, int]] = []
+    pos = start
+    while end - pos > max_chars:
+        window_end = pos + max_chars
+        cut = text.rfind("\n\n", pos + 1, window_end)
+        if cut == -1:
+            cut = text.rfind("\n", pos + 1, window_end)
+        cut = window_end if cut == -1 else cut + 1
+        pieces.append((pos, cut))
+        pos = cut
+    pieces.append((pos, end))
+    return pieces
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int,
+    section_names: Optional[Iterable[str]] = None,
+) -> list[Chunk]:
+    """Split text into chunks of at most ~max_tokens, cutting only at section headings when possible.
+
+    Returns a single chunk when the whole text fits the budget.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [Chunk(0, 0, len(text), text, tuple(h for _, h in split_sections(text, section_names) if h))]
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    boundaries = split_sections(text, section_names)
+    spans: list[tuple[int, int, str]] = []
+    for i, (offset, heading) in enumerate(boundaries):
+        end = boundaries[i + 1][0] if i + 1 < len(boundaries) else len(text)
+        if end - offset > max_chars:
+            for j, (s, e) in enumerate(_split_oversized(text, offset, end, max_chars)):
+                spans.append((s, e, heading if j == 0 else ""))
+        elif end > offset:
+            spans.append((offset, end, heading))
+
+    # Greedily pack consecutive sections into chunks
+    chunks: list[Chunk] = []
+    cur_start: Optional[int] = None
+    cur_end = 0
+    cur_headings: list[str] = []
+    for s, e, heading in spans:
+        if cur_start is not None and e - cur_start > max_chars:
+            chunks.append(Chunk(len(chunks), cur_start, cur_end, text[cur_start:cur_end], tuple(cur_headings)))
+            cur_start, cur_headings = None, []
+        if cur_start is None:
+            cur_start = s
+        cur_end = e
+        if heading:
+            cur_headings.append(heading)
+    if cur_start is not None:
+        chunks.append(Chunk(len(chunks), cur_start, cur_end, text[cur_start:cur_end], tuple(cur_headings)))
+    return chunks
+
+
+def outline(chunks: list[Chunk]) -> list[str]:
+    """All headings of the document, in order."""
+    return [h for chunk in chunks for h in chunk.headings]
+
+
+def rejoin(chunks: list[Chunk], outputs: list[str]) -> str:
+    """Concatenate per-chunk rewritten texts, restoring each chunk's surrounding whitespace.
+
+    Models tend to strip leading/trailing blank lines; keeping the original
+    whitespace makes the joined text line up with the input at the boundaries.
+    """
+    parts = []
+    for chunk, output in zip(chunks, outputs):
+        leading = chunk.text[: len(chunk.text) - len(chunk.text.lstrip())]
+        trailing = chunk.text[len(chunk.text.rstrip()):]
+        parts.append(f"{leading}{output.strip()}{trailing}")
+    return "".join(parts)
@@ -0,0 +1,174 @@
+"""Hunspell dictionary lookup (.dic stems + .aff affix rules).
+
+Stems are kept with their affix flags and inflected forms are recognised by
+stripping prefixes/suffixes at lookup time, as Hunspell does; expanding every
+form up front (unmunch) would take millions of entries for pt_BR.
+
+Supported: SET, FLAG (char, long, num, UTF-8), PFX/SFX with strip, conditions
+and cross products, one level of continuation classes (twofold suffixes),
+NEEDAFFIX and FORBIDDENWORD. Compounding, REP/MAP suggestions and
+morphological fields are ignored. Lookups are case-insensitive.
+"""
+
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+_SET = re.compile(rb"^SET\s+(\S+)", re.MULTILINE)
+
+
+def fold(word: str) -> str:
+    return unicodedata.normalize("NFC", word).lower()
+
+
+@dataclass(frozen=True)
+class Affix:
+    flag: str
+    strip: str
+    add: str
+    condition: Optional[re.Pattern]  # None = any stem
+    cross: bool                      # may combine with an affix of the other kind
+    continuation: frozenset[str]     # flags of affixes allowed on top of this one
+
+
+def _read(path: str) -> list[str]:
+    with open(path, "rb") as f:
+        data = f.read()
+    match = _SET.search(data)
+    encoding = match.group(1).decode("ascii", "ignore") if match else "utf-8"
+    try:
+        return data.decode(encoding, errors="ignore").splitlines()
+    except LookupError:
+        return data.decode("utf-8", errors="ignore").splitlines()
+
+
+def _parse_flags(raw: str, flag_type: str) -> frozenset[str]:
+    if flag_type == "long":
+        return frozenset(raw[i:i + 2] for i in range(0, len(raw), 2))
+    if flag_type == "num":
+        return frozenset(f for f in raw.split(",") if f)
+    return frozenset(raw)
+
+
+def _condition(raw: str, suffix: bool) -> Optional[re.Pattern]:
+    if raw == ".":
+        return None
+    try:
+        return re.compile(f"(?:{raw})$" if suffix else f"^(?:{raw})")
+    except re.error:
+        return None
+
+
+class HunspellDictionary:
+    """Stems with flags plus affix rules; `word in dictionary` checks a word."""
+
+    def __init__(self):
+        self.stems: dict[str, frozenset[str]] = {}
+        self.prefixes: dict[str, list[Affix]] = {}   # by added text
+        self.suffixes: dict[str, list[Affix]] = {}
+        self.flag_type = "char"
+        self.need_affix: Optional[str] = None
+        self.forbidden: Optional[str] = None
+
+    @classmethod
+    def load(cls, dic_path: str, aff_path: Optional[str] = None) -> "HunspellDictionary":
+        """Load a .dic word list; affix rules come from aff_path or the sibling .aff, if any.
+
+        A plain word list (one word per line) loads as stems without flags.
+        """
+        dictionary = cls()
+        aff_path = aff_path or os.path.splitext(dic_path)[0] + ".aff"
+        if os.path.exists(aff_path):
+            dictionary._load_aff(_read(aff_path))
+        dictionary._load_dic(_read(dic_path))
+        return dictionary
+
+    def _load_aff(self, lines: list[str]) -> None:
+        cross: dict[tuple[str, str], bool] = {}
+        for line in lines:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            key = parts[0]
+            if key == "FLAG" and len(parts) > 1:
+                self.flag_type = parts[1].lower()
+            elif key == "NEEDAFFIX" and len(parts) > 1:
+                self.need_affix = parts[1]
+            elif key == "FORBIDDENWORD" and len(parts) > 1:
+                self.forbidden = parts[1]
+            elif key in ("PFX", "SFX") and len(parts) >= 4:
+                flag = parts[1]
+                if (key, flag) not in cross:
+                    cross[(key, flag)] = parts[2] == "Y"  # header: PFX flag Y|N count
+                    continue
+                add, _, continuation = parts[3].partition("/")
+                affix = Affix(
+                    flag=flag,
+                    strip="" if parts[2] == "0" else fold(parts[2]),
+                    add="" if add == "0" else fold(add),
+                    condition=_condition(parts[4], key == "SFX") if len(parts) > 4 else None,
+                    cross=cross[(key, flag)],
+                    continuation=_parse_flags(continuation, self.flag_type),
+                )
+                table = self.suffixes if key == "SFX" else self.prefixes
+                table.setdefault(affix.add, []).append(affix)
+
+    def _load_dic(self, lines: list[str]) -> None:
+        for i, line in enumerate(lines):
+            entry = line.split(None, 1)[0] if line.strip() else ""
+            if not entry or (i == 0 and entry.isdigit()):
+                continue
+            word, _, flags = entry.partition("/")
+            if not word:
+                continue
+            word = fold(word)
+            parsed = _parse_flags(flags, self.flag_type)
+            self.stems[word] = self.stems.get(word, frozenset()) | parsed
+
+    def __len__(self) -> int:
+        return len(self.stems)
+
+    @property
+    def affix_rules(self) -> int:
+        return sum(map(len, self.prefixes.values())) + sum(map(len, self.suffixes.values()))
+
+    def _has(self, stem: str, flag: Optional[str] = None) -> bool:
+        flags = self.stems.get(stem)
+        if flags is None or (self.forbidden and self.forbidden in flags):
+            return False
+        if flag is None:
+            return not (self.need_affix and self.need_affix in flags)
+        return flag in flags
+
+    def _strip_suffixes(self, word: str) -> Iterator[tuple[str, Affix]]:
+        for i in range(len(word) + 1):
+            for affix in self.suffixes.get(word[i:], ()):
+                stem = word[:i] + affix.strip
+                if stem and (affix.condition is None or affix.condition.search(stem)):
+                    yield stem, affix
+
+    def _strip_prefixes(self, word: str) -> Iterator[tuple[str, Affix]]:
+        for i in range(len(word) + 1):
+            for affix in self.prefixes.get(word[:i], ()):
+                stem = affix.strip + word[i:]
+                if stem and (affix.condition is None or affix.condition.search(stem)):
+                    yield stem, affix
+
+    def __contains__(self, word: str) -> bool:
+        word = fold(word)
+        if self._has(word):
+            return True
+        for stem, suffix in self._strip_suffixes(word):
+            if self._has(stem, suffix.flag):
+                return True
+            # Twofold suffix: stem + inner + suffix, the inner one allowing this suffix
+            for inner_stem, inner in self._strip_suffixes(stem):
+                if suffix.flag in inner.continuation and self._has(inner_stem, inner.flag):
+                    return True
+            if suffix.cross:
+                for root, prefix in self._strip_prefixes(stem):
+                    if prefix.cross and self._has(root, prefix.flag) and self._has(root, suffix.flag):
+                        return True
+        return any(self._has(stem, prefix.flag) for stem, prefix in self._strip_prefixes(word))
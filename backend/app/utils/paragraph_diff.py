@@ -0,0 +1,44 @@
+"""Paragraph-level diff used to re-review only what the user changed."""
+
+import difflib
+import re
+
+# Paragraphs are separated by one or more blank lines
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+
+
+def split_paragraphs(text: str) -> list[tuple[int, int]]:
+    """Return (start, end) spans of the non-blank paragraphs of text."""
+    spans = []
+    pos = 0
+    for match in _PARAGRAPH_BREAK.finditer(text):
+        if text[pos:match.start()].strip():
+            spans.append((pos, match.start()))
+        pos = match.end()
+    if text[pos:].strip():
+        spans.append((pos, len(text)))
+    return spans
+
+
+def changed_spans(old_text: str, new_text: str) -> list[tuple[int, int]]:
+    """Spans of new_text covering paragraphs that are not present, unchanged, in old_text.
+
+    Paragraphs are aligned with difflib so moved or repeated paragraphs are
+    matched in order; adjacent changed paragraphs are merged into one span
+    (including the blank lines between them).
+    """
+    old_spans = split_paragraphs(old_text)
+    new_spans = split_paragraphs(new_text)
+    old_paragraphs = [old_text[s:e].strip() for s, e in old_spans]
+    new_paragraphs = [new_text[s:e].strip() for s, e in new_spans]
+
+    matcher = difflib.SequenceMatcher(a=old_paragraphs, b=new_paragraphs, autojunk=False)
+    spans: list[tuple[int, int]] = []
+    for tag, _i1, _i2, j1, j2 in matcher.get_opcodes():
+        if tag in ("replace", "insert") and j2 > j1:
+            start, end = new_spans[j1][0], new_spans[j2 - 1][1]
+            if spans and new_text[spans[-1][1]:start].strip() == "":
+                spans[-1] = (spans[-1][0], end)
+            else:
+                spans.append((start, end))
+    return spans
@@ -0,0 +1,160 @@
+"""Deterministic section-by-section diff between two document versions.
+
+Both texts are split at their section headings (see chunker.split_sections)
+and sections are matched by normalized title. Matched sections are compared
+paragraph by paragraph with difflib, and the first change in each section is
+shown as a word-level snippet. The result has the same shape the changelog
+agent used to produce for Changelog.diff_content.
+"""
+
+import difflib
+from typing import Iterable, Optional
+
+from app.utils.chunker import normalize_heading, split_sections
+from app.utils.paragraph_diff import split_paragraphs
+
+PREAMBLE_TITLE = "Cabeçalho"
+
+# Words of unchanged context around a change in snippets
+_SNIPPET_CONTEXT_WORDS = 6
+_SNIPPET_MAX_CHARS = 200
+
+
+def split_into_sections(text: str, section_names: Optional[Iterable[str]] = None) -> list[tuple[str, str]]:
+    """Return (heading, body) pairs in document order; the preamble has heading ""."""
+    boundaries = split_sections(text, section_names)
+    sections = []
+    for i, (offset, heading) in enumerate(boundaries):
+        end = boundaries[i + 1][0] if i + 1 < len(boundaries) else len(text)
+        block = text[offset:end]
+        body = block.split("\n", 1)[1] if heading and "\n" in block else ("" if heading else block)
+        if heading or body.strip():
+            sections.append((heading, body))
+    return sections
+
+
+def _paragraphs(body: str) -> list[str]:
+    return [" ".join(body[s:e].split()) for s, e in split_paragraphs(body)]
+
+
+def _truncate(words: list[str], leading: bool, trailing: bool) -> str:
+    text = " ".join(words)
+    if len(text) > _SNIPPET_MAX_CHARS:
+        text = text[:_SNIPPET_MAX_CHARS].rsplit(" ", 1)[0]
+        trailing = True
+    return f"{'… ' if leading else ''}{text}{' …' if trailing else ''}"
+
+
+def _word_snippets(old: str, new: str) -> tuple[str, str]:
+    """Old/new snippets around the first word-level difference between two paragraphs."""
+    old_words, new_words = old.split(), new.split()
+    matcher = difflib.SequenceMatcher(a=old_words, b=new_words, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        ctx = _SNIPPET_CONTEXT_WORDS
+        os_, oe = max(0, i1 - ctx), min(len(old_words), i2 + ctx)
+        ns, ne = max(0, j1 - ctx), min(len(new_words), j2 + ctx)
+        return (
+            _truncate(old_words[os_:oe], os_ > 0, oe < len(old_words)),
+            _truncate(new_words[ns:ne], ns > 0, ne < len(new_words)),
+        )
+    return "", ""
+
+
+def _describe(added: int, removed: int, modified: int) -> str:
+    parts = []
+    if modified:
+        parts.append(f"{modified} parágrafo(s) alterado(s)")
+    if added:
+        parts.append(f"{added} parágrafo(s) incluído(s)")
+    if removed:
+        parts.append(f"{removed} parágrafo(s) excluído(s)")
+    return ", ".join(parts).capitalize() + "." if parts else "Formatação alterada."
+
+
+def _compare_section(title: str, old_body: str, new_body: str) -> Optional[dict]:
+    old_pars, new_pars = _paragraphs(old_body), _paragraphs(new_body)
+    if old_pars == new_pars:
+        return None
+
+    matcher = difflib.SequenceMatcher(a=old_pars, b=new_pars, autojunk=False)
+    added = removed = modified = 0
+    old_snippet = new_snippet = None
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if tag == "replace":
+            paired = min(i2 - i1, j2 - j1)
+            modified += paired
+            removed += (i2 - i1) - paired
+            added += (j2 - j1) - paired
+            if old_snippet is None:
+                old_snippet, new_snippet = _word_snippets(old_pars[i1], new_pars[j1])
+        elif tag == "delete":
+            removed += i2 - i1
+            if old_snippet is None:
+                old_snippet, new_snippet = _truncate(old_pars[i1].split(), False, False), ""
+        elif tag == "insert":
+            added += j2 - j1
+            if old_snippet is None:
+                old_snippet, new_snippet = "", _truncate(new_pars[j1].split(), False, False)
+
+    return {
+        "section": title,
+        "change_type": "modified",
+        "description": _describe(added, removed, modified),
+        "old_content_snippet": old_snippet or "",
+        "new_content_snippet": new_snippet or "",
+        "paragraphs_added": added,
+        "paragraphs_removed": removed,
+        "paragraphs_modified": modified,
+    }
+
+
+def diff_sections(
+    old_text: str,
+    new_text: str,
+    section_names: Optional[Iterable[str]] = None,
+) -> list[dict]:
+    """Per-section added/removed/modified entries, in new-document order (removed sections last)."""
+    section_names = list(section_names or ())
+    old_sections = split_into_sections(old_text, section_names)
+    new_sections = split_into_sections(new_text, section_names)
+
+    # Repeated headings are matched in order of occurrence
+    old_by_key: dict[str, list[tuple[str, str]]] = {}
+    for heading, body in old_sections:
+        old_by_key.setdefault(normalize_heading(heading), []).append((heading, body))
+
+    changes = []
+    for heading, body in new_sections:
+        title = heading or PREAMBLE_TITLE
+        candidates = old_by_key.get(normalize_heading(heading))
+        if not candidates:
+            pars = _paragraphs(body)
+            changes.append({
+                "section": title,
+                "change_type": "added",
+                "description": f"Seção incluída ({len(pars)} parágrafo(s)).",
+                "old_content_snippet": "",
+                "new_content_snippet": _truncate(" ".join(pars).split(), False, False),
+            })
+            continue
+        _, old_body = candidates.pop(0)
+        change = _compare_section(title, old_body, body)
+        if change:
+            changes.append(change)
+
+    for heading, body in old_sections:
+        remaining = old_by_key.get(normalize_heading(heading))
+        if remaining and remaining[0] == (heading, body):
+            remaining.pop(0)
+            changes.append({
+                "section": heading or PREAMBLE_TITLE,
+                "change_type": "removed",
+                "description": "Seção excluída.",
+                "old_content_snippet": _truncate(" ".join(_paragraphs(body)).split(), False, False),
+                "new_content_snippet": "",
+            })
+    return changes
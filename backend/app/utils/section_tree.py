@@ -0,0 +1,107 @@
+"""Section tree of a document's extracted text.
+
+Built once when the original is parsed and stored on the version
+(DocumentVersion.section_tree), so later stages can address a section by
+title and slice it out of extracted_text instead of re-splitting the text.
+Each node has the heading's numbering and title, its level, character
+offsets into the text and the range of paragraph indexes (as returned by
+paragraph_diff.split_paragraphs) covered by its body:
+
+    {"number": "3", "title": "Descrição das Atividades", "level": 1,
+     "start": 812, "body_start": 840, "end": 2310,
+     "paragraphs": [6, 14], "children": [...]}
+
+Headings are found by chunker.detect_headings, the same detector the
+chunker and the changelog diff use: numbering patterns ("3.", "3.1",
+"3.1.2 Título:"), the known section names and, for .docx files, paragraphs
+with a heading style.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional
+
+from app.utils.chunker import detect_headings, normalize_heading
+from app.utils.paragraph_diff import split_paragraphs
+
+# "3.1. Título", "3.1) Título", "3 - Título"
+_LEADING_NUMBER = re.compile(r"^(\d{1,2}(?:\.\d{1,2})*)[\.\)]?\s*(?:[-–]\s*)?")
+
+
+def split_heading(line: str) -> tuple[Optional[str], str]:
+    """("3.1", "Limpeza") for "3.1. Limpeza:"; (None, line) when it is not numbered."""
+    line = line.strip()
+    match = _LEADING_NUMBER.match(line)
+    if match and match.end() < len(line):
+        return match.group(1), line[match.end():].rstrip(" :")
+    return None, line.rstrip(" :")
+
+
+def build_section_tree(
+    text: str,
+    headings: Optional[list[tuple[int, int, str]]] = None,
+    section_names: Optional[Iterable[str]] = None,
+) -> list[dict]:
+    """Nest headings by level into a tree of sections of text.
+
+    headings are (offset, level, heading line) sorted by offset, as returned
+    by chunker.detect_headings; when not given they are detected in the text.
+    """
+    if headings is None:
+        headings = detect_headings(text, section_names)
+
+    paragraph_starts = [start for start, _ in split_paragraphs(text)]
+    roots: list[dict] = []
+    open_nodes: list[dict] = []
+    for offset, level, line in headings:
+        while open_nodes and open_nodes[-1]["level"] >= level:
+            open_nodes.pop()["end"] = offset
+        line_end = text.find("\n", offset)
+        number, title = split_heading(line)
+        node = {
+            "number": number,
+            "title": title,
+            "level": level,
+            "start": offset,
+            "body_start": len(text) if line_end == -1 else line_end + 1,
+            "end": len(text),
+            "paragraphs": None,
+            "children": [],
+        }
+        (open_nodes[-1]["children"] if open_nodes else roots).append(node)
+        open_nodes.append(node)
+
+    for node in iter_sections(roots):
+        node["paragraphs"] = [
+            bisect_left(paragraph_starts, node["body_start"]),
+            bisect_left(paragraph_starts, node["end"]),
+        ]
+    return roots
+
+
+def rebuild_section_tree(text: str, previous: Optional[list[dict]]) -> list[dict]:
+    """Tree of an edited text, keeping the heading levels of the previous tree.
+
+    Used when extracted_text is replaced (spelling corrections), where the
+    .docx styles are no longer available.
+    """
+    known_levels = {normalize_heading(node["title"]): node["level"] for node in iter_sections(previous or [])}
+    return build_section_tree(text, detect_headings(text, known_levels=known_levels))
+
+
+def iter_sections(tree: list[dict]) -> Iterator[dict]:
+    """All nodes of the tree, depth first in document order."""
+    for node in tree:
+        yield node
+        yield from iter_sections(node["children"])
+
+
+def find_section(tree: Optional[list[dict]], title: str) -> Optional[dict]:
+    """First node whose title matches title, ignoring accents, case and numbering."""
+    wanted = normalize_heading(title)
+    return next((node for node in iter_sections(tree or []) if normalize_heading(node["title"]) == wanted), None)
+
+
+def section_body(text: str, node: dict) -> str:
+    """Text of a section after its heading line, including its subsections."""
+    return text[node["body_start"]:node["end"]]
@@ -0,0 +1,90 @@
+"""Apply context-anchored find/replace edits returned by the spelling agent.
+
+Each edit names the original fragment, its replacement and a short context
+(the sentence containing it). An edit is located by finding its context in the
+text and the original fragment inside that context; a fragment that is unique
+in the whole text may also be located without context. Edits that cannot be
+located unambiguously, or that overlap an edit already placed, are reported as
+conflicts and left unapplied.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class PatchResult:
+    text: str
+    applied: list[dict] = field(default_factory=list)     # edits with their offset in the input as "position"
+    conflicts: list[dict] = field(default_factory=list)   # edits with a "conflict" reason
+
+
+def _find_all(text: str, fragment: str, start: int = 0, end: Optional[int] = None) -> list[int]:
+    end = len(text) if end is None else end
+    positions = []
+    pos = text.find(fragment, start, end)
+    while pos != -1:
+        positions.append(pos)
+        pos = text.find(fragment, pos + 1, end)
+    return positions
+
+
+def _locate(text: str, original: str, context: str, taken: list[tuple[int, int]]) -> tuple[Optional[int], str]:
+    """Return (offset, "") for the edit, or (None, reason)."""
+    def free(pos: int) -> bool:
+        end = pos + len(original)
+        return all(end <= s or pos >= e for s, e in taken)
+
+    if context and original in context:
+        # The fragment may occur more than once inside its context; take the first free one
+        candidates = [
+            c + i
+            for c in _find_all(text, context)
+            for i in _find_all(context, original)
+            if free(c + i)
+        ]
+        if candidates:
+            return candidates[0], ""
+
+    all_occurrences = _find_all(text, original)
+    occurrences = [pos for pos in all_occurrences if free(pos)]
+    if len(occurrences) == 1:
+        return occurrences[0], ""
+    if not occurrences:
+        return None, "overlap" if all_occurrences else "not_found"
+    return None, "ambiguous"
+
+
+def apply_edits(text: str, edits: list[dict], replacement_key: str = "corrected") -> PatchResult:
+    """Apply edits to text, in order of their position in the text.
+
+    Each edit is a dict with "original", "context" and the replacement under
+    replacement_key. No-op edits are dropped; conflicting edits are returned
+    in PatchResult.conflicts.
+    """
+    placed: list[tuple[int, int, dict]] = []
+    taken: list[tuple[int, int]] = []
+    conflicts = []
+    for edit in edits:
+        original = edit.get("original") or ""
+        replacement = edit.get(replacement_key)
+        if not original or replacement is None or replacement == original:
+            continue
+        pos, reason = _locate(text, original, edit.get("context") or "", taken)
+        if pos is None:
+            conflicts.append({**edit, "conflict": reason})
+            continue
+        taken.append((pos, pos + len(original)))
+        placed.append((pos, pos + len(original), edit))
+
+    placed.sort(key=lambda p: p[0])
+    parts = []
+    applied = []
+    cursor = 0
+    for start, end, edit in placed:
+        parts.append(text[cursor:start])
+        parts.append(edit[replacement_key])
+        applied.append({**edit, "position": start})
+        cursor = end
+    parts.append(text[cursor:])
+    return PatchResult(text="".join(parts), applied=applied, conflicts=conflicts)
@@ -0,0 +1,66 @@
+"""Stream uploaded files to disk in fixed-size chunks.
+
+The upload is read chunk by chunk, hashed with SHA-256 as it goes and written
+to a temporary name next to the destination, which is atomically renamed
+into place once complete. Memory use per upload is one chunk regardless of
+file size, and uploads above the size limit are rejected as soon as the
+limit is crossed (or before reading, when the client sent the size).
+"""
+
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from app.config import settings
+
+
+class UploadTooLargeError(ValueError):
+    """The upload exceeds MAX_UPLOAD_BYTES."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"Arquivo excede o tamanho máximo permitido de {max_bytes // (1024 * 1024)} MB")
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    sha256: str
+    size: int
+
+
+async def stream_upload_to_disk(
+    file: UploadFile,
+    dest_path: str,
+    max_bytes: int | None = None,
+    chunk_size: int | None = None,
+) -> StoredUpload:
+    """Write file to dest_path chunk by chunk; raise UploadTooLargeError past max_bytes."""
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_BYTES
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    await aiofiles.os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                await out.write(chunk)
+        await aiofiles.os.replace(tmp_path, dest_path)
+    except BaseException:
+        if await aiofiles.os.path.exists(tmp_path):
+            await aiofiles.os.remove(tmp_path)
+        raise
+    return StoredUpload(path=dest_path, sha256=digest.hexdigest(), size=size)
@@ -0,0 +1,145 @@
+"""Benchmark: single-call vs section-chunked map-reduce for long documents.
+
+Runs analysis, spelling review and formatting on a synthetic PQ of the given
+size, once with chunking disabled and once with AI_CHUNK_MAX_TOKENS, and prints
+wall-clock time per agent.
+
+By default a simulated model is used whose latency grows with prompt and
+completion tokens (--input-tps / --output-tps), so the numbers reflect how
+chunking parallelizes generation without spending API credits. Pass --live to
+call OpenAI with the configured key instead.
+
+    cd backend
+    python -m benchmarks.bench_chunking --pages 40
+    python -m benchmarks.bench_chunking --pages 40 --live
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from types import SimpleNamespace
+
+from openai.types.chat import ChatCompletion
+
+from app.config import settings
+from app.services.ai_agents import analysis_agent, formatting_agent, spelling_agent
+from app.utils.chunker import chunk_text, estimate_tokens
+
+_PARAGRAPH = (
+    "O responsável pelo setor deve verificar o registro de controle, conferir a "
+    "identificação do lote e assegurar que a informação documentada esteja disponível "
+    "no ponto de uso, conforme os requisitos aplicáveis da norma."
+)
+
+
+def build_document(pages: int) -> str:
+    """Synthetic PQ with the standard numbered sections, ~500 words per page."""
+    sections = formatting_agent.DEFAULT_SECTIONS["PQ"]
+    per_section = max(1, pages * 12 // len(sections))
+    parts = []
+    for number, title in enumerate(sections, start=1):
+        parts.append(f"{number}. {title}\n")
+        for i in range(per_section):
+            parts.append(f"{_PARAGRAPH} Item {number}.{i + 1}.\n")
+        parts.append("\n")
+    return "".join(parts)
+
+
+class SimulatedCompletions:
+    """Chat-completions stand-in with token-proportional latency."""
+
+    def __init__(self, input_tps: float, output_tps: float):
+        self.input_tps = input_tps
+        self.output_tps = output_tps
+        self.calls = 0
+
+    async def create(self, **kwargs) -> ChatCompletion:
+        self.calls += 1
+        system = kwargs["messages"][0]["content"]
+        user = kwargs["messages"][1]["content"]
+        body = user.split("\n\n", 1)[1] if "\n\n" in user else user
+
+        if "NÃO reescreva o texto" in system:
+            # Spelling agent in patch mode: a clean text has no edits
+            content = json.dumps({"spelling_errors": [], "clarity_suggestions": []})
+        elif "corrected_text" in system:
+            content = json.dumps({"corrected_text": body, "spelling_errors": [], "clarity_suggestions": []})
+        elif "sections" in system and "metadata" in system:
+            parts = re.split(r"^\d+\. (.+)\n", body, flags=re.M)
+            sections = [{"title": "Descrição das Atividades", "content": parts[0], "level": 1}] if parts[0].strip() else []
+            sections += [
+                {"title": title, "content": section, "level": 1}
+                for title, section in zip(parts[1::2], parts[2::2])
+            ]
+            content = json.dumps({
+                "sections": sections,
+                "metadata": {"title": "PQ sintético"},
+            })
+        else:
+            content = json.dumps({"feedback_items": [{"item": "Completude", "status": "approved", "suggestion": None}], "approved": True})
+
+        prompt_tokens = estimate_tokens(system) + estimate_tokens(user)
+        completion_tokens = estimate_tokens(content)
+        await asyncio.sleep(0.3 + prompt_tokens / self.input_tps + completion_tokens / self.output_tps)
+        return ChatCompletion.model_validate({
+            "id": "bench", "object": "chat.completion", "created": 0, "model": kwargs["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+
+async def _time(coro) -> tuple[float, dict]:
+    started = time.perf_counter()
+    result = await coro
+    return time.perf_counter() - started, result
+
+
+async def run(args) -> None:
+    text = build_document(args.pages)
+    if args.live:
+        from app.services.openai_client import AgentClient, get_openai_client
+
+        raw = get_openai_client()
+        if raw is None:
+            raise SystemExit("OPENAI_API_KEY não configurada")
+        client = AgentClient(raw, "benchmark", use_cache=False)
+    else:
+        client = SimpleNamespace(chat=SimpleNamespace(
+            completions=SimulatedCompletions(args.input_tps, args.output_tps)
+        ))
+
+    chunks = chunk_text(text, args.chunk_tokens, formatting_agent.DEFAULT_SECTIONS["PQ"])
+    print(f"Documento: {len(text)} caracteres, ~{estimate_tokens(text)} tokens, "
+          f"{len(chunks)} trechos de até {args.chunk_tokens} tokens\n")
+
+    agents = {
+        "analysis": lambda: analysis_agent.analyze(client, text, document_type="PQ"),
+        "spelling": lambda: spelling_agent.review_spelling_clarity(client, text),
+        "formatting": lambda: formatting_agent.restructure(client, text, document_type="PQ"),
+    }
+    print(f"{'agente':<12}{'chamada única (s)':>20}{'em trechos (s)':>18}{'ganho':>9}")
+    for name, call in agents.items():
+        settings.AI_CHUNK_MAX_TOKENS = 10**9
+        single, _ = await _time(call())
+        settings.AI_CHUNK_MAX_TOKENS = args.chunk_tokens
+        chunked, result = await _time(call())
+        print(f"{name:<12}{single:>20.2f}{chunked:>18.2f}{single / chunked:>8.1f}x")
+        if name == "spelling" and not args.live:
+            assert result["corrected_text"] == text, "texto revisado em trechos não reconstitui o original"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40, help="tamanho do documento sintético")
+    parser.add_argument("--chunk-tokens", type=int, default=settings.AI_CHUNK_MAX_TOKENS)
+    parser.add_argument("--input-tps", type=float, default=5000.0, help="tokens/s de leitura simulados")
+    parser.add_argument("--output-tps", type=float, default=80.0, help="tokens/s de geração simulados")
+    parser.add_argument("--live", action="store_true", help="usar a API da OpenAI")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
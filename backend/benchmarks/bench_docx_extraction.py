@@ -0,0 +1,111 @@
+"""Benchmark: streaming .docx extractor vs the python-docx object model.
+
+Builds a synthetic document of the given size (numbered paragraphs plus RQ
+style tables, header and footer) and extracts its text with the previous
+python-docx implementation and with document_parser.extract_text_from_docx,
+each in a fresh process, printing wall-clock time and peak memory growth.
+
+    cd backend
+    python -m benchmarks.bench_docx_extraction --paragraphs 20000 --table-rows 2000
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from docx import Document as DocxDocument
+
+from app.services.document_parser import extract_text_from_docx
+
+_PARAGRAPH = (
+    "O responsável pelo setor deve verificar o registro de controle, conferir a "
+    "identificação do lote e assegurar que a informação documentada esteja disponível."
+)
+
+
+def extract_text_python_docx(file_path: str) -> str:
+    """Previous implementation: body paragraphs only, through python-docx."""
+    doc = DocxDocument(file_path)
+    return "\n\n".join(p.text.strip() for p in doc.paragraphs if p.text.strip())
+
+
+_IMPLEMENTATIONS = {
+    "python-docx": extract_text_python_docx,
+    "streaming": extract_text_from_docx,
+}
+
+
+def build_document(path: str, paragraphs: int, table_rows: int) -> None:
+    doc = DocxDocument()
+    section = doc.sections[0]
+    section.header.paragraphs[0].text = "RQ-001.00 Registro de inspeção"
+    section.footer.paragraphs[0].text = "Documento controlado"
+    for i in range(paragraphs):
+        doc.add_paragraph(f"{i + 1}. {_PARAGRAPH}")
+    if table_rows:
+        table = doc.add_table(rows=table_rows, cols=4)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"Campo {r}.{c}"
+    doc.save(path)
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS, KiB on Linux
+
+
+def _measure(name: str, path: str, queue) -> None:
+    fn = _IMPLEMENTATIONS[name]
+    before = _peak_rss_kb()
+    started = time.perf_counter()
+    text = fn(path)
+    elapsed = time.perf_counter() - started
+    queue.put((elapsed, _peak_rss_kb() - before, len(text)))
+
+
+def run_isolated(name: str, path: str) -> tuple[float, int, int]:
+    """(seconds, peak RSS growth in KiB, characters) of one extraction in a fresh process."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(name, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def build_isolated(path: str, paragraphs: int, table_rows: int) -> None:
+    """Build the document in another process: peak RSS is inherited by children, and
+    building a large document here would hide the extraction's own memory use."""
+    process = multiprocessing.get_context("spawn").Process(target=build_document, args=(path, paragraphs, table_rows))
+    process.start()
+    process.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=20000)
+    parser.add_argument("--table-rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por implementação (melhor tempo)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.docx")
+        build_isolated(path, args.paragraphs, args.table_rows)
+        print(f"Documento: {args.paragraphs} parágrafos, tabela de {args.table_rows}x4, "
+              f"{os.path.getsize(path) // 1024} KiB\n")
+        print(f"{'implementação':<14}{'tempo (s)':>12}{'memória (MiB)':>16}{'caracteres':>13}")
+        for name in _IMPLEMENTATIONS:
+            runs = [run_isolated(name, path) for _ in range(args.repeat)]
+            elapsed = min(r[0] for r in runs)
+            memory = min(r[1] for r in runs)
+            print(f"{name:<14}{elapsed:>12.3f}{memory / 1024:>16.1f}{runs[0][2]:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark: one soffice process per conversion vs the LibreOffice worker pool.
+
+Builds a sample .docx and converts it to PDF the way the app used to (a new
+`soffice --headless --convert-to pdf` per conversion) and through
+office_pool.OfficePool, printing per-conversion latency (first conversion,
+average of the rest) and the throughput of concurrent conversions.
+
+The pool runs in "uno" mode (long-lived listeners) when a Python able to
+import uno is found, and in "subprocess" mode otherwise; the mode is shown
+in the output. Profiles are created in a temporary directory, so the first
+conversion of each worker includes creating its profile.
+
+    cd backend
+    python -m benchmarks.bench_office_pool --conversions 10 --workers 2
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from docx import Document as DocxDocument
+
+from app.config import settings
+from app.services import office_pool
+from app.services.executor import shutdown_executors
+
+_PARAGRAPH = (
+    "O responsável pelo setor deve verificar o registro de controle, conferir a "
+    "identificação do lote e assegurar que a informação documentada esteja disponível."
+)
+
+
+def build_document(path: str, paragraphs: int) -> None:
+    doc = DocxDocument()
+    doc.add_heading("PQ-001 Procedimento de inspeção", level=1)
+    for i in range(paragraphs):
+        doc.add_paragraph(f"{i + 1}. {_PARAGRAPH}")
+    doc.save(path)
+
+
+def convert_cold(office_binary: str, src: str, outdir: str) -> None:
+    """Previous approach: a fresh soffice (and a fresh profile) per conversion."""
+    with tempfile.TemporaryDirectory() as profile:
+        subprocess.run(
+            [office_binary, "--headless", "--norestore", f"-env:UserInstallation=file://{profile}",
+             "--convert-to", "pdf", "--outdir", outdir, src],
+            capture_output=True, timeout=settings.OFFICE_CONVERSION_TIMEOUT_SECONDS, check=True,
+        )
+
+
+def _summary(latencies: list[float]) -> tuple[float, float]:
+    rest = latencies[1:] or latencies
+    return latencies[0], sum(rest) / len(rest)
+
+
+async def bench_pool(src: str, outdir: str, conversions: int, workers: int) -> tuple[str, float, list[float], float]:
+    pool = office_pool.OfficePool(workers, queue_size=max(conversions, settings.OFFICE_QUEUE_SIZE))
+    started = time.perf_counter()
+    await pool.start()
+    startup = time.perf_counter() - started
+    try:
+        latencies = []
+        for i in range(conversions):
+            started = time.perf_counter()
+            await pool.convert(src, os.path.join(outdir, f"pool-{i}.pdf"))
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(pool.convert(src, os.path.join(outdir, f"concurrent-{i}.pdf"))
+                               for i in range(conversions)))
+        concurrent = time.perf_counter() - started
+        return pool.mode, startup, latencies, concurrent
+    finally:
+        await pool.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversions", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=settings.OFFICE_POOL_SIZE)
+    parser.add_argument("--paragraphs", type=int, default=200)
+    args = parser.parse_args()
+
+    office_binary = office_pool.find_office_binary()
+    if office_binary is None:
+        sys.exit("LibreOffice não encontrado — defina OFFICE_BINARY ou instale o soffice")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.STORAGE_PATH = tmp  # worker profiles go to office_profiles/ under it
+        src = os.path.join(tmp, "bench.docx")
+        outdir = os.path.join(tmp, "out")
+        os.makedirs(outdir)
+        build_document(src, args.paragraphs)
+        print(f"Documento: {args.paragraphs} parágrafos, {os.path.getsize(src) // 1024} KiB; "
+              f"{args.conversions} conversões para PDF\n")
+
+        cold = []
+        for _ in range(args.conversions):
+            started = time.perf_counter()
+            convert_cold(office_binary, src, outdir)
+            cold.append(time.perf_counter() - started)
+
+        mode, startup, pooled, concurrent = asyncio.run(bench_pool(src, outdir, args.conversions, args.workers))
+        shutdown_executors()
+
+        print(f"{'execução':<26}{'primeira (s)':>14}{'média (s)':>12}{'total (s)':>12}")
+        first, avg = _summary(cold)
+        print(f"{'soffice por conversão':<26}{first:>14.3f}{avg:>12.3f}{sum(cold):>12.3f}")
+        first, avg = _summary(pooled)
+        print(f"{f'pool ({mode}, sequencial)':<26}{first:>14.3f}{avg:>12.3f}{sum(pooled):>12.3f}")
+        print(f"{f'pool ({mode}, concorrente)':<26}{'':>14}{concurrent / args.conversions:>12.3f}{concurrent:>12.3f}")
+        print(f"\nInicialização do pool ({args.workers} workers): {startup:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import app.models  # noqa: F401
+from app.database import Base
+
+
+@pytest.fixture
+def run_with_db():
+    """Runs work(engine) on a fresh in-memory database with every table created.
+
+    Returns whatever work returns; the engine is disposed afterwards.
+    """
+
+    def run(work):
+        async def main():
+            engine = create_async_engine("sqlite+aiosqlite://")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            try:
+                return await work(engine)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,136 @@
+from pathlib import Path
+
+import pytest
+
+from app.services.ai_agents.formatting_agent import DEFAULT_SECTIONS
+from app.services.document_parser import extract_text
+from app.utils.chunker import (
+    CHARS_PER_TOKEN,
+    chunk_text,
+    detect_headings,
+    heading_level,
+    normalize_heading,
+    outline,
+    rejoin,
+    split_sections,
+)
+
+SAMPLES = Path(__file__).resolve().parents[2]
+SECTION_NAMES = [name for names in DEFAULT_SECTIONS.values() for name in names]
+
+
+def _section(number: int, title: str, paragraphs: int) -> str:
+    body = "\n\n".join(f"Parágrafo {i} da seção {number} com algum conteúdo descritivo." for i in range(paragraphs))
+    return f"{number}. {title}:\n\n{body}\n\n"
+
+
+def test_normalize_heading_ignores_numbering_accents_case_and_colon():
+    assert normalize_heading("3. DEFINIÇÕES:") == "definicoes"
+    assert normalize_heading("  1.OBJETIVO E  ABRANGÊNCIA : ") == "objetivo e abrangencia"
+    assert normalize_heading("4.1.2) Condições de Segurança") == "condicoes de seguranca"
+
+
+@pytest.mark.parametrize("line, level", [
+    ("1. OBJETIVO E ABRANGÊNCIA:", 1),
+    ("2.DOCUMENTOS COMPLEMENTARES:", 1),
+    ("7. HISTÓRICO DE REVISÃO", 1),
+    ("4.1. TIPOS DE DOCUMENTOS DA QUALIDADE:", 2),
+    ("4.1.1 XXX:", 3),
+    ("3 - Definições", 1),
+    ("OBJETIVO E ABRANGÊNCIA:", 1),             # known section name, unnumbered
+    ("1. Objetivo e abrangência | X | X | Obrigatório", None),  # table row
+    ("2.1 RQ-001: Registro de Treinamento", None),              # "Termo: definição"
+    ("1. Verificar o registro de controle.", None),             # step
+    ("Cumprir os prazos xxx;", None),
+    ("TABELA 1: CAPÍTULOS POR TIPOS DE DOCUMENTOS", None),
+    ("Parágrafo comum sem numeração", None),
+    ("4.1 xxx:", None),                         # lower case after the number
+])
+def test_heading_level(line, level):
+    assert heading_level(line, {normalize_heading(name): 1 for name in SECTION_NAMES}) == level
+
+
+def test_styled_lines_are_headings_unless_they_look_like_body_text():
+    assert heading_level("ANEXO A", {}, styled_level=1) == 1
+    assert heading_level("4.1 TIPOS", {}, styled_level=1) == 2  # numbering wins over the style
+    assert heading_level("Revisão: Número da revisão do documento", {}, styled_level=1) is None
+
+
+def test_detect_headings_offsets_point_at_the_heading_lines():
+    text = "Preâmbulo\n1. OBJETIVO:\nTexto.\n1.1 ESCOPO\nMais texto.\n"
+    headings = detect_headings(text)
+
+    assert headings == [(10, 1, "1. OBJETIVO:"), (30, 2, "1.1 ESCOPO")]
+    assert all(text[offset:].startswith(line) for offset, _, line in headings)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("PQ-000.00 (FORMATAÇÃO ATUALIZADA) - FAZER A CÓPIA DESSE MODELO.docx", [
+        "1. OBJETIVO E ABRANGÊNCIA:", "2. DOCUMENTOS COMPLEMENTARES:", "3. DEFINIÇÕES:",
+        "4. DESCRIÇÃO DAS ATIVIDADES:", "5. RESPONSABILIDADES:", "6. APROVAÇÃO DO DOCUMENTO:",
+        "7. HISTÓRICO DE REVISÃO",
+    ]),
+    ("PQ-001.03 CONTROLE DE INFORMAÇÃO DOCUMENTADA.docx", [
+        "OBJETIVO E ABRANGÊNCIA:", "DOCUMENTOS COMPLEMENTARES:", "3. DEFINIÇÕES:",
+        "4. DESCRIÇÃO DAS ATIVIDADES:", "6. RESPONSABILIDADES:", "7. APROVAÇÃO DO DOCUMENTO:",
+    ]),
+    ("IT-000.00 (FORMATAÇÃO ATUALIZADA) - FAZER A CÓPIA DESSE MODELO.odt", [
+        "1.OBJETIVO E ABRANGÊNCIA:", "2.DOCUMENTOS COMPLEMENTARES:", "3. DEFINIÇÕES:",
+        "4. CARACTERÍSTICAS:", "5. APROVAÇÃO DO DOCUMENTO:", "6. HISTÓRICO DE REVISÃO",
+    ]),
+])
+def test_split_sections_on_sample_documents(name, expected):
+    text = extract_text(str(SAMPLES / name))
+
+    boundaries = split_sections(text, SECTION_NAMES)
+
+    assert [heading for _, heading in boundaries] == expected
+    assert boundaries[0][0] == 0
+    assert all(text[offset:].startswith(heading) for offset, heading in boundaries)
+
+
+def test_split_sections_keeps_a_preamble_without_heading():
+    assert split_sections("Título do documento\n\n1. OBJETIVO:\n\nTexto") == [(0, ""), (21, "1. OBJETIVO:")]
+
+
+def test_short_text_is_a_single_chunk():
+    text = _section(1, "OBJETIVO", 2) + _section(2, "DEFINIÇÕES", 2)
+
+    chunks = chunk_text(text, max_tokens=10_000)
+
+    assert len(chunks) == 1
+    assert chunks[0].text == text
+    assert chunks[0].headings == ("1. OBJETIVO:", "2. DEFINIÇÕES:")
+
+
+def test_long_text_is_cut_at_section_headings():
+    text = "".join(_section(n, f"SEÇÃO {n}", 10) for n in range(1, 7))
+
+    chunks = chunk_text(text, max_tokens=len(text) // CHARS_PER_TOKEN // 3)
+
+    assert len(chunks) > 1
+    assert "".join(chunk.text for chunk in chunks) == text
+    assert all(text[chunk.start:chunk.end] == chunk.text for chunk in chunks)
+    assert all(chunk.text.startswith(chunk.headings[0]) for chunk in chunks)
+    assert outline(chunks) == [f"{n}. SEÇÃO {n}:" for n in range(1, 7)]
+
+
+def test_oversized_section_is_split_at_paragraphs():
+    text = _section(1, "DESCRIÇÃO DAS ATIVIDADES", 60)
+    max_tokens = 200
+
+    chunks = chunk_text(text, max_tokens)
+
+    assert len(chunks) > 1
+    assert "".join(chunk.text for chunk in chunks) == text
+    assert all(len(chunk.text) <= max_tokens * CHARS_PER_TOKEN for chunk in chunks)
+    assert all(chunk.text.endswith("\n") for chunk in chunks[:-1])
+    assert chunks[0].headings == ("1. DESCRIÇÃO DAS ATIVIDADES:",)
+    assert all(chunk.headings == () for chunk in chunks[1:])
+
+
+def test_rejoin_restores_the_whitespace_around_each_chunk():
+    text = "".join(_section(n, f"SEÇÃO {n}", 10) for n in range(1, 5))
+    chunks = chunk_text(text, max_tokens=len(text) // CHARS_PER_TOKEN // 2)
+
+    assert rejoin(chunks, [chunk.text.strip() for chunk in chunks]) == text
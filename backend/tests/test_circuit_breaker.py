@@ -0,0 +1,87 @@
+import pytest
+
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+def _open_breaker(clock: _Clock) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, clock=clock)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure(ConnectionError("recusada"))
+    return breaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = _open_breaker(clock)
+
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 1
+    assert breaker.last_error == "ConnectionError: recusada"
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after == 30
+    assert breaker.short_circuited == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, clock=clock)
+    for _ in range(2):
+        breaker.record_failure(ConnectionError("recusada"))
+    breaker.record_success()
+    breaker.record_failure(ConnectionError("recusada"))
+
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_closes_the_circuit(clock):
+    breaker = _open_breaker(clock)
+    clock.now = 29
+    assert breaker.is_open()
+
+    clock.now = 30
+    assert breaker.snapshot()["state"] == HALF_OPEN
+    breaker.before_call()  # the probe
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    breaker.before_call()
+    assert breaker.snapshot()["consecutive_failures"] == 0
+
+
+def test_failed_probe_opens_the_circuit_again(clock):
+    breaker = _open_breaker(clock)
+    clock.now = 30
+    breaker.before_call()
+
+    breaker.record_failure(TimeoutError("sem resposta"))
+
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 30
+    assert breaker.times_opened == 2
+
+
+def test_neutral_outcome_frees_the_probe_slot(clock):
+    breaker = _open_breaker(clock)
+    clock.now = 30
+    breaker.before_call()
+
+    breaker.record_neutral()
+
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
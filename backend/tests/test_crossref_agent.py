@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from app.services.ai_agents.crossref_agent import build_reference_digest, extract_references_local, find_cited_codes
+from app.services.ai_agents.formatting_agent import DEFAULT_SECTIONS
+from app.services.document_parser import parse_document
+
+SAMPLES = Path(__file__).resolve().parents[2]
+SECTION_NAMES = [name for names in DEFAULT_SECTIONS.values() for name in names]
+
+TEXT = (
+    "1. OBJETIVO:\n\nEste PQ-004 define a inspeção.\n\n"
+    "2. DOCUMENTOS COMPLEMENTARES:\n\n"
+    "2.1 RQ-001: Registro de Treinamento\n\n"
+    "2.2 IT-003.01 - Inspeção de tecidos\n\n"
+    "2.3 Manual da Qualidade\n\n"
+    "2.4 RQ-001.02 Registro de Treinamento\n\n"
+    "3. DEFINIÇÕES:\n\nVer IT-009."
+)
+
+
+def test_codes_with_and_without_revision_are_found_once():
+    references = find_cited_codes("RQ-001 e RQ-001.02, IT-003.01; AA-999 e PQ-1234 não são códigos")
+
+    assert [(r["code_or_title"], r["document_type"], r["sequential_number"]) for r in references] == [
+        ("RQ-001", "RQ", 1),
+        ("IT-003.01", "IT", 3),
+    ]
+
+
+def test_local_extraction_reads_only_the_references_section():
+    references, title_only = extract_references_local(TEXT, own_code=("PQ", 4))
+
+    assert [(r["code_or_title"], r["description"]) for r in references] == [
+        ("RQ-001", "Registro de Treinamento"),
+        ("IT-003.01", "Inspeção de tecidos"),
+    ]
+    assert title_only == ["Manual da Qualidade"]
+
+
+def test_own_code_is_not_a_citation():
+    references, _ = extract_references_local(TEXT.replace("2.3 Manual", "2.3 PQ-004 Manual"), own_code=("PQ", 4))
+
+    assert "PQ-004" not in [r["code_or_title"] for r in references]
+
+
+def test_no_references_section_returns_none():
+    assert extract_references_local("Texto corrido citando o RQ-001.") is None
+
+
+def test_sample_pq_references():
+    text, tree = parse_document(str(SAMPLES / "PQ-001.03 CONTROLE DE INFORMAÇÃO DOCUMENTADA.docx"), SECTION_NAMES)
+
+    references, title_only = extract_references_local(text, tree, own_code=("PQ", 1))
+
+    assert [r["code_or_title"] for r in references] == ["RQ-001"]
+    assert title_only == ["LM: Listas mestras"]
+
+
+def test_digest_lists_chapters_and_steps_without_table_rows():
+    text, _ = parse_document(str(SAMPLES / "PQ-001.03 CONTROLE DE INFORMAÇÃO DOCUMENTADA.docx"), SECTION_NAMES)
+
+    digest = build_reference_digest(text, max_chars=800)
+
+    assert len(digest) <= 800
+    assert digest.startswith("Objetivo: Este procedimento estabelece as diretrizes")
+    assert "Seções: OBJETIVO E ABRANGÊNCIA; DOCUMENTOS COMPLEMENTARES; 3. DEFINIÇÕES;" in digest
+    assert "- 4.1. TIPOS DE DOCUMENTOS DA QUALIDADE:" in digest
+    assert " | " not in digest
+
+
+def test_digest_without_standard_sections_is_the_start_of_the_text():
+    text = "7. HISTÓRICO DE REVISÃO\n\nRevisão | Data\n\n" + "Texto do corpo. " * 40
+
+    digest = build_reference_digest(text, max_chars=100)
+
+    assert digest.startswith("7. HISTÓRICO DE REVISÃO Revisão | Data Texto do corpo.")
+    assert len(digest) <= 102
@@ -0,0 +1,102 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+from docx import Document as DocxDocument
+
+from app.services.document_parser import (
+    extract_docx_blocks,
+    extract_header_footer_text,
+    extract_text,
+    extract_text_from_docx,
+    extract_text_from_odt,
+)
+
+SAMPLES = Path(__file__).resolve().parents[2]
+PQ_MODEL = SAMPLES / "PQ-000.00 (FORMATAÇÃO ATUALIZADA) - FAZER A CÓPIA DESSE MODELO.docx"
+PQ_001 = SAMPLES / "PQ-001.03 CONTROLE DE INFORMAÇÃO DOCUMENTADA.docx"
+IT_MODEL = SAMPLES / "IT-000.00 (FORMATAÇÃO ATUALIZADA) - FAZER A CÓPIA DESSE MODELO.odt"
+
+
+def _odt(path: Path, body: str, styles: str = "") -> Path:
+    ns = (
+        'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+        'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+        'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+        'xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0"'
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("mimetype", "application/vnd.oasis.opendocument.text")
+        archive.writestr(
+            "content.xml",
+            f'<office:document-content {ns}><office:body><office:text>{body}</office:text></office:body></office:document-content>',
+        )
+        if styles:
+            archive.writestr(
+                "styles.xml",
+                f'<office:document-styles {ns}><office:master-styles>{styles}</office:master-styles></office:document-styles>',
+            )
+    return path
+
+
+def test_docx_blocks_in_document_order(tmp_path):
+    doc = DocxDocument()
+    doc.add_heading("1. Objetivo", level=1)
+    doc.add_paragraph("Primeiro parágrafo.")
+    table = doc.add_table(rows=1, cols=3)
+    table.rows[0].cells[0].text = "RQ-001"
+    table.rows[0].cells[2].text = "Registro"
+    doc.add_paragraph("")
+    doc.add_paragraph("Depois da tabela.")
+    path = tmp_path / "doc.docx"
+    doc.save(path)
+
+    assert extract_docx_blocks(str(path)) == [
+        ("1. Objetivo", 1),
+        ("Primeiro parágrafo.", None),
+        ("RQ-001 | Registro", None),
+        ("Depois da tabela.", None),
+    ]
+    assert extract_text_from_docx(str(path)) == "1. Objetivo\n\nPrimeiro parágrafo.\n\nRQ-001 | Registro\n\nDepois da tabela."
+
+
+def test_docx_headers_and_footers_are_kept_out_of_the_text(tmp_path):
+    doc = DocxDocument()
+    doc.sections[0].header.paragraphs[0].text = "Código PQ-007 | Página 1"
+    doc.sections[0].footer.paragraphs[0].text = "Documento controlado"
+    doc.add_paragraph("Corpo do documento.")
+    doc.add_section()  # linked to the previous header and footer
+    path = tmp_path / "doc.docx"
+    doc.save(path)
+
+    assert extract_text(str(path)) == "Corpo do documento."
+    assert extract_header_footer_text(str(path)) == "Código PQ-007 | Página 1\n\nDocumento controlado"
+
+
+def test_odt_blocks_skip_tracked_changes_and_annotations(tmp_path):
+    path = _odt(
+        tmp_path / "doc.odt",
+        "<text:tracked-changes><text:changed-region><text:deletion>"
+        "<text:p>Texto excluído</text:p></text:deletion></text:changed-region></text:tracked-changes>"
+        "<text:h>1. OBJETIVO:</text:h>"
+        "<text:p>Uma<text:s text:c=\"2\"/>frase<office:annotation><text:p>comentário</text:p></office:annotation>.</text:p>"
+        "<text:list><text:list-item><text:p>Item da lista</text:p></text:list-item></text:list>"
+        "<table:table><table:table-row><table:table-cell><text:p>A</text:p></table:table-cell>"
+        "<table:table-cell/><table:table-cell><text:p>B</text:p></table:table-cell></table:table-row></table:table>",
+        styles="<style:master-page><style:header><text:p>Código IT-001</text:p></style:header>"
+               "<style:footer><text:p>Rodapé</text:p></style:footer></style:master-page>",
+    )
+
+    assert extract_text_from_odt(str(path)) == "1. OBJETIVO:\n\nUma  frase.\n\nItem da lista\n\nA | B"
+    assert extract_header_footer_text(str(path)) == "Código IT-001\n\nRodapé"
+
+
+@pytest.mark.parametrize("path, code", [(PQ_MODEL, "PQ-000"), (PQ_001, "PQ-001"), (IT_MODEL, "IT-0XX")])
+def test_sample_documents_text_starts_at_the_body(path, code):
+    text = extract_text(str(path))
+
+    assert text.split("\n", 1)[0].endswith("OBJETIVO E ABRANGÊNCIA:")
+    assert f"Código {code}" not in text
+    assert f"Código {code}" in extract_header_footer_text(str(path))
+    assert "Tipo (A, Ra, C) | Data | Nome | Setor | Assinatura" in text
+
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services.executor import ManagedExecutor
+
+
+def test_broken_process_pool_is_replaced():
+    executor = ManagedExecutor(process_workers=1, thread_workers=1)
+
+    async def main():
+        with pytest.raises(BrokenProcessPool):
+            await executor.run_cpu(os._exit, 1)  # the worker dies mid-task
+        return await executor.run_cpu(pow, 2, 10)
+
+    try:
+        assert asyncio.run(main()) == 1024
+    finally:
+        executor.shutdown()
+
+    metrics = executor.metrics()["process_pool"]
+    assert (metrics["submitted"], metrics["completed"], metrics["failed"]) == (2, 1, 1)
+
+
+def test_queue_depth_counts_tasks_waiting_for_a_worker():
+    executor = ManagedExecutor(process_workers=0, thread_workers=1)
+    release = threading.Event()
+    seen = {}
+
+    async def main():
+        tasks = [asyncio.create_task(executor.run_io(release.wait, 5)) for _ in range(3)]
+        while executor.io.in_flight < 3:
+            await asyncio.sleep(0.01)
+        seen.update(executor.metrics()["thread_pool"])
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    try:
+        assert asyncio.run(main()) == [True, True, True]
+    finally:
+        executor.shutdown()
+
+    assert (seen["running"], seen["queue_depth"]) == (1, 2)
+    after = executor.metrics()["thread_pool"]
+    assert (after["completed"], after["queue_depth"], after["max_in_flight"]) == (3, 0, 3)
+
+
+def test_cpu_work_runs_on_threads_without_process_workers():
+    executor = ManagedExecutor(process_workers=0, thread_workers=2)
+
+    try:
+        assert asyncio.run(executor.run_cpu(sum, [1, 2, 3])) == 6
+    finally:
+        executor.shutdown()
+
+    metrics = executor.metrics()
+    assert metrics["process_pool"]["enabled"] is False
+    assert (metrics["process_pool"]["completed"], metrics["thread_pool"]["submitted"]) == (1, 0)
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.stored_file import LegacyOriginalFile, StoredFile
+from app.services import file_store
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_PATH", str(tmp_path))
+    return tmp_path
+
+
+def _source(storage, name: str, data: bytes) -> str:
+    path = storage / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_stored_file_is_kept_when_the_transaction_commits(storage, run_with_db):
+    src = _source(storage, "import.docx", b"conteudo")
+
+    async def work(engine):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            stored, duplicate = await file_store.store_local_file(db, src)
+            await db.commit()
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            again, again_duplicate = await file_store.store_local_file(db, src)
+            await db.commit()
+        return stored, duplicate, again, again_duplicate
+
+    stored, duplicate, again, again_duplicate = run_with_db(work)
+
+    assert (duplicate, again_duplicate) == (False, True)
+    assert again.path == stored.path == file_store.cas_relative_path(stored.sha256, ".docx")
+    assert (storage / stored.path).read_bytes() == b"conteudo"
+    assert os.path.exists(src)  # imports are copied, not moved
+
+
+def test_stored_file_is_removed_when_the_transaction_rolls_back(storage, run_with_db):
+    src = _source(storage, "import.docx", b"conteudo")
+
+    async def work(engine):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            stored, _ = await file_store.store_local_file(db, src)
+            path = stored.path
+            assert (storage / path).exists()
+            await db.rollback()
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            return path, (await db.execute(select(StoredFile))).scalars().all()
+
+    path, rows = run_with_db(work)
+
+    assert rows == []
+    assert not (storage / path).exists()
+
+
+def test_legacy_originals_are_deleted_only_after_commit(storage, run_with_db):
+    old = _source(storage, "v1.docx", b"antigo")
+
+    async def work(engine):
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(
+                "INSERT INTO documents (id, code, title, created_by_profile) VALUES (1, 'PQ-001.00', 'T', 'autor')"
+            )
+            await conn.exec_driver_sql(
+                "INSERT INTO document_versions (id, document_id, version_number, original_file_path) "
+                "VALUES (1, 1, 1, 'originals/ab/ab.docx')"
+            )
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            db.add(LegacyOriginalFile(version_id=1, path="v1.docx"))
+            await db.commit()
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            assert await file_store.remove_legacy_originals(db) == 1
+            assert os.path.exists(old)
+            await db.commit()
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            return (await db.execute(select(LegacyOriginalFile))).scalars().all()
+
+    assert run_with_db(work) == []
+    assert not os.path.exists(old)
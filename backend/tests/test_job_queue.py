@@ -0,0 +1,85 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.config import settings
+from app.database import Base
+from app.models.job import BackgroundJob
+from app.services import job_queue
+
+
+class _Pool(job_queue.JobWorkerPool):
+    def __init__(self):
+        super().__init__(concurrency=1)
+        self.wakes = 0
+
+    def wake(self) -> None:
+        self.wakes += 1
+
+
+async def _setup(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.exec_driver_sql(
+            "INSERT INTO documents (id, code, title, created_by_profile) VALUES (1, 'PQ-001.00', 'T', 'autor')"
+        )
+        await conn.exec_driver_sql(
+            "INSERT INTO document_versions (id, document_id, version_number, original_file_path) "
+            "VALUES (1, 1, 1, 'v1.docx')"
+        )
+    return engine
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = _Pool()
+    monkeypatch.setattr(job_queue, "_pool", pool)
+    return pool
+
+
+def test_workers_are_woken_only_after_commit(tmp_path, pool):
+    async def work():
+        engine = await _setup(tmp_path)
+        async with AsyncSession(engine) as db:
+            await job_queue.enqueue_job(db, "analysis", 1)
+            before_commit = pool.wakes
+            await db.commit()
+        async with AsyncSession(engine) as db:
+            await job_queue.enqueue_job(db, "formatting", 1)
+            await db.rollback()
+        await engine.dispose()
+        return before_commit
+
+    assert asyncio.run(work()) == 0
+    assert pool.wakes == 1
+
+
+def test_heartbeat_extends_the_lease_of_a_running_job(tmp_path, monkeypatch, pool):
+    monkeypatch.setattr(settings, "JOB_HEARTBEAT_SECONDS", 0.05)
+
+    async def work():
+        engine = await _setup(tmp_path)
+        monkeypatch.setattr(job_queue, "async_session_factory", async_sessionmaker(engine, expire_on_commit=False))
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            job = await job_queue.enqueue_job(db, "analysis", 1)
+            await db.commit()
+        claimed = await pool._claim_next()
+        first_lease = job_queue._as_utc(claimed.lease_expires_at)
+
+        async def slow_handler(version_id, payload):
+            await asyncio.sleep(0.3)
+
+        await pool._run_handler(claimed, slow_handler)
+        async with AsyncSession(engine) as db:
+            renewed = (await db.execute(select(BackgroundJob).where(BackgroundJob.id == job.id))).scalar_one()
+        await engine.dispose()
+        return first_lease, job_queue._as_utc(renewed.lease_expires_at)
+
+    first_lease, renewed_lease = asyncio.run(work())
+
+    assert renewed_lease - first_lease >= timedelta(seconds=0.2)
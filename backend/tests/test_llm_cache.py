@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.services import llm_cache
+from app.services.llm_cache import LLMCache, make_key
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def make_cache(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_EVICT_EVERY", 1)
+    caches = []
+
+    def make(ttl_seconds=0, max_entries=100, max_bytes=1_000_000) -> LLMCache:
+        cache = LLMCache(str(tmp_path / "llm_cache.db"), ttl_seconds, max_entries, max_bytes, clock=clock)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def _put(cache: LLMCache, clock: _Clock, at: float, key: str, response: str = "{}") -> None:
+    clock.now = at
+    asyncio.run(cache.put(key, "agente", "modelo", response))
+
+
+def _get(cache: LLMCache, clock: _Clock, at: float, key: str):
+    clock.now = at
+    return asyncio.run(cache.get(key))
+
+
+def _keys(cache: LLMCache) -> list[str]:
+    return [key for (key,) in cache._connect().execute("SELECT key FROM llm_cache ORDER BY key")]
+
+
+def test_key_ignores_transport_parameters():
+    params = {"model": "m", "messages": [{"role": "user", "content": "oi"}], "temperature": 0.2}
+
+    assert make_key("analysis", params) == make_key("analysis", {**params, "timeout": 30})
+    assert make_key("analysis", params) != make_key("changelog", params)
+    assert make_key("analysis", params) != make_key("analysis", {**params, "temperature": 0.3})
+
+
+def test_entry_expires_after_ttl(make_cache, clock):
+    cache = make_cache(ttl_seconds=60)
+    _put(cache, clock, 1000, "a", "resposta")
+
+    assert _get(cache, clock, 1059, "a") == "resposta"
+    assert _get(cache, clock, 1061, "a") is None
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+    assert _keys(cache) == []
+
+
+def test_eviction_drops_expired_entries(make_cache, clock):
+    cache = make_cache(ttl_seconds=60)
+    _put(cache, clock, 1000, "a")
+    _put(cache, clock, 1050, "b")
+
+    _put(cache, clock, 1070, "c")
+
+    assert _keys(cache) == ["b", "c"]
+
+
+def test_least_recently_used_entry_goes_first(make_cache, clock):
+    cache = make_cache(max_entries=3)
+    for at, key in enumerate("abc", start=1001):
+        _put(cache, clock, at, key)
+    _get(cache, clock, 1004, "a")
+
+    _put(cache, clock, 1005, "d")
+
+    assert _keys(cache) == ["a", "c", "d"]
+    assert cache.evictions == 1
+
+
+def test_size_cap_evicts_until_under_budget(make_cache, clock):
+    cache = make_cache(max_bytes=10)
+    _put(cache, clock, 1001, "a", "1234")
+    _put(cache, clock, 1002, "b", "5678")
+
+    _put(cache, clock, 1003, "c", "90ab")
+
+    assert _keys(cache) == ["b", "c"]
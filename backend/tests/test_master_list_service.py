@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import master_list_service
+from app.services.suggest_index import SuggestIndex
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = SuggestIndex()
+    index.build([(1, "PQ-001.00", "Controle de informação", None)])
+    monkeypatch.setattr(master_list_service, "get_suggest_index", lambda: index)
+    return index
+
+
+async def _add_to_master_list(engine, commit: bool) -> None:
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql(
+            "INSERT INTO documents (id, code, title, created_by_profile, document_type) "
+            "VALUES (1, 'PQ-001.00', 'Controle de informação', 'autor', 'PQ')"
+        )
+    async with AsyncSession(engine) as db:
+        await master_list_service.add_to_master_list(db, 1)
+        await (db.commit() if commit else db.rollback())
+
+
+def test_suggest_index_gets_the_master_list_code_after_commit(index, run_with_db):
+    run_with_db(lambda engine: _add_to_master_list(engine, commit=True))
+
+    assert [s["code"] for s in index.suggest("LM-001")] == ["PQ-001.00"]
+
+
+def test_rolled_back_master_list_entry_is_not_indexed(index, run_with_db):
+    run_with_db(lambda engine: _add_to_master_list(engine, commit=False))
+
+    assert index.suggest("LM-001") == []
@@ -0,0 +1,83 @@
+import asyncio
+import shutil
+import threading
+import time
+
+from app.config import settings
+from app.services import office_pool
+
+
+class _FakeWorker(office_pool._OfficeWorker):
+    """Copies instead of converting; ping and convert can be made slow."""
+
+    mode = "uno"
+
+    def __init__(self, index: int, ping_seconds: float = 0.0, release: threading.Event = None):
+        super().__init__(index, "soffice")
+        self.ping_seconds = ping_seconds
+        self.release = release
+        self.pings = 0
+
+    def ping(self) -> bool:
+        self.pings += 1
+        time.sleep(self.ping_seconds)
+        return True
+
+    def convert(self, src: str, dest: str, timeout: float) -> None:
+        if self.release is not None:
+            self.release.wait(5)
+        shutil.copy(src, dest)
+
+
+def _started_pool(workers: list[_FakeWorker]) -> office_pool.OfficePool:
+    pool = office_pool.OfficePool(len(workers), queue_size=4)
+    pool._workers = list(workers)
+    pool._idle = asyncio.Queue()
+    for worker in workers:
+        pool._idle.put_nowait(worker)
+    pool._started = True
+    pool.mode = "uno"
+    return pool
+
+
+def test_health_check_does_not_hold_up_a_waiting_conversion(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "OFFICE_HEALTH_CHECK_SECONDS", 0.01)
+    src = tmp_path / "modelo.odt"
+    src.write_bytes(b"odt")
+
+    async def main():
+        workers = [_FakeWorker(0, ping_seconds=0.5), _FakeWorker(1, ping_seconds=0.5)]
+        pool = _started_pool(workers)
+        pool._health_task = asyncio.create_task(pool._health_loop())
+        await asyncio.sleep(0.1)  # the first ping is under way
+        started = time.perf_counter()
+        await pool.convert(str(src), str(tmp_path / "modelo.docx"))
+        waited = time.perf_counter() - started
+        await pool.stop()
+        return waited, workers
+
+    waited, workers = asyncio.run(main())
+
+    assert waited < 0.3
+    assert sum(worker.pings for worker in workers) >= 1
+
+
+def test_conversion_finishing_after_stop_does_not_fail(tmp_path):
+    src, dest = tmp_path / "modelo.odt", tmp_path / "modelo.docx"
+    src.write_bytes(b"odt")
+    release = threading.Event()
+
+    async def main():
+        pool = _started_pool([_FakeWorker(0, release=release)])
+        conversion = asyncio.create_task(pool.convert(str(src), str(dest)))
+        while not pool._idle.empty():
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        release.set()
+        return await conversion, pool
+
+    result, pool = asyncio.run(main())
+
+    assert result == str(dest)
+    assert dest.read_bytes() == b"odt"
+    assert pool._idle is None
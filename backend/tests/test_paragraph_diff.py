@@ -0,0 +1,52 @@
+from app.utils.paragraph_diff import changed_spans, split_paragraphs
+
+TEXT = "1. OBJETIVO:\n\nDefinir a inspeção.\n  \n\nConferir o lote.\n\n\n2. REGISTROS:\n\nRQ-010."
+
+
+def _paragraphs(text: str) -> list[str]:
+    return [text[s:e] for s, e in split_paragraphs(text)]
+
+
+def test_split_paragraphs_on_blank_lines():
+    assert _paragraphs(TEXT) == [
+        "1. OBJETIVO:", "Definir a inspeção.", "Conferir o lote.", "2. REGISTROS:", "RQ-010.",
+    ]
+
+
+def test_split_paragraphs_skips_blank_text_and_keeps_single_newlines():
+    assert split_paragraphs("") == []
+    assert split_paragraphs("\n\n  \n") == []
+    assert _paragraphs("linha um\nlinha dois\n\n") == ["linha um\nlinha dois"]
+
+
+def test_unchanged_text_has_no_changed_spans():
+    assert changed_spans(TEXT, TEXT) == []
+    assert changed_spans(TEXT, TEXT.replace("\n\n\n", "\n\n")) == []
+
+
+def test_changed_and_inserted_paragraphs_are_spans_of_the_new_text():
+    new = TEXT.replace("Conferir o lote.", "Conferir o lote recebido.").replace("RQ-010.", "RQ-010.\n\nRQ-011.")
+
+    spans = changed_spans(TEXT, new)
+
+    assert [new[s:e] for s, e in spans] == ["Conferir o lote recebido.", "RQ-011."]
+
+
+def test_adjacent_changes_are_merged_with_the_blank_lines_between_them():
+    new = TEXT.replace("Definir a inspeção.", "Definir a inspeção final.").replace("Conferir o lote.", "Medir o lote.")
+
+    [(start, end)] = changed_spans(TEXT, new)
+
+    assert new[start:end] == "Definir a inspeção final.\n  \n\nMedir o lote."
+
+
+def test_deleted_paragraphs_leave_no_span():
+    assert changed_spans(TEXT, TEXT.replace("Conferir o lote.\n\n\n", "")) == []
+
+
+def test_repeated_paragraphs_are_matched_in_order():
+    old = "Item.\n\nTexto.\n\nItem."
+    new = "Item.\n\nTexto.\n\nItem.\n\nItem."
+
+    assert [new[s:e] for s, e in changed_spans(old, new)] == ["Item."]
+    assert changed_spans(old, new)[0][0] == len("Item.\n\nTexto.\n\nItem.\n\n")
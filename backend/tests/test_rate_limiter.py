@@ -0,0 +1,142 @@
+import asyncio
+
+import httpx
+import pytest
+from openai import RateLimitError
+from openai.types.chat import ChatCompletion
+
+from app.config import settings
+from app.services import rate_limiter
+from app.services.openai_client import AgentClient
+from app.services.rate_limiter import ModelRateLimiter, TokenBucket, estimate_request_tokens
+
+MODEL = "gpt-teste"
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def sleeps(clock, monkeypatch):
+    """Replaces asyncio.sleep with one that advances the fake clock instantly."""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay, *args, **kwargs):
+        delays.append(round(delay, 3))
+        clock.now += delay
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return delays
+
+
+def _completion() -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "c1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": MODEL,
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "{}"}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    })
+
+
+def _rate_limit_error(retry_after: str) -> RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+class _FlakyClient:
+    """Answers with the queued errors first, then with a completion."""
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+
+    async def create(self, **kwargs) -> ChatCompletion:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return _completion()
+
+
+def test_estimate_counts_prompt_and_output_budget():
+    params = {"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 50}
+
+    assert estimate_request_tokens(params) == 150
+
+
+def test_bucket_refills_continuously_up_to_capacity(clock):
+    bucket = TokenBucket(60, 60, clock)
+    bucket.level = 0
+
+    assert bucket.wait_time(1) == 1.0
+    clock.now = 30
+    bucket.refill()
+    assert bucket.level == 30
+    clock.now = 500
+    bucket.refill()
+    assert bucket.level == 60
+
+
+def test_request_over_capacity_waits_for_a_full_bucket(clock):
+    bucket = TokenBucket(100, 60, clock)
+    bucket.level = 40
+
+    assert bucket.wait_time(1000) == 60.0
+
+
+def test_acquire_waits_for_the_next_request_slot(clock, sleeps):
+    limiter = ModelRateLimiter(MODEL, rpm=2, tpm=100_000, clock=clock)
+
+    async def main():
+        for _ in range(3):
+            await limiter.acquire(100)
+
+    asyncio.run(main())
+
+    assert sleeps == [30.0]
+    metrics = limiter.metrics()
+    assert (metrics["admitted"], metrics["throttled"], metrics["total_wait_seconds"]) == (3, 1, 30.0)
+
+
+def test_reconcile_returns_unused_tokens(clock):
+    limiter = ModelRateLimiter(MODEL, rpm=10, tpm=1000, clock=clock)
+
+    asyncio.run(limiter.acquire(600))
+    limiter.reconcile(estimated=600, actual=150)
+
+    assert limiter.tokens.level == 1000 - 150
+
+
+def test_429_pauses_the_model_for_retry_after(clock, sleeps, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_RATE_LIMITS", {MODEL: {"rpm": 100, "tpm": 100_000}})
+    limiter = ModelRateLimiter(MODEL, rpm=100, tpm=100_000, clock=clock)
+    monkeypatch.setattr(rate_limiter, "_limiters", {MODEL: limiter})
+    client = _FlakyClient(_rate_limit_error("7"))
+    agent = AgentClient(client, "analysis", use_cache=False)
+
+    response = asyncio.run(agent.chat.completions.create(model=MODEL, messages=[{"role": "user", "content": "oi"}]))
+
+    assert response.choices[0].message.content == "{}"
+    assert client.calls == 2
+    assert sleeps == [7.0]  # the retry waits out the pause; acquire does not wait again
+    assert limiter.rate_limit_errors == 1
+
+    limiter.pause(5)
+    asyncio.run(limiter.acquire(10))
+    assert sleeps == [7.0, 5.0]
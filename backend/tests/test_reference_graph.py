@@ -0,0 +1,117 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document
+from app.models.document_reference import DocumentReference
+from app.models.version import DocumentVersion
+from app.services import reference_graph
+
+
+def _document(doc_id: int, code: str, status: str = "active") -> Document:
+    doc_type, number = code.split("-")
+    return Document(
+        id=doc_id,
+        code=code,
+        title=f"Documento {code}",
+        status=status,
+        created_by_profile="autor",
+        document_type=doc_type,
+        sequential_number=int(number.split(".")[0]),
+    )
+
+
+async def _cite(db: AsyncSession, doc: Document, text: str) -> int:
+    version = DocumentVersion(document=doc, version_number=1, original_file_path="v1.docx", extracted_text=text)
+    db.add(version)
+    await db.flush()
+    return await reference_graph.update_document_references(db, version)
+
+
+def _impact(run_with_db, citations: dict[str, str], statuses: dict[str, str] = None, **kwargs):
+    """Cites citations (code → text) and returns the impact of PQ-001.00 as (code, depth, path)."""
+    statuses = statuses or {}
+
+    async def work(engine):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            root = _document(1, "PQ-001.00")
+            db.add(root)
+            for i, (code, text) in enumerate(citations.items(), start=2):
+                doc = _document(i, code, statuses.get(code, "active"))
+                db.add(doc)
+                await _cite(db, doc, text)
+            await db.commit()
+            impact = await reference_graph.get_impact(db, root, **kwargs)
+        return [(item["code"], item["depth"], item["path"]) for item in impact]
+
+    return run_with_db(work)
+
+
+def test_extract_cited_codes_keeps_the_first_spelling():
+    assert reference_graph.extract_cited_codes("Ver IT-003.01, IT-003 e RQ-010.") == {
+        ("IT", 3): "IT-003.01",
+        ("RQ", 10): "RQ-010",
+    }
+
+
+def test_edges_are_replaced_and_self_citations_skipped(run_with_db):
+    async def work(engine):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            doc = _document(1, "PQ-001.00")
+            db.add(doc)
+            first = await _cite(db, doc, "Conforme IT-002.00, RQ-003.00 e PQ-001.00.")
+            second = await _cite(db, doc, "Conforme IT-004.00 e PQ-001.01.")
+            await db.commit()
+            rows = (await db.execute(select(DocumentReference.cited_code))).scalars().all()
+        return first, second, rows
+
+    assert run_with_db(work) == (2, 1, ["IT-004.00"])
+
+
+def test_two_hop_chain_reports_depth_and_path(run_with_db):
+    impact = _impact(run_with_db, {
+        "IT-002.00": "Executar conforme PQ-001.00.",
+        "RQ-003.00": "Registro da IT-002.00.",
+    })
+
+    assert impact == [
+        ("IT-002.00", 1, ["IT-002.00", "PQ-001.00"]),
+        ("RQ-003.00", 2, ["RQ-003.00", "IT-002.00", "PQ-001.00"]),
+    ]
+
+
+def test_each_document_is_reported_once_at_its_shortest_distance(run_with_db):
+    impact = _impact(run_with_db, {
+        "IT-002.00": "Executar conforme PQ-001.00.",
+        "RQ-003.00": "Registro da IT-002.00 e do PQ-001.00.",
+    })
+
+    assert impact == [
+        ("IT-002.00", 1, ["IT-002.00", "PQ-001.00"]),
+        ("RQ-003.00", 1, ["RQ-003.00", "PQ-001.00"]),
+    ]
+
+
+def test_cycle_terminates(run_with_db):
+    impact = _impact(run_with_db, {
+        "IT-002.00": "Executar conforme PQ-001.00 e RQ-003.00.",
+        "RQ-003.00": "Registro da IT-002.00.",
+    }, max_depth=10)
+
+    assert impact == [
+        ("IT-002.00", 1, ["IT-002.00", "PQ-001.00"]),
+        ("RQ-003.00", 2, ["RQ-003.00", "IT-002.00", "PQ-001.00"]),
+    ]
+
+
+def test_obsolete_sources_only_with_include_inactive(run_with_db):
+    citations = {
+        "IT-002.00": "Executar conforme PQ-001.00.",
+        "RQ-003.00": "Registro da IT-002.00.",
+    }
+    statuses = {"IT-002.00": "obsolete"}
+
+    assert _impact(run_with_db, citations, statuses) == []
+    assert [code for code, _, _ in _impact(run_with_db, citations, statuses, include_inactive=True)] == [
+        "IT-002.00",
+        "RQ-003.00",
+    ]
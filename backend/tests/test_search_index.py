@@ -0,0 +1,96 @@
+import importlib.util
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import search_index
+
+
+async def _search(engine, body: str, query: str) -> list[search_index.SearchHit]:
+    async with engine.begin() as conn:
+        await search_index.init_search_index(conn)
+        await conn.exec_driver_sql(
+            "INSERT INTO documents (id, code, title, created_by_profile) "
+            "VALUES (1, 'PQ-001.00', 'Inspeção', 'autor')"
+        )
+        await conn.exec_driver_sql(
+            "INSERT INTO document_versions (id, document_id, version_number, original_file_path, extracted_text) "
+            "VALUES (1, 1, 1, 'v1.docx', ?)",
+            (body,),
+        )
+    async with AsyncSession(engine) as db:
+        return await search_index.search(db, query)
+
+
+def test_build_match_query_quotes_every_term():
+    assert search_index.build_match_query('PQ-001.02 "descrição" OR') == '"PQ-001.02"* AND "descrição"* AND "OR"*'
+    assert search_index.build_match_query("  -- ") is None
+
+
+def test_render_snippet_escapes_text_and_keeps_only_the_markers():
+    raw = "a <b>x</b> \ue000lote\ue001 & <script>"
+
+    assert search_index.render_snippet(raw) == "a &lt;b&gt;x&lt;/b&gt; <mark>lote</mark> &amp; &lt;script&gt;"
+
+
+def test_search_snippets_escape_document_markup(run_with_db):
+    body = 'Conferir o lote <img src=x onerror="alert(1)"> recebido.'
+
+    hits = run_with_db(lambda engine: _search(engine, body, "lote"))
+
+    [hit] = hits
+    assert hit.document_id == 1
+    assert "<mark>lote</mark>" in hit.snippet
+    assert "<img" not in hit.snippet and "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;" in hit.snippet
+    assert hit.score > 0
+
+
+class _Op:
+    """The part of alembic.op the migration uses, on a plain connection."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def get_bind(self):
+        return self._conn
+
+    def execute(self, statement: str) -> None:
+        self._conn.exec_driver_sql(statement)
+
+
+def _load_migration(monkeypatch):
+    # backend/alembic (the migrations folder) shadows the alembic package here
+    monkeypatch.setitem(sys.modules, "alembic", SimpleNamespace(op=None))
+    path = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "014_document_search_index.py"
+    spec = importlib.util.spec_from_file_location("migration_014", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def _search_schema(engine, build) -> set[tuple[str, str, str]]:
+    async with engine.begin() as conn:
+        await build(conn)
+        rows = (await conn.exec_driver_sql(
+            f"SELECT type, name, sql FROM sqlite_master WHERE name LIKE '{search_index.SEARCH_TABLE}%'"
+        )).all()
+    return {(kind, name, " ".join((sql or "").split())) for kind, name, sql in rows}
+
+
+def test_migration_and_startup_create_the_same_schema(run_with_db, monkeypatch):
+    migration = _load_migration(monkeypatch)
+
+    def upgrade(sync_conn):
+        migration.op = _Op(sync_conn)
+        migration.upgrade()
+
+    async def migrate(conn):
+        await conn.run_sync(upgrade)
+
+    migrated = run_with_db(lambda engine: _search_schema(engine, migrate))
+    created = run_with_db(lambda engine: _search_schema(engine, search_index.init_search_index))
+
+    assert len([kind for kind, _, _ in migrated if kind == "trigger"]) == 5
+    assert migrated == created
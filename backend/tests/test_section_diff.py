@@ -0,0 +1,134 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.services.ai_agents import changelog_agent
+from app.services.ai_agents.formatting_agent import DEFAULT_SECTIONS
+from app.services.document_parser import extract_text
+from app.utils.section_diff import PREAMBLE_TITLE, diff_sections, split_into_sections
+
+SAMPLES = Path(__file__).resolve().parents[2]
+PQ_001 = SAMPLES / "PQ-001.03 CONTROLE DE INFORMAÇÃO DOCUMENTADA.docx"
+SECTION_NAMES = [name for names in DEFAULT_SECTIONS.values() for name in names]
+
+OLD = (
+    "Procedimento de inspeção\n\n"
+    "1. OBJETIVO:\n\nDefinir a inspeção de recebimento de materiais.\n\n"
+    "2. DEFINIÇÕES:\n\nLote: conjunto de peças.\n\n"
+    "3. RESPONSABILIDADES:\n\nQualidade."
+)
+
+
+class _FakeClient:
+    """Records the prompts and answers every completion with a fixed JSON payload."""
+
+    def __init__(self, payload: dict):
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self._payload = payload
+
+    async def _create(self, **kwargs):
+        self.prompts.append(kwargs["messages"][0]["content"])
+        message = SimpleNamespace(content=json.dumps(self._payload))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_split_into_sections_keeps_the_preamble():
+    assert split_into_sections(OLD) == [
+        ("", "Procedimento de inspeção\n\n"),
+        ("1. OBJETIVO:", "\nDefinir a inspeção de recebimento de materiais.\n\n"),
+        ("2. DEFINIÇÕES:", "\nLote: conjunto de peças.\n\n"),
+        ("3. RESPONSABILIDADES:", "\nQualidade."),
+    ]
+
+
+def test_identical_texts_have_no_changes():
+    assert diff_sections(OLD, OLD) == []
+
+
+def test_added_removed_and_modified_sections():
+    new = (
+        "Procedimento de inspeção\n\n"
+        "1. OBJETIVO:\n\nDefinir a inspeção de recebimento de insumos.\n\n"
+        "3. RESPONSABILIDADES:\n\nQualidade.\n\n"
+        "4. REGISTROS:\n\nRQ-010."
+    )
+
+    changes = diff_sections(OLD, new)
+
+    assert [(c["section"], c["change_type"]) for c in changes] == [
+        ("1. OBJETIVO:", "modified"),
+        ("4. REGISTROS:", "added"),
+        ("2. DEFINIÇÕES:", "removed"),
+    ]
+    modified = changes[0]
+    assert modified["paragraphs_modified"] == 1
+    assert modified["old_content_snippet"].endswith("recebimento de materiais.")
+    assert modified["new_content_snippet"].endswith("recebimento de insumos.")
+    assert changes[1]["new_content_snippet"] == "RQ-010."
+    assert changes[2]["old_content_snippet"] == "Lote: conjunto de peças."
+
+
+def test_sections_match_across_renumbering_and_colon():
+    new = OLD.replace("2. DEFINIÇÕES:", "3 - Definições").replace("3. RESPONSABILIDADES:", "4. RESPONSABILIDADES")
+
+    assert diff_sections(OLD, new) == []
+
+
+def test_snippets_show_the_words_around_the_change():
+    words = " ".join(f"palavra{i}" for i in range(30))
+    old = f"1. OBJETIVO:\n\n{words}"
+    new = f"1. OBJETIVO:\n\n{words.replace('palavra15', 'trocada')}"
+
+    [change] = diff_sections(old, new)
+
+    assert change["old_content_snippet"] == "… " + " ".join(f"palavra{i}" for i in range(9, 22)) + " …"
+    assert "trocada" in change["new_content_snippet"]
+
+
+def test_edit_on_sample_document_lands_in_its_section():
+    old = extract_text(str(PQ_001))
+    new = old.replace("Este procedimento estabelece", "Este procedimento define", 1)
+
+    changes = diff_sections(old, new, SECTION_NAMES)
+
+    assert [(c["section"], c["change_type"]) for c in changes] == [("OBJETIVO E ABRANGÊNCIA:", "modified")]
+    assert "define" in changes[0]["new_content_snippet"]
+
+
+def test_mock_changelog_uses_precomputed_sections():
+    sections = [{"section": "1. OBJETIVO:", "change_type": "modified"}]
+
+    result = changelog_agent.get_mock_changelog("novo", "antigo", sections)
+
+    assert result["diff_content"]["sections"] is sections
+    assert result["summary"] == "Seções alteradas: 1. OBJETIVO:."
+
+
+def test_model_only_summarizes_a_local_diff():
+    new = OLD.replace("materiais", "insumos")
+    sections = diff_sections(OLD, new)
+    client = _FakeClient({"summary": "Objetivo revisado.", "sections": [
+        {"section": "1. OBJETIVO:", "description": "Troca de materiais por insumos."},
+    ]})
+
+    result = asyncio.run(changelog_agent.generate_changelog(client, new, OLD, sections))
+
+    assert client.prompts == [changelog_agent.SUMMARY_PROMPT]
+    assert result["summary"] == "Objetivo revisado."
+    assert result["diff_content"]["sections"][0]["description"] == "Troca de materiais por insumos."
+    assert sections[0]["description"] != "Troca de materiais por insumos."  # mock fallback keeps its own copy
+
+
+def test_model_compares_full_texts_when_every_change_is_in_the_preamble():
+    old, new = "Texto sem títulos.\n\nSegundo parágrafo.", "Texto sem títulos.\n\nParágrafo revisado."
+    sections = diff_sections(old, new)
+    assert [c["section"] for c in sections] == [PREAMBLE_TITLE]
+    payload = {"diff_content": {"sections": [{"section": "Geral", "change_type": "modified"}]}, "summary": "Revisado."}
+    client = _FakeClient(payload)
+
+    result = asyncio.run(changelog_agent.generate_changelog(client, new, old, sections))
+
+    assert client.prompts == [changelog_agent.BASE_PROMPT_COMPARE]
+    assert result == payload
@@ -0,0 +1,129 @@
+from pathlib import Path
+
+import pytest
+from docx import Document as DocxDocument
+
+from app.services.ai_agents.formatting_agent import DEFAULT_SECTIONS
+from app.services.document_parser import parse_document
+from app.utils.paragraph_diff import split_paragraphs
+from app.utils.section_tree import (
+    build_section_tree,
+    find_section,
+    iter_sections,
+    rebuild_section_tree,
+    section_body,
+    split_heading,
+)
+
+SAMPLES = Path(__file__).resolve().parents[2]
+SECTION_NAMES = [name for names in DEFAULT_SECTIONS.values() for name in names]
+
+TEXT = (
+    "Procedimento de inspeção\n\n"
+    "1. OBJETIVO:\n\nDefinir a inspeção.\n\n"
+    "2. DESCRIÇÃO DAS ATIVIDADES:\n\n"
+    "2.1 RECEBIMENTO\n\nConferir a nota.\n\n"
+    "2.2 INSPEÇÃO\n\nMedir o lote.\n\nRegistrar no RQ-010.\n\n"
+    "3. RESPONSABILIDADES:\n\nQualidade."
+)
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("3.1. Limpeza:", ("3.1", "Limpeza")),
+    ("2 - Definições", ("2", "Definições")),
+    ("OBJETIVO E ABRANGÊNCIA:", (None, "OBJETIVO E ABRANGÊNCIA")),
+])
+def test_split_heading(line, expected):
+    assert split_heading(line) == expected
+
+
+def test_build_section_tree_nests_by_level_with_offsets():
+    tree = build_section_tree(TEXT)
+
+    assert [(n["number"], n["title"], n["level"]) for n in iter_sections(tree)] == [
+        ("1", "OBJETIVO", 1),
+        ("2", "DESCRIÇÃO DAS ATIVIDADES", 1),
+        ("2.1", "RECEBIMENTO", 2),
+        ("2.2", "INSPEÇÃO", 2),
+        ("3", "RESPONSABILIDADES", 1),
+    ]
+    activities = tree[1]
+    assert TEXT[activities["start"]:].startswith("2. DESCRIÇÃO DAS ATIVIDADES:")
+    assert activities["end"] == tree[2]["start"]
+    assert activities["children"][-1]["end"] == activities["end"]
+    assert tree[-1]["end"] == len(TEXT)
+
+
+def test_paragraph_ranges_index_split_paragraphs():
+    tree = build_section_tree(TEXT)
+    paragraphs = [TEXT[s:e] for s, e in split_paragraphs(TEXT)]
+
+    inspection = find_section(tree, "inspecao")
+    first, last = inspection["paragraphs"]
+    assert paragraphs[first:last] == ["Medir o lote.", "Registrar no RQ-010."]
+
+
+def test_section_body_includes_subsections():
+    node = find_section(build_section_tree(TEXT), "Descrição das Atividades")
+
+    body = section_body(TEXT, node)
+
+    assert body.startswith("\n2.1 RECEBIMENTO")
+    assert body.rstrip().endswith("Registrar no RQ-010.")
+
+
+def test_known_section_names_open_unnumbered_sections():
+    text = "OBJETIVO E ABRANGÊNCIA:\n\nTexto.\n\nDOCUMENTOS COMPLEMENTARES:\n\n2.1 RQ-001: Registro"
+
+    tree = build_section_tree(text, section_names=SECTION_NAMES)
+
+    assert [n["title"] for n in tree] == ["OBJETIVO E ABRANGÊNCIA", "DOCUMENTOS COMPLEMENTARES"]
+    assert section_body(text, find_section(tree, "Documentos Complementares")).strip() == "2.1 RQ-001: Registro"
+
+
+def test_rebuild_keeps_levels_of_unnumbered_headings():
+    previous = build_section_tree(
+        "OBJETIVO E ABRANGÊNCIA:\n\nTexto.\n\n1. DEFINIÇÕES\n\nTermos.",
+        section_names=SECTION_NAMES,
+    )
+
+    tree = rebuild_section_tree("OBJETIVO E ABRANGÊNCIA:\n\nTexto corrigido.\n\n1. DEFINIÇÕES\n\nTermos.", previous)
+
+    assert [(n["title"], n["level"]) for n in tree] == [("OBJETIVO E ABRANGÊNCIA", 1), ("DEFINIÇÕES", 1)]
+
+
+def test_parse_docx_merges_styled_and_numbered_headings(tmp_path):
+    doc = DocxDocument()
+    doc.add_paragraph("1. OBJETIVO:")            # numbered, no heading style
+    doc.add_paragraph("Texto do objetivo.")
+    doc.add_heading("ANEXO A", level=1)          # heading style, no numbering
+    doc.add_paragraph("Tabela.")
+    path = tmp_path / "doc.docx"
+    doc.save(path)
+
+    _, tree = parse_document(str(path))
+
+    assert [(n["number"], n["title"], n["level"]) for n in tree] == [("1", "OBJETIVO", 1), (None, "ANEXO A", 1)]
+
+
+@pytest.mark.parametrize("name, top_level", [
+    ("PQ-000.00 (FORMATAÇÃO ATUALIZADA) - FAZER A CÓPIA DESSE MODELO.docx", [
+        "OBJETIVO E ABRANGÊNCIA", "DOCUMENTOS COMPLEMENTARES", "DEFINIÇÕES", "DESCRIÇÃO DAS ATIVIDADES",
+        "RESPONSABILIDADES", "APROVAÇÃO DO DOCUMENTO", "HISTÓRICO DE REVISÃO",
+    ]),
+    ("PQ-001.03 CONTROLE DE INFORMAÇÃO DOCUMENTADA.docx", [
+        "OBJETIVO E ABRANGÊNCIA", "DOCUMENTOS COMPLEMENTARES", "DEFINIÇÕES", "DESCRIÇÃO DAS ATIVIDADES",
+        "RESPONSABILIDADES", "APROVAÇÃO DO DOCUMENTO",
+    ]),
+    ("IT-000.00 (FORMATAÇÃO ATUALIZADA) - FAZER A CÓPIA DESSE MODELO.odt", [
+        "OBJETIVO E ABRANGÊNCIA", "DOCUMENTOS COMPLEMENTARES", "DEFINIÇÕES", "CARACTERÍSTICAS",
+        "APROVAÇÃO DO DOCUMENTO", "HISTÓRICO DE REVISÃO",
+    ]),
+])
+def test_sample_document_trees(name, top_level):
+    text, tree = parse_document(str(SAMPLES / name), SECTION_NAMES)
+
+    assert [node["title"] for node in tree] == top_level
+    references = find_section(tree, "Documentos Complementares")
+    assert section_body(text, references).lstrip().startswith("2.1 ")
+    assert all(node["level"] > 1 for node in tree[1]["children"])
@@ -0,0 +1,110 @@
+import pytest
+
+from app.services.spell_checker import SpellChecker, frequent_words
+from app.utils.hunspell import HunspellDictionary
+
+AFF = """SET UTF-8
+FLAG UTF-8
+NEEDAFFIX !
+FORBIDDENWORD *
+
+# plural
+SFX S Y 2
+SFX S 0 s [aeiou]
+SFX S ão ões ão
+
+# verbs in -ar; "r" may take the enclitic suffix L
+SFX V Y 3
+SFX V r ndo ar
+SFX V ar ou ar
+SFX V 0 /L ar
+
+SFX L N 1
+SFX L 0 -lo r
+
+PFX R Y 1
+PFX R 0 re .
+"""
+
+DIC = """13
+inspeção/S
+papel/S
+lote/S
+verificar/VR
+registrar/V
+ciclo/!S
+errado/*
+Paulo
+conforme
+a
+e
+o
+do
+"""
+
+
+@pytest.fixture
+def dictionary_path(tmp_path):
+    (tmp_path / "pt_BR.aff").write_text(AFF, encoding="utf-8")
+    path = tmp_path / "pt_BR.dic"
+    path.write_text(DIC, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("word, known", [
+    ("lote", True),
+    ("lotes", True),
+    ("inspeções", True),       # strip "ão", add "ões"
+    ("papels", False),         # condition [aeiou] does not hold
+    ("verificando", True),
+    ("verificou", True),
+    ("Reverificando", True),   # cross product of prefix and suffix
+    ("reregistrar", False),    # registrar has no R flag
+    ("verificá-lo", False),
+    ("registrar-lo", True),    # twofold: registrar + "" (continues with L) + "-lo"
+    ("ciclo", False),          # NEEDAFFIX
+    ("ciclos", True),
+    ("errado", False),         # FORBIDDENWORD
+    ("paulo", True),
+    ("lotex", False),
+])
+def test_hunspell_affixes(dictionary_path, word, known):
+    dictionary = HunspellDictionary.load(dictionary_path)
+
+    assert (word in dictionary) is known
+    assert len(dictionary) == 13 and dictionary.affix_rules == 7
+
+
+def test_plain_word_list_without_affix_file(tmp_path):
+    path = tmp_path / "palavras.txt"
+    path.write_text("lote\nInspeção\n", encoding="utf-8")
+
+    dictionary = HunspellDictionary.load(str(path))
+
+    assert "inspeção" in dictionary and "lotes" not in dictionary
+
+
+def test_all_caps_tokens_need_the_whitelist_or_a_code(dictionary_path):
+    checker = SpellChecker()
+    checker.load(dictionary_path, whitelist=["EPI", "NR"])
+
+    assert checker.suspicious_tokens("Conforme PQ-001.02 e a NR, verificar o LOTE e o EPI do RQ.") == []
+    assert checker.suspicious_tokens("Verificar o LOTEE e a INSPECAO.") == ["LOTEE", "INSPECAO"]
+
+
+def test_published_vocabulary_needs_several_documents():
+    texts = [(1, "lote Tecelagem inspeçao"), (1, "inspeçao"), (2, "lote tecelagem"), (3, "Lote"), (4, None)]
+
+    assert frequent_words(texts, min_documents=2) == {"lote", "tecelagem"}
+    assert frequent_words(texts, min_documents=3) == {"lote"}
+
+
+def test_is_clean_counts_checks(dictionary_path):
+    checker = SpellChecker()
+    assert checker.is_clean("lote") is None
+
+    checker.load(dictionary_path, whitelist=[], corpus_words=["tecelagem"])
+
+    assert checker.is_clean("Lotes, tecelagem") is True
+    assert checker.is_clean("Lotes, tecelagen") is False
+    assert checker.stats()["checks"] == 2 and checker.stats()["llm_calls_skipped"] == 1
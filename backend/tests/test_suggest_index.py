@@ -0,0 +1,103 @@
+from app.services.suggest_index import MATCH_CODE, MATCH_FUZZY, MATCH_TITLE, SuggestIndex
+
+DOCUMENTS = [
+    (1, "PQ-001.02", "Controle de Informação Documentada", "LM-001"),
+    (2, "PQ-002.00", "Limpeza de Equipamentos", None),
+    (3, "IT-014.01", "Inspeção de Recebimento", None),
+    (4, "PQ-003.01", "Limpesa de Tanques", None),
+]
+
+
+def _index(documents=DOCUMENTS) -> SuggestIndex:
+    index = SuggestIndex()
+    index.build(list(documents))
+    return index
+
+
+def _codes(results: list[dict]) -> list[str]:
+    return [r["code"] for r in results]
+
+
+def test_code_prefix_matches():
+    results = _index().suggest("pq-001")
+
+    assert results[0]["code"] == "PQ-001.02"
+    assert results[0]["match"] == MATCH_CODE
+    assert {r["match"] for r in results[1:]} == {MATCH_FUZZY}
+    assert results[0]["master_list_code"] == "LM-001"
+
+
+def test_missing_digit_in_code_is_a_typo_match():
+    results = _index().suggest("PQ-01")
+
+    assert "PQ-001.02" in _codes(results)
+    assert {r["match"] for r in results} == {MATCH_FUZZY}
+
+
+def test_code_separators_are_folded():
+    index = _index()
+
+    for query in ("PQ001", "PQ 001", "001.02"):
+        assert _codes(index.suggest(query, limit=1)) == ["PQ-001.02"], query
+        assert index.suggest(query)[0]["match"] == MATCH_CODE, query
+
+
+def test_title_words_match_without_accents():
+    results = _index().suggest("inspecao")
+
+    assert _codes(results) == ["IT-014.01"]
+    assert results[0]["match"] == MATCH_TITLE
+
+
+def test_misspelled_title_word_finds_the_document():
+    index = _index([d for d in DOCUMENTS if d[0] != 4])
+
+    results = index.suggest("limpesa")
+
+    assert _codes(results) == ["PQ-002.00"]
+    assert results[0]["match"] == MATCH_FUZZY
+
+
+def test_exact_matches_rank_above_typo_matches():
+    results = _index().suggest("limpesa")
+
+    assert [(r["code"], r["match"]) for r in results] == [
+        ("PQ-003.01", MATCH_TITLE),
+        ("PQ-002.00", MATCH_FUZZY),
+    ]
+
+
+def test_every_term_must_match():
+    index = _index()
+
+    assert _codes(index.suggest("limpeza equipamentos")) == ["PQ-002.00"]
+    assert index.suggest("limpeza recebimento") == []
+
+
+def test_short_term_does_not_crowd_out_a_longer_one():
+    documents = [(i, f"PQ-{i:03}.00", f"Procedimento {i}", None) for i in range(1, 400)]
+    documents.append((400, "IT-900.00", "Procedimento de Calibração", None))
+
+    assert _codes(_index(documents).suggest("p calibracao")) == ["IT-900.00"]
+
+
+def test_recode_replaces_the_old_keys():
+    index = _index()
+
+    index.upsert(1, "PQ-001.03", "Controle de Registros")
+
+    assert _codes(index.suggest("PQ-001.03", limit=1)) == ["PQ-001.03"]
+    assert MATCH_CODE not in {r["match"] for r in index.suggest("PQ-001.02")}
+    assert index.suggest("documentada") == []
+    assert index.suggest("LM-001")[0]["document_id"] == 1  # master list code is kept
+    rebuilt = _index([(1, "PQ-001.03", "Controle de Registros", "LM-001")] + DOCUMENTS[1:])
+    assert index.stats()["keys"] == rebuilt.stats()["keys"]
+
+
+def test_remove_drops_the_document():
+    index = _index()
+
+    index.remove(3)
+
+    assert index.suggest("inspecao") == []
+    assert index.stats()["documents"] == 3
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import shutil
+
+import pytest
+from docx import Document as DocxDocument
+
+from app.config import settings
+from app.services import template_service
+
+
+@pytest.fixture
+def docx_template(tmp_path):
+    doc = DocxDocument()
+    doc.add_paragraph("{{TITULO}} — {{CODIGO}}")
+    doc.add_paragraph("{{OBJETIVO}}")
+    path = tmp_path / "modelo.docx"
+    doc.save(path)
+    return path
+
+
+def test_odt_template_is_converted_through_the_office_pool(tmp_path, monkeypatch, docx_template):
+    monkeypatch.setattr(settings, "STORAGE_PATH", str(tmp_path))
+    conversions = []
+
+    async def fake_convert(src, dest):
+        conversions.append((src, dest))
+        shutil.copy(docx_template, dest)
+        return dest
+
+    async def inline_run_cpu(fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(template_service, "convert_document", fake_convert)
+    monkeypatch.setattr(template_service, "run_cpu", inline_run_cpu)
+    odt = tmp_path / "modelo.odt"
+    odt.write_bytes(b"")
+
+    docx_path, _ = asyncio.run(template_service.format_document_with_template(
+        template_path=str(odt),
+        structured_content={"sections": [{"title": "Objetivo e Abrangência", "content": "Definir a inspeção."}]},
+        metadata={"title": "Inspeção", "code": "PQ-001.00"},
+        source_docx_path=None,
+        changelog_entries=None,
+        approval_data=None,
+        output_docx_path=str(tmp_path / "out.docx"),
+        output_pdf_path=str(tmp_path / "out.pdf"),
+    ))
+
+    [(src, converted)] = conversions[:1]
+    assert src == str(odt) and converted.endswith(".docx")
+    assert not os.path.exists(converted)  # temporary copy removed
+    assert [p.text for p in DocxDocument(docx_path).paragraphs] == ["Inspeção — PQ-001.00", "Definir a inspeção."]
+
+
+def test_format_with_template_rejects_unconverted_odt(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_PATH", str(tmp_path))
+
+    with pytest.raises(ValueError):
+        template_service.format_with_template(str(tmp_path / "modelo.odt"), {}, {})
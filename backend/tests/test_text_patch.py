@@ -0,0 +1,72 @@
+from app.utils.text_patch import apply_edits
+
+TEXT = "O operador deve verificar o lote. Depois, o operador deve registrar o lote no RQ-010."
+
+
+def test_edits_are_located_by_their_context():
+    result = apply_edits(TEXT, [{
+        "original": "operador",
+        "corrected": "inspetor",
+        "context": "Depois, o operador deve registrar",
+    }])
+
+    assert result.text == "O operador deve verificar o lote. Depois, o inspetor deve registrar o lote no RQ-010."
+    assert result.applied[0]["position"] == TEXT.index("Depois, o operador") + len("Depois, o ")
+    assert result.conflicts == []
+
+
+def test_unique_fragment_is_applied_without_context():
+    result = apply_edits(TEXT, [{"original": "verificar", "corrected": "conferir", "context": "frase reescrita"}])
+
+    assert result.text.startswith("O operador deve conferir o lote.")
+
+
+def test_edits_are_applied_in_text_order_with_original_offsets():
+    edits = [
+        {"original": "registrar", "corrected": "anotar", "context": ""},
+        {"original": "O operador", "corrected": "A operadora", "context": "O operador deve verificar"},
+    ]
+
+    result = apply_edits(TEXT, edits)
+
+    assert result.text == "A operadora deve verificar o lote. Depois, o operador deve anotar o lote no RQ-010."
+    assert [edit["position"] for edit in result.applied] == [0, TEXT.index("registrar")]
+
+
+def test_conflicts_are_reported_and_left_unapplied():
+    edits = [
+        {"original": "lote", "corrected": "lotes", "context": ""},                      # occurs twice
+        {"original": "RQ-011", "corrected": "RQ-012", "context": "no RQ-011"},          # not in the text
+        {"original": "RQ-010.", "corrected": "RQ-010 .", "context": ""},
+        {"original": "no RQ-010", "corrected": "em RQ-010", "context": ""},             # overlaps the edit above
+    ]
+
+    result = apply_edits(TEXT, edits)
+
+    assert [(edit["original"], edit["conflict"]) for edit in result.conflicts] == [
+        ("lote", "ambiguous"), ("RQ-011", "not_found"), ("no RQ-010", "overlap"),
+    ]
+    assert result.text == TEXT.replace("RQ-010.", "RQ-010 .")
+
+
+def test_repeated_fragment_in_context_takes_the_next_free_occurrence():
+    text = "lote lote"
+    edits = [
+        {"original": "lote", "corrected": "Lote", "context": "lote lote"},
+        {"original": "lote", "corrected": "LOTE", "context": "lote lote"},
+    ]
+
+    assert apply_edits(text, edits).text == "Lote LOTE"
+
+
+def test_no_op_edits_are_dropped_and_replacement_key_is_configurable():
+    edits = [
+        {"original": "lote", "suggestion": "lote", "context": ""},
+        {"original": "", "suggestion": "x", "context": ""},
+        {"original": "verificar", "suggestion": "checar", "context": ""},
+    ]
+
+    result = apply_edits(TEXT, edits, replacement_key="suggestion")
+
+    assert result.text == TEXT.replace("verificar", "checar")
+    assert len(result.applied) == 1 and result.conflicts == []
@@ -81,6 +81,7 @@ echo   Para iniciar o sistema, execute:
 echo     iniciar.bat
 echo.
 echo   (Opcional) Instale o LibreOffice para
-echo   conversao PDF: https://www.libreoffice.org
+echo   conversao PDF e verificacao ortografica local:
+echo   https://www.libreoffice.org
 echo ============================================
 pause
@@ -82,7 +82,7 @@ echo "  Para iniciar o sistema, execute:"
 echo "    ./iniciar.sh"
 echo ""
 echo "  (Opcional) Instale o LibreOffice para"
-echo "  conversão PDF:"
+echo "  conversão PDF e verificação ortográfica local:"
 echo "    Mac: brew install --cask libreoffice"
-echo "    Linux: sudo apt install libreoffice"
+echo "    Linux: sudo apt install libreoffice hunspell-pt-br"
 echo "============================================"